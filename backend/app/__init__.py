@@ -248,6 +248,10 @@ def create_app():
             {
                 "name": "Images",
                 "description": "Image storage and retrieval endpoints"
+            },
+            {
+                "name": "Presence Events",
+                "description": "Camera presence event ingestion and review endpoints"
             }
         ],
         "responses": {
@@ -405,6 +409,9 @@ def create_app():
     
     from .api.manager.routes import bp as manager_v2_bp
     app.register_blueprint(manager_v2_bp)
+
+    from .api.presence.routes import bp as presence_events_v2_bp
+    app.register_blueprint(presence_events_v2_bp)
     
     # from .api.employee.routes import bp as employee_v2_bp
     # app.register_blueprint(employee_v2_bp)
@@ -507,7 +514,15 @@ def create_app():
         
         return response
 
-    # socketio.init_app(app)
+    # Real-time dashboard push; with Redis the events are relayed between workers.
+    # Handlers must be registered before init_app so every app's server gets them.
+    from .api import realtime  # registers the Socket.IO handlers
+    from .services.realtime_service import message_queue_url
+    socketio.init_app(
+        app,
+        message_queue=message_queue_url(app.config.get("REDIS_URL")),
+        cors_allowed_origins=cors_origins,
+    )
 
     return app
 
@@ -195,6 +195,7 @@ def list_cameras():
     
     query = CameraService.list_cameras(filters, organization_id)
     result = paginate(query, page, per_page, CameraSchema)
+    CameraService.apply_live_status(result['items'])
     
     return success_response(data=result)
 
@@ -231,7 +232,8 @@ def get_camera(camera_id):
     camera = CameraService.get_camera(camera_id)
     
     schema = CameraSchema()
-    return success_response(data=schema.dump(camera))
+    data = CameraService.apply_live_status([schema.dump(camera)])[0]
+    return success_response(data=data)
 
 
 @bp.route('/<string:camera_id>', methods=['PUT'])
@@ -351,6 +353,9 @@ def delete_camera(camera_id):
 def update_camera_heartbeat(camera_id):
     """
     Update camera heartbeat status
+
+    The heartbeat is recorded in the live heartbeat store and written to the
+    database in periodic batches.
     ---
     tags:
       - Cameras
@@ -394,6 +399,6 @@ def update_camera_heartbeat(camera_id):
     
     schema = CameraSchema()
     return success_response(
-        data=schema.dump(camera),
+        data=CameraService.apply_live_status([schema.dump(camera)])[0],
         message='Camera heartbeat updated successfully'
     )
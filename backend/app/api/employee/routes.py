@@ -14,6 +14,7 @@ from app.models.organization import Organization
 from app.models.attendance import AttendanceRecord
 from app.models.leave_request import LeaveRequest
 from app.utils.decorators import role_required, tenant_isolation
+from app.utils.date_ranges import within_days, since_day
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 bp = Blueprint('employee', __name__)
@@ -181,7 +182,8 @@ def get_today_attendance():
         # Get today's attendance record
         attendance = AttendanceRecord.query.filter(
             AttendanceRecord.employee_id == employee.id,
-            func.date(AttendanceRecord.check_in_time) == today
+            within_days(AttendanceRecord.date, today),
+            AttendanceRecord.check_in_time.isnot(None)
         ).first()
         
         attendance_data = {
@@ -191,6 +193,7 @@ def get_today_attendance():
             'check_out_time': None,
             'total_hours': 0,
             'is_late': False,
+            'minutes_late': 0,
             'break_duration': 0
         }
         
@@ -202,7 +205,8 @@ def get_today_attendance():
                 'status': 'present',
                 'check_in_time': check_in_time.isoformat() if check_in_time else None,
                 'check_out_time': check_out_time.isoformat() if check_out_time else None,
-                'is_late': attendance.is_late if hasattr(attendance, 'is_late') else False,
+                'is_late': attendance.is_late,
+                'minutes_late': attendance.minutes_late or 0,
                 'break_duration': attendance.break_duration if hasattr(attendance, 'break_duration') else 0
             })
             
@@ -259,8 +263,8 @@ def get_attendance_history():
         # Get attendance records
         attendance_query = AttendanceRecord.query.filter(
             AttendanceRecord.employee_id == employee.id,
-            func.date(AttendanceRecord.check_in_time) >= start_date,
-            func.date(AttendanceRecord.check_in_time) <= end_date
+            within_days(AttendanceRecord.date, start_date, end_date),
+            AttendanceRecord.check_in_time.isnot(None)
         ).order_by(AttendanceRecord.check_in_time.desc())
         
         attendance_records = attendance_query.paginate(
@@ -285,7 +289,8 @@ def get_attendance_history():
                 'check_out_time': check_out_time.isoformat() if check_out_time else None,
                 'duration_hours': duration_hours,
                 'status': 'present' if check_in_time else 'absent',
-                'is_late': getattr(record, 'is_late', False),
+                'is_late': record.is_late,
+                'minutes_late': record.minutes_late or 0,
                 'break_duration': getattr(record, 'break_duration', 0)
             })
         
@@ -525,7 +530,8 @@ def get_employee_stats_summary():
         # Get attendance stats for current month
         attendance_records = AttendanceRecord.query.filter(
             AttendanceRecord.employee_id == employee.id,
-            func.date(AttendanceRecord.check_in_time) >= current_month_start
+            since_day(AttendanceRecord.date, current_month_start),
+            AttendanceRecord.check_in_time.isnot(None)
         ).all()
         
         present_days = len(attendance_records)
@@ -118,7 +118,7 @@ def create_employee():
     data = request.validated_data
     employee = EmployeeService.create_employee(data)
     
-    schema = EmployeeSchema()
+    schema = EmployeeSchema(include_photo_data=True)
     return success_response(
         data=schema.dump(employee),
         message='Employee created successfully',
@@ -241,7 +241,7 @@ def get_employee(employee_id):
     """
     employee = EmployeeService.get_employee(employee_id)
     
-    schema = EmployeeSchema()
+    schema = EmployeeSchema(include_photo_data=True)
     return success_response(data=schema.dump(employee))
 
 
@@ -311,7 +311,7 @@ def update_employee(employee_id):
     data = request.validated_data
     employee = EmployeeService.update_employee(employee_id, data)
     
-    schema = EmployeeSchema()
+    schema = EmployeeSchema(include_photo_data=True)
     return success_response(
         data=schema.dump(employee),
         message='Employee updated successfully'
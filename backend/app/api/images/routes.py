@@ -3,8 +3,8 @@ Image Management API routes (v2).
 Handles image upload, retrieval, and management for employees and visitors.
 """
 
-from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from ...utils.helpers import (
     success_response,
     error_response,
@@ -14,11 +14,19 @@ from ...utils.helpers import (
 )
 from ...utils.exceptions import NotFoundError, ForbiddenError
 from ...services.image_service import ImageService
+from ...utils.blob_store import BlobNotFoundError
+from ...utils.image_variants import IMAGE_VARIANTS, VARIANT_URL_TTL_SECONDS, verify_variant_signature
+from ...utils.decorators import _normalize_role
 from ...models import Image
 from ...extensions import db
 
 bp = Blueprint('images_api', __name__, url_prefix='/api/v2/images')
 
+# Fresh for one signing window, then revalidated by ETag. Signed URLs change
+# every window and browsers cache per URL, so a longer (or immutable)
+# lifetime would only keep copies that are never requested again.
+VARIANT_MAX_AGE = VARIANT_URL_TTL_SECONDS
+
 
 @bp.route('', methods=['POST'])
 @jwt_required()
@@ -67,6 +75,8 @@ def create_image():
         
         return success_response(image.to_dict(), 'Image created successfully')
     
+    except ValueError as e:
+        return error_response(str(e), 400)
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -80,12 +90,69 @@ def get_image(image_id):
         if not image:
             return error_response('Image not found', 404)
         
-        return success_response(image.to_dict())
+        return success_response(image.to_dict(include_data=True))
     
     except Exception as e:
         return error_response(str(e), 500)
 
 
+@bp.route('/<image_id>/variants/<variant>', methods=['GET'])
+@jwt_required(optional=True)
+def get_image_variant(image_id, variant):
+    """
+    Serve the image file itself, resized for lists and previews.
+
+    Variants: thumb (160px) and medium (640px) JPEGs, fitted on the longest
+    side, or original. Responses carry an ETag and a private Cache-Control
+    of one signing window; If-None-Match is answered with 304 and Range
+    requests are honoured. A signed URL from the next window is a new cache
+    entry, so each image is downloaded again at most once per window.
+
+    Access takes either a bearer token of the image's organization (or a
+    super admin), or the short-lived ``expires``/``signature`` parameters of
+    ``Image.variant_url``, which API responses hand out so the URL can be
+    used directly as an <img> source without putting a token in it.
+    """
+    if variant not in IMAGE_VARIANTS:
+        return error_response(f"Unknown variant: {variant}", 404)
+    signature = request.args.get('signature')
+    if signature is not None:
+        if not verify_variant_signature(image_id, variant, request.args.get('expires'), signature):
+            return error_response('Invalid or expired image link', 403)
+    elif get_jwt_identity() is None:
+        return error_response('Missing authorization', 401)
+    try:
+        image = ImageService.get_image(image_id)
+        if not image:
+            return error_response('Image not found', 404)
+        if signature is None:
+            claims = get_jwt()
+            if (_normalize_role(claims.get('role')) != 'super_admin'
+                    and image.organization_id != claims.get('organization_id')):
+                # Same answer as a missing image: other tenants' ids are not confirmed
+                return error_response('Image not found', 404)
+
+        path, mime_type, digest = ImageService.get_variant_file(image, variant)
+        response = send_file(
+            path,
+            mimetype=mime_type,
+            etag=f"{digest}-{variant}",
+            conditional=True,
+            max_age=VARIANT_MAX_AGE
+        )
+        # Images are tenant data: browsers may cache them, shared proxies may not
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
+
+    except BlobNotFoundError:
+        return error_response('Image content not found', 404)
+    except ValueError as e:
+        return error_response(str(e), 422)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
 @bp.route('/entity/<entity_type>/<entity_id>', methods=['GET'])
 @jwt_required()
 def get_entity_images(entity_type, entity_id):
@@ -143,7 +210,7 @@ def get_primary_image(entity_type, entity_id):
         if not image:
             return error_response('No primary image found', 404)
         
-        return success_response(image.to_dict())
+        return success_response(image.to_dict(include_data=True))
     
     except Exception as e:
         return error_response(str(e), 500)
@@ -9,13 +9,14 @@ import traceback
 
 from app.models.user import User
 from app.models.employee import Employee
-from app.models.department import Department
-from app.models.organization import Organization
 from app.models.attendance import AttendanceRecord
 from app.models.leave_request import LeaveRequest
 from app.models.camera import Camera
 from app.models.location import Location
 from app.utils.decorators import manager_required, team_access_required, tenant_required
+from app.services.top_performers_service import TopPerformersService
+from app.services.team_stats_service import TeamStatsService
+from app.services.team_report_service import TeamReportService, month_period
 from flask_jwt_extended import jwt_required
 
 bp = Blueprint('manager', __name__)
@@ -202,10 +203,8 @@ def get_dashboard_activities():
             status = 'success'
             action = 'Checked in'
             
-            # Check for late arrival (assuming 9:30 AM is late limit, ideally this should be config based)
-            # Simple check: if check in is after 9:30 AM local time (UTC+5:30)
-            # UTC check in + 5:30 > 9:30 => UTC > 4:00
-            if record.check_in_time.time() > datetime.strptime('04:00', '%H:%M').time():
+            # Lateness is evaluated against the employee's shift at check-in
+            if record.is_late:
                 status = 'flagged'
                 action = 'Late check-in'
                 
@@ -270,82 +269,11 @@ def get_team_stats():
         claims = get_jwt()
         manager_department_id = claims.get('department_id')
         
-        # Get current date range
-        today = datetime.utcnow().date()
-        start_of_month = today.replace(day=1)
-        
-        # Count total team members in organization
-        team_query = Employee.query.filter_by(
-            organization_id=organization_id,
-            is_active=True
-        ).join(User).filter(User.is_active == True)
-        
-        # If manager has department context, filter by department
-        if manager_department_id:
-            team_query = team_query.filter(Employee.department_id == manager_department_id)
-        
-        total_members = team_query.count()
-        
-        # Get attendance stats for this month
-        attendance_query = AttendanceRecord.query.join(Employee).filter(
-            Employee.organization_id == organization_id,
-            AttendanceRecord.check_in_time >= start_of_month
-        )
-        
-        # If manager has department context, filter by department
-        if manager_department_id:
-            attendance_query = attendance_query.filter(Employee.department_id == manager_department_id)
-            
-        attendance_records = attendance_query.all()
-        
-        # Present today
-        present_today_records = [a for a in attendance_records if a.check_in_time.date() == today]
-        present_today = len(present_today_records)
-        
-        # Late arrivals today (assuming 9:30 AM cutoff)
-        late_limit_time = datetime.strptime('04:00', '%H:%M').time() # 9:30 AM IST is 4:00 AM UTC
-        late_arrivals = len([a for a in present_today_records if a.check_in_time.time() > late_limit_time])
-        
-        # Get pending leave requests
-        leaves_query = LeaveRequest.query.join(Employee).filter(
-            Employee.organization_id == organization_id,
-            LeaveRequest.status == 'pending'
-        )
-        
-        # If manager has department context, filter by department
-        if manager_department_id:
-            leaves_query = leaves_query.filter(Employee.department_id == manager_department_id)
-            
-        pending_leaves = leaves_query.count()
-        
-        # Calculate average attendance
-        working_days = (today - start_of_month).days + 1
-        expected_attendance = total_members * working_days
-        actual_attendance = len(attendance_records)
-        attendance_percentage = (actual_attendance / expected_attendance * 100) if expected_attendance > 0 else 0
-        
-        # Get organization-wide employee count
-        org_total_employees = Employee.query.filter_by(
-            organization_id=organization_id,
-            is_active=True
-        ).join(User).filter(User.is_active == True).count()
-        
-        # Get organization and department names
-        organization = Organization.query.get(organization_id)
-        department = Department.query.get(manager_department_id) if manager_department_id else None
+        stats = TeamStatsService.get_team_stats(organization_id, manager_department_id)
         
         return jsonify({
             'status': 'success',
-            'data': {
-                'total_members': total_members,
-                'total_organization_members': org_total_employees,
-                'organization_name': organization.name if organization else 'Unknown Organization',
-                'department_name': department.name if department else 'All Departments',
-                'present_today': present_today,
-                'pending_leaves': pending_leaves,
-                'late_arrivals': late_arrivals,
-                'attendance_percentage': round(attendance_percentage, 1)
-            }
+            'data': stats
         }), 200
         
     except Exception as e:
@@ -480,6 +408,7 @@ def approve_leave_request(leave_id):
         
         from app import db
         db.session.commit()
+        TopPerformersService.invalidate(leave.organization_id, leave.start_date, leave.end_date)
         
         return jsonify({
             'status': 'success',
@@ -858,216 +787,70 @@ def get_manager_locations():
         }), 500
 
 
+def _team_performance_scope():
+    """Organization, manager department and report period of a team performance request"""
+    from flask_jwt_extended import get_jwt
+    claims = get_jwt()
+    
+    # Get date range parameters (default to the whole current month)
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    month_start, month_end = month_period(datetime.utcnow().date())
+    
+    if start_date_str:
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+    else:
+        start_date = month_start
+    
+    if end_date_str:
+        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+    else:
+        end_date = month_end
+    
+    return g.organization_id, claims.get('department_id'), start_date, end_date
+
 @bp.route('/api/manager/reports/team-performance', methods=['GET'])
 @jwt_required()
 @tenant_required
 @manager_required
 def get_team_performance_report():
     """
-    Generate comprehensive team performance report
-    Includes attendance, leaves, demographics, and overall team statistics
+    Get the comprehensive team performance report
+    Includes attendance, leaves, demographics, and overall team statistics.
+    Served from the newest precomputed snapshot of the (department, period);
+    when none exists yet one is queued and 202 is returned.
     """
     try:
-        from flask_jwt_extended import get_jwt
-        organization_id = g.organization_id
-        claims = get_jwt()
-        manager_department_id = claims.get('department_id')
-        
-        # Get date range parameters (default to current month)
-        start_date_str = request.args.get('start_date')
-        end_date_str = request.args.get('end_date')
-        
-        if start_date_str:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-        else:
-            start_date = datetime.utcnow().date().replace(day=1)
-        
-        if end_date_str:
-            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-        else:
-            end_date = datetime.utcnow().date()
-        
-        # Get organization details
-        organization = Organization.query.get(organization_id)
-        
-        # Base employee query
-        employees_query = Employee.query.filter_by(
-            organization_id=organization_id,
-            is_active=True
-        ).join(User).filter(User.is_active == True)
-        
-        # If manager has department context, filter by department
-        if manager_department_id:
-            employees_query = employees_query.filter(Employee.department_id == manager_department_id)
-            department = Department.query.get(manager_department_id)
-            department_name = department.name if department else 'Unknown'
-        else:
-            department_name = 'All Departments'
-        
-        employees = employees_query.all()
-        total_team_members = len(employees)
-        
-        # Get organization-wide employee count for comparison
-        org_total_employees = Employee.query.filter_by(
-            organization_id=organization_id,
-            is_active=True
-        ).join(User).filter(User.is_active == True).count()
-        
-        # Attendance Statistics
-        attendance_query = AttendanceRecord.query.join(Employee).filter(
-            Employee.organization_id == organization_id,
-            AttendanceRecord.check_in_time >= start_date,
-            AttendanceRecord.check_in_time <= end_date
-        )
-        if manager_department_id:
-            attendance_query = attendance_query.filter(Employee.department_id == manager_department_id)
-        
-        attendance_records = attendance_query.all()
-        
-        # Calculate working days
-        working_days = (end_date - start_date).days + 1
-        expected_attendance = total_team_members * working_days
-        actual_attendance = len(attendance_records)
-        avg_attendance_rate = (actual_attendance / expected_attendance * 100) if expected_attendance > 0 else 0
-        
-        # Late arrivals (after 9:30 AM IST = 4:00 AM UTC)
-        late_limit_time = datetime.strptime('04:00', '%H:%M').time()
-        late_arrivals = len([a for a in attendance_records if a.check_in_time.time() > late_limit_time])
-        
-        # Leave Statistics
-        leaves_query = LeaveRequest.query.join(Employee).filter(
-            Employee.organization_id == organization_id,
-            LeaveRequest.start_date <= end_date,
-            LeaveRequest.end_date >= start_date
-        )
-        if manager_department_id:
-            leaves_query = leaves_query.filter(Employee.department_id == manager_department_id)
-        
-        all_leaves = leaves_query.all()
-        
-        leave_stats = {
-            'pending': 0,
-            'approved': 0,
-            'rejected': 0,
-            'total_leave_days': 0
-        }
-        
-        leave_type_breakdown = {}
-        
-        for leave in all_leaves:
-            leave_stats[leave.status] = leave_stats.get(leave.status, 0) + 1
-            if leave.status == 'approved':
-                leave_stats['total_leave_days'] += leave.total_days
-            
-            # Track leave types
-            if leave.leave_type not in leave_type_breakdown:
-                leave_type_breakdown[leave.leave_type] = {'count': 0, 'days': 0}
-            leave_type_breakdown[leave.leave_type]['count'] += 1
-            if leave.status == 'approved':
-                leave_type_breakdown[leave.leave_type]['days'] += leave.total_days
-        
-        # Department Breakdown (if viewing all departments)
-        department_breakdown = []
-        if not manager_department_id:
-            departments = Department.query.filter_by(organization_id=organization_id).all()
-            for dept in departments:
-                dept_emp_count = Employee.query.filter_by(
-                    department_id=dept.id,
-                    is_active=True
-                ).join(User).filter(User.is_active == True).count()
-                
-                dept_attendance = AttendanceRecord.query.join(Employee).filter(
-                    Employee.department_id == dept.id,
-                    AttendanceRecord.check_in_time >= start_date,
-                    AttendanceRecord.check_in_time <= end_date
-                ).count()
-                
-                dept_expected = dept_emp_count * working_days
-                dept_rate = (dept_attendance / dept_expected * 100) if dept_expected > 0 else 0
-                
-                department_breakdown.append({
-                    'id': dept.id,
-                    'name': dept.name,
-                    'employee_count': dept_emp_count,
-                    'attendance_rate': round(dept_rate, 2)
-                })
-        
-        # Employee Demographics
-        gender_breakdown = {}
-        employment_type_breakdown = {}
-        
-        for emp in employees:
-            # Gender
-            gender = emp.gender or 'not_specified'
-            gender_breakdown[gender] = gender_breakdown.get(gender, 0) + 1
-            
-            # Employment type
-            emp_type = emp.employment_type or 'not_specified'
-            employment_type_breakdown[emp_type] = employment_type_breakdown.get(emp_type, 0) + 1
-        
-        # Top performers (by attendance)
-        employee_attendance_stats = {}
-        for record in attendance_records:
-            if record.employee_id not in employee_attendance_stats:
-                employee_attendance_stats[record.employee_id] = {'count': 0, 'employee': record.employee}
-            employee_attendance_stats[record.employee_id]['count'] += 1
-        
-        top_performers = []
-        for emp_id, stats in sorted(employee_attendance_stats.items(), key=lambda x: x[1]['count'], reverse=True)[:5]:
-            emp = stats['employee']
-            attendance_rate = (stats['count'] / working_days * 100)
-            top_performers.append({
-                'employee_code': emp.employee_code,
-                'name': emp.full_name,
-                'attendance_days': stats['count'],
-                'attendance_rate': round(attendance_rate, 2)
-            })
-        
-        # Build comprehensive report
-        report_data = {
-            'organization': {
-                'id': organization_id,
-                'name': organization.name if organization else 'Unknown',
-                'total_employees': org_total_employees
-            },
-            'report_scope': {
-                'department': department_name,
-                'date_range': {
-                    'start_date': start_date.isoformat(),
-                    'end_date': end_date.isoformat(),
-                    'working_days': working_days
-                }
-            },
-            'team_summary': {
-                'total_team_members': total_team_members,
-                'active_employees': total_team_members,
-                'department_count': len(department_breakdown) if department_breakdown else 1
-            },
-            'attendance_summary': {
-                'total_attendance_records': actual_attendance,
-                'expected_attendance': expected_attendance,
-                'average_attendance_rate': round(avg_attendance_rate, 2),
-                'late_arrivals': late_arrivals,
-                'late_arrival_rate': round((late_arrivals / actual_attendance * 100) if actual_attendance > 0 else 0, 2)
-            },
-            'leave_summary': leave_stats,
-            'leave_type_breakdown': leave_type_breakdown,
-            'demographics': {
-                'gender_breakdown': gender_breakdown,
-                'employment_type_breakdown': employment_type_breakdown
-            },
-            'top_performers': top_performers
-        }
+        scope = _team_performance_scope()
+        period_error = TeamReportService.period_error(scope[2], scope[3])
+        if period_error:
+            return jsonify({
+                'status': 'error',
+                'message': period_error
+            }), 400
         
-        # Add department breakdown if applicable
-        if department_breakdown:
-            report_data['department_breakdown'] = department_breakdown
+        snapshot = TeamReportService.latest(*scope)
+        if snapshot is None:
+            queued = TeamReportService.request_snapshot(*scope)
+            return jsonify({
+                'status': 'pending',
+                'message': 'Report is being generated',
+                'snapshot': queued.to_dict()
+            }), 202
         
+        refreshing = TeamReportService.in_progress(*scope)
         return jsonify({
             'status': 'success',
-            'data': report_data
+            'data': snapshot.data,
+            'snapshot': snapshot.to_dict(),
+            'refreshing': refreshing is not None
         }), 200
         
+    except ValueError:
+        return jsonify({
+            'status': 'error',
+            'message': 'Invalid date format. Use YYYY-MM-DD'
+        }), 400
     except Exception as e:
         current_app.logger.error(f"Error generating team performance report: {str(e)}")
         current_app.logger.error(traceback.format_exc())
@@ -1075,3 +858,42 @@ def get_team_performance_report():
             'status': 'error',
             'message': 'Failed to generate team performance report'
         }), 500
+
+@bp.route('/api/manager/reports/team-performance/refresh', methods=['POST'])
+@jwt_required()
+@tenant_required
+@manager_required
+def refresh_team_performance_report():
+    """
+    Queue a new version of the team performance report for the (department, period)
+    The report worker builds it; poll the GET endpoint for the new version.
+    """
+    try:
+        from flask_jwt_extended import get_jwt_identity
+        scope = _team_performance_scope()
+        period_error = TeamReportService.period_error(scope[2], scope[3])
+        if period_error:
+            return jsonify({
+                'status': 'error',
+                'message': period_error
+            }), 400
+        
+        snapshot = TeamReportService.request_snapshot(*scope, requested_by=get_jwt_identity())
+        return jsonify({
+            'status': 'pending',
+            'message': 'Report refresh queued',
+            'snapshot': snapshot.to_dict()
+        }), 202
+        
+    except ValueError:
+        return jsonify({
+            'status': 'error',
+            'message': 'Invalid date format. Use YYYY-MM-DD'
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Error queueing team performance report: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': 'Failed to queue team performance report'
+        }), 500
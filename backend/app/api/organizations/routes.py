@@ -382,6 +382,7 @@ def get_employees_attendance_summary(org_id):
         in: query
         type: integer
         default: 50
+        maximum: 1000
         description: Number of records per page
       - name: page
         in: query
@@ -438,13 +439,10 @@ def get_employees_attendance_summary(org_id):
     """
     from ...services.attendance_service import AttendanceService
     from datetime import datetime, timedelta
-    from ...models import Employee, AttendanceRecord, Department
-    from sqlalchemy import func
-    from ...extensions import db
     
     try:
-        per_page = request.args.get('per_page', 50, type=int)
-        page = request.args.get('page', 1, type=int)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 1000)
+        page = max(request.args.get('page', 1, type=int), 1)
         month = request.args.get('month')  # YYYY-MM format
         
         # Calculate date range
@@ -466,67 +464,11 @@ def get_employees_attendance_summary(org_id):
             start_date = today.replace(day=1)
             end_date = today
         
-        # Get all active employees in organization
-        employees_query = db.session.query(Employee).filter(
-            Employee.organization_id == org_id,
-            Employee.is_active.is_(True),
-            Employee.deleted_at.is_(None)
-        )
-        
-        total = employees_query.count()
-        employees = employees_query.offset((page - 1) * per_page).limit(per_page).all()
-        
-        # Build attendance data for each employee
-        items = []
-        for emp in employees:
-            # Get attendance records for date range
-            attendance_recs = db.session.query(AttendanceRecord).filter(
-                AttendanceRecord.employee_id == emp.id,
-                AttendanceRecord.date >= start_date,
-                AttendanceRecord.date <= end_date
-            ).all()
-            
-            present_days = len(attendance_recs)
-            total_days = (end_date - start_date).days + 1
-            absent_days = max(0, total_days - present_days)
-            
-            # Calculate average hours
-            avg_hours = 0.0
-            if attendance_recs:
-                hours_list = [float(r.work_hours or 0) for r in attendance_recs]
-                avg_hours = sum(hours_list) / len(hours_list)
-            
-            attendance_pct = round((present_days / total_days * 100), 1) if total_days > 0 else 0
-            
-            # Get department name
-            department = ''
-            if emp.department_id:
-                dept = db.session.query(Department).filter_by(id=emp.department_id).first()
-                department = dept.name if dept else ''
-            
-            items.append({
-                'employee_id': emp.id,
-                'full_name': emp.full_name,
-                'employee_code': emp.employee_code,
-                'department': department,
-                'present_days': present_days,
-                'absent_days': absent_days,
-                'leave_count': 0,  # TODO: Calculate from leave requests
-                'avg_hours_per_day': round(avg_hours, 1),
-                'attendance_percentage': attendance_pct
-            })
-        
-        pagination = {
-            'page': page,
-            'per_page': per_page,
-            'total': total,
-            'pages': (total + per_page - 1) // per_page
-        }
+        summary = AttendanceService.get_employees_attendance_summary(org_id, start_date, end_date, page, per_page)
         
         return success_response(
             data={
-                'items': items,
-                'pagination': pagination,
+                **summary,
                 'month': start_date.strftime('%Y-%m')
             },
             message='Attendance summary retrieved successfully'
@@ -566,147 +508,32 @@ def get_top_performers(org_id):
         in: query
         type: integer
         default: 10
+        maximum: 100
         description: Number of top performers to return
     responses:
       200:
-        description: Top performers list
+        description: Top performers list (punctual_employees and low_leave_employees, each with a rank)
     """
-    from datetime import datetime, timedelta
-    from ...models import Employee, AttendanceRecord, LeaveRequest, Department
-    from ...extensions import db
+    from datetime import datetime
+    from ...services.top_performers_service import TopPerformersService, MAX_LIMIT
     
     try:
         month = request.args.get('month')
-        limit = request.args.get('limit', 10, type=int)
+        limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_LIMIT)
         
-        # Calculate date range
+        # Default to current month
+        today = datetime.utcnow().date()
+        month_start = today.replace(day=1)
         if month:
             try:
-                month_date = datetime.strptime(month, '%Y-%m')
-                start_date = month_date.date()
-                # Get last day of month
-                if month_date.month == 12:
-                    end_date = datetime(month_date.year + 1, 1, 1).date() - timedelta(days=1)
-                else:
-                    end_date = datetime(month_date.year, month_date.month + 1, 1).date() - timedelta(days=1)
+                month_start = datetime.strptime(month, '%Y-%m').date()
             except ValueError:
-                start_date = datetime.utcnow().date().replace(day=1)
-                end_date = datetime.utcnow().date()
-        else:
-            # Default to current month
-            today = datetime.utcnow().date()
-            start_date = today.replace(day=1)
-            end_date = today
+                pass
         
-        # Get all active employees in organization
-        employees = db.session.query(Employee).filter(
-            Employee.organization_id == org_id,
-            Employee.is_active.is_(True),
-            Employee.deleted_at.is_(None)
-        ).all()
-        
-        punctual_employees = []
-        low_leave_employees = []
-        
-        for emp in employees:
-            # Get attendance records for date range
-            attendance_recs = db.session.query(AttendanceRecord).filter(
-                AttendanceRecord.employee_id == emp.id,
-                AttendanceRecord.date >= start_date,
-                AttendanceRecord.date <= end_date
-            ).all()
-            
-            # Count late arrivals (check-in after 9:15 AM)
-            late_count = 0
-            present_days = 0
-            for rec in attendance_recs:
-                if rec.check_in_time:
-                    present_days += 1
-                    check_in = rec.check_in_time
-                    # Check if late (after 9:15 AM)
-                    if check_in.hour > 9 or (check_in.hour == 9 and check_in.minute > 15):
-                        late_count += 1
-            
-            # Get leave requests
-            leave_reqs = db.session.query(LeaveRequest).filter(
-                LeaveRequest.employee_id == emp.id,
-                LeaveRequest.organization_id == org_id,
-                LeaveRequest.status == 'approved',
-                LeaveRequest.start_date <= end_date,
-                LeaveRequest.end_date >= start_date
-            ).all()
-            
-            # Calculate leave days in this period
-            total_leave_days = 0.0
-            leave_types_count = {}
-            for leave_req in leave_reqs:
-                # Calculate overlap with month
-                overlap_start = max(leave_req.start_date, start_date)
-                overlap_end = min(leave_req.end_date, end_date)
-                if overlap_start <= overlap_end:
-                    days = (overlap_end - overlap_start).days + 1
-                    total_leave_days += leave_req.total_days if leave_req.total_days else days
-                    leave_types_count[leave_req.leave_type] = leave_types_count.get(leave_req.leave_type, 0) + (leave_req.total_days if leave_req.total_days else days)
-            
-            total_days = (end_date - start_date).days + 1
-            attendance_pct = round((present_days / total_days * 100), 1) if total_days > 0 else 0
-            
-            # Get department name
-            department = ''
-            if emp.department_id:
-                dept = db.session.query(Department).filter_by(id=emp.department_id).first()
-                department = dept.name if dept else ''
-            
-            # Get user email
-            email = ''
-            if emp.user:
-                email = emp.user.email or ''
-            
-            employee_data = {
-                'employee_id': emp.id,
-                'full_name': emp.full_name,
-                'employee_code': emp.employee_code,
-                'department': department,
-                'email': email,
-                'joining_date': emp.joining_date.isoformat() if emp.joining_date else None,
-            }
-            
-            # Punctual employees: Present entire month with 0 or minimal late arrivals
-            if present_days >= (total_days - 1) and late_count == 0:  # Allow 1 day absence
-                punctual_employees.append({
-                    **employee_data,
-                    'present_days': present_days,
-                    'late_arrivals': late_count,
-                    'attendance_percentage': attendance_pct,
-                    'score': present_days - late_count  # Score for sorting
-                })
-            
-            # Low leave employees: Took minimal leave
-            if total_leave_days <= 2:  # 2 days or less
-                low_leave_employees.append({
-                    **employee_data,
-                    'leave_days': total_leave_days,
-                    'leave_types': leave_types_count,
-                    'score': -total_leave_days  # Negative for ascending sort
-                })
-        
-        # Sort and limit
-        punctual_employees = sorted(punctual_employees, key=lambda x: x['score'], reverse=True)[:limit]
-        low_leave_employees = sorted(low_leave_employees, key=lambda x: x['score'], reverse=True)[:limit]
-        
-        # Remove score field from response
-        for emp in punctual_employees:
-            del emp['score']
-        for emp in low_leave_employees:
-            del emp['score']
+        data = TopPerformersService.get_top_performers(org_id, month_start, limit=limit, today=today)
         
         return success_response(
-            data={
-                'punctual_employees': punctual_employees,
-                'low_leave_employees': low_leave_employees,
-                'month': start_date.strftime('%Y-%m'),
-                'total_employees': len(employees)
-            },
+            data=data,
             message='Top performers retrieved successfully'
         )
     
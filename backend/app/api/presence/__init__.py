@@ -0,0 +1,3 @@
+"""
+Presence Events API module.
+"""
@@ -0,0 +1,316 @@
+"""
+Presence Events API routes (v2).
+"""
+
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required
+from ...utils.helpers import (
+    success_response,
+    validate_request,
+    validate_query,
+    get_current_user
+)
+from ...utils.exceptions import ForbiddenError, BadRequestError
+from ...schemas.presence_event import (
+    PresenceEventBulkIngestSchema,
+    PresenceReviewQueueSchema,
+    PresenceEventReviewSchema
+)
+from ...services.presence_event_service import PresenceEventService
+from ...middlewares.rbac_middleware import require_permission
+
+bp = Blueprint('presence_events_api', __name__, url_prefix='/api/v2/presence-events')
+
+
+def _resolve_organization_id(requested_org_id):
+    """Use the caller's organization; only users without one may target another."""
+    current_user = get_current_user()
+    user_org_id = current_user.get('organization_id') if current_user else None
+
+    if user_org_id:
+        if requested_org_id and requested_org_id != user_org_id:
+            raise ForbiddenError('Cannot access another organization')
+        return user_org_id
+
+    if not requested_org_id:
+        raise BadRequestError('organization_id is required')
+    return requested_org_id
+
+
+@bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@require_permission('presence_events:create')
+@validate_request(PresenceEventBulkIngestSchema)
+def bulk_ingest_presence_events():
+    """
+    Bulk ingest presence events from camera workers
+    ---
+    tags:
+      - Presence Events
+    security:
+      - Bearer: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - events
+          properties:
+            organization_id:
+              type: string
+              description: Required only for users without an organization (super admin)
+            events:
+              type: array
+              maxItems: 10000
+              items:
+                type: object
+                required:
+                  - camera_id
+                  - timestamp
+                properties:
+                  idempotency_key:
+                    type: string
+                    description: Retry key; derived from camera, employee, type and timestamp when omitted
+                  camera_id:
+                    type: string
+                  employee_id:
+                    type: string
+                  location_id:
+                    type: string
+                    description: Defaults to the camera's location
+                  event_type:
+                    type: string
+                    enum: [CHECK_IN, CHECK_OUT]
+                    description: Defaults to the camera type
+                  timestamp:
+                    type: string
+                    format: date-time
+                  confidence_score:
+                    type: number
+                  liveness_verified:
+                    type: boolean
+                  liveness_score:
+                    type: number
+                  face_bbox:
+                    type: object
+                  face_quality_score:
+                    type: number
+                  image_url:
+                    type: string
+                  processing_time_ms:
+                    type: integer
+    responses:
+      201:
+        description: Batch processed; per-event errors are listed in data.errors
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            data:
+              type: object
+              properties:
+                received:
+                  type: integer
+                inserted:
+                  type: integer
+                duplicates:
+                  type: integer
+                rejected:
+                  type: integer
+                errors:
+                  type: array
+                  items:
+                    type: object
+      400:
+        $ref: '#/responses/BadRequestError'
+      401:
+        $ref: '#/responses/UnauthorizedError'
+      403:
+        $ref: '#/responses/ForbiddenError'
+    """
+    data = request.validated_data
+    organization_id = _resolve_organization_id(data.get('organization_id'))
+
+    result = PresenceEventService.bulk_ingest(data['events'], organization_id)
+
+    return success_response(
+        data=result,
+        message=f"Ingested {result['inserted']} presence events",
+        status_code=201
+    )
+
+
+@bp.route('/review-queue', methods=['GET'])
+@jwt_required()
+@require_permission('presence_events:read')
+@validate_query(PresenceReviewQueueSchema)
+def get_review_queue():
+    """
+    Presence events awaiting review (keyset pagination)
+    ---
+    tags:
+      - Presence Events
+    security:
+      - Bearer: []
+    parameters:
+      - name: organization_id
+        in: query
+        type: string
+        description: Required only for users without an organization (super admin)
+      - name: review_status
+        in: query
+        type: string
+        enum: [pending, approved, rejected, auto_approved]
+        default: pending
+      - name: camera_id
+        in: query
+        type: string
+      - name: start
+        in: query
+        type: string
+        format: date-time
+        description: Only events at or after this time
+      - name: end
+        in: query
+        type: string
+        format: date-time
+        description: Only events before this time
+      - name: order
+        in: query
+        type: string
+        enum: [asc, desc]
+        default: asc
+      - name: limit
+        in: query
+        type: integer
+        default: 50
+        maximum: 200
+      - name: cursor
+        in: query
+        type: string
+        description: next_cursor from the previous page
+    responses:
+      200:
+        description: One page of the review queue
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            data:
+              type: object
+              properties:
+                items:
+                  type: array
+                  items:
+                    type: object
+                next_cursor:
+                  type: string
+                has_more:
+                  type: boolean
+      400:
+        $ref: '#/responses/BadRequestError'
+      401:
+        $ref: '#/responses/UnauthorizedError'
+      403:
+        $ref: '#/responses/ForbiddenError'
+    """
+    filters = request.validated_query
+    organization_id = _resolve_organization_id(filters.pop('organization_id', None))
+
+    result = PresenceEventService.review_queue(organization_id, filters)
+
+    return success_response(data=result)
+
+
+@bp.route('/review', methods=['POST'])
+@jwt_required()
+@require_permission('presence_events:approve')
+@validate_request(PresenceEventReviewSchema)
+def review_presence_events():
+    """
+    Approve or reject presence events in bulk
+    ---
+    tags:
+      - Presence Events
+    security:
+      - Bearer: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - event_ids
+            - start
+            - end
+            - review_status
+          properties:
+            organization_id:
+              type: string
+              description: Required only for users without an organization (super admin)
+            event_ids:
+              type: array
+              maxItems: 1000
+              items:
+                type: string
+            start:
+              type: string
+              format: date-time
+              description: Timestamp of the earliest event in event_ids
+            end:
+              type: string
+              format: date-time
+              description: Timestamp of the latest event in event_ids
+            review_status:
+              type: string
+              enum: [approved, rejected]
+            notes:
+              type: string
+    responses:
+      200:
+        description: Review applied; events of other organizations are ignored
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            data:
+              type: object
+              properties:
+                requested:
+                  type: integer
+                updated:
+                  type: integer
+      400:
+        $ref: '#/responses/BadRequestError'
+      401:
+        $ref: '#/responses/UnauthorizedError'
+      403:
+        $ref: '#/responses/ForbiddenError'
+    """
+    data = request.validated_data
+    organization_id = _resolve_organization_id(data.get('organization_id'))
+    current_user = get_current_user()
+
+    result = PresenceEventService.bulk_review(
+        organization_id,
+        data['event_ids'],
+        data['start'],
+        data['end'],
+        data['review_status'],
+        current_user.get('id'),
+        data.get('notes')
+    )
+
+    return success_response(
+        data=result,
+        message=f"Updated {result['updated']} presence events"
+    )
@@ -0,0 +1,47 @@
+"""
+Socket.IO handlers of the real-time dashboard channel.
+
+Clients connect to the ``/dashboard`` namespace with their access token,
+e.g. ``io("/dashboard", {auth: {token}})``, and receive the events listed in
+RealtimeService for their organization. Super admins pick the organization
+with ``auth.organization_id``.
+"""
+
+import logging
+from flask import request
+from flask_jwt_extended import decode_token
+from flask_socketio import join_room
+from app.extensions import socketio
+from app.services.realtime_service import NAMESPACE, organization_room
+from app.utils.decorators import _normalize_role
+
+logger = logging.getLogger(__name__)
+
+
+def _auth_value(auth, name):
+    value = auth.get(name) if isinstance(auth, dict) else None
+    return value or request.args.get(name)
+
+
+@socketio.on("connect", namespace=NAMESPACE)
+def connect(auth=None):
+    """Authenticate the dashboard and join its organization's room"""
+    token = _auth_value(auth, "token")
+    if not token:
+        raise ConnectionRefusedError("Authentication required")
+    try:
+        claims = decode_token(token)
+    except Exception:
+        raise ConnectionRefusedError("Invalid or expired token")
+    if claims.get("type") != "access":
+        raise ConnectionRefusedError("Invalid or expired token")
+
+    if _normalize_role(claims.get("role")) == "super_admin":
+        organization_id = _auth_value(auth, "organization_id")
+    else:
+        organization_id = claims.get("organization_id")
+    if not organization_id:
+        raise ConnectionRefusedError("Access denied. Invalid organization context.")
+
+    join_room(organization_room(organization_id))
+    logger.debug(f"Dashboard {request.sid} joined organization {organization_id}")
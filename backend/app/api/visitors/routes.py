@@ -50,7 +50,7 @@ def create_visitor(org_id):
         
         visitor = VisitorService.create_visitor(org_id, data)
         
-        response_schema = VisitorResponseSchema()
+        response_schema = VisitorResponseSchema(include_photo_data=True)
         return success_response(
             data=response_schema.dump(visitor),
             message='Visitor checked in successfully',
@@ -116,7 +116,7 @@ def get_visitor(org_id, visitor_id):
         user = get_current_user()
         visitor = VisitorService.get_visitor(org_id, visitor_id)
         
-        response_schema = VisitorResponseSchema()
+        response_schema = VisitorResponseSchema(include_photo_data=True)
         return success_response(
             data=response_schema.dump(visitor),
             message='Visitor retrieved successfully',
@@ -140,7 +140,7 @@ def update_visitor(org_id, visitor_id):
         
         visitor = VisitorService.update_visitor(org_id, visitor_id, data)
         
-        response_schema = VisitorResponseSchema()
+        response_schema = VisitorResponseSchema(include_photo_data=True)
         return success_response(
             data=response_schema.dump(visitor),
             message='Visitor record updated successfully',
@@ -199,7 +199,7 @@ def check_in_visitor(org_id, visitor_id):
         
         visitor = VisitorService.check_in_visitor(org_id, visitor_id, data)
         
-        response_schema = VisitorResponseSchema()
+        response_schema = VisitorResponseSchema(include_photo_data=True)
         return success_response(
             data=response_schema.dump(visitor),
             message='Visitor checked in successfully',
@@ -222,7 +222,7 @@ def check_out_visitor(org_id, visitor_id):
         
         visitor = VisitorService.check_out_visitor(org_id, visitor_id, data)
         
-        response_schema = VisitorResponseSchema()
+        response_schema = VisitorResponseSchema(include_photo_data=True)
         return success_response(
             data=response_schema.dump(visitor),
             message='Visitor checked out successfully',
@@ -242,25 +242,31 @@ def check_out_visitor(org_id, visitor_id):
 def search_visitors(org_id):
     """
     Search visitors by name, mobile number, or visitor ID.
+    Results are ranked by match quality, then latest check-in first.
     Query params: 
     - query (search term, optional - if not provided, returns all visitors)
     - status (optional: checked_in, checked_out, all - default: all)
-    - limit (optional: number of records to return - default: 50)
+    - limit (optional: number of records to return - default: 50, max: 200)
+    - cursor (optional: pagination.next_cursor of the previous page)
     """
     try:
         user = get_current_user()
         query = request.args.get('query', '').strip()
         status = request.args.get('status', 'all')
-        limit = request.args.get('limit', 50, type=int)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        cursor = request.args.get('cursor')
         
-        visitors = VisitorService.search_visitors(org_id, query, status, limit)
+        result = VisitorService.search_visitors(org_id, query, status, limit, cursor)
         
         response_schema = VisitorResponseSchema(many=True)
         return success_response(
-            data=response_schema.dump(visitors),
+            data=response_schema.dump(result['items']),
             message='Search completed successfully',
-            status_code=200
+            status_code=200,
+            pagination={'next_cursor': result['next_cursor'], 'has_more': result['has_more'], 'limit': limit}
         )
+    except ValidationError as e:
+        return error_response(e.message, 400)
     except ValueError as e:
         return error_response(str(e), 404)
     except Exception as e:
@@ -958,7 +964,7 @@ def quick_checkin_recurring(org_id):
         
         visitor = VisitorService.quick_checkin_recurring(org_id, phone_number)
         
-        response_schema = VisitorResponseSchema()
+        response_schema = VisitorResponseSchema(include_photo_data=True)
         return success_response(
             data=response_schema.dump(visitor),
             message='Recurring visitor checked in successfully',
@@ -15,6 +15,15 @@ class Settings(BaseSettings):
 
     # File storage
     upload_folder: str = Field("./uploads", env=["UPLOAD_FOLDER"])
+
+    # Image blobs: an S3-compatible bucket when set, else a local directory
+    blob_storage_path: Optional[str] = Field(None, env=["BLOB_STORAGE_PATH"])
+    blob_s3_bucket: Optional[str] = Field(None, env=["BLOB_S3_BUCKET"])
+    blob_s3_endpoint_url: Optional[str] = Field(None, env=["BLOB_S3_ENDPOINT_URL"])
+    blob_s3_prefix: str = Field("blobs/", env=["BLOB_S3_PREFIX"])
+    # Resized image variants (thumb/medium), regenerated on demand
+    image_variant_cache_path: Optional[str] = Field(None, env=["IMAGE_VARIANT_CACHE_PATH"])
+    image_variant_cache_max_mb: int = Field(512, env=["IMAGE_VARIANT_CACHE_MAX_MB"])
     
     # Model path for YOLO detector
     model_path: Optional[str] = Field(None, env=["MODEL_PATH"])
@@ -105,6 +114,16 @@ class Config:
     
     # Upload
     UPLOAD_FOLDER = settings.upload_folder
+
+    # Image blob storage (see app/utils/blob_store.py)
+    BLOB_STORAGE_PATH = settings.blob_storage_path or os.path.join(settings.upload_folder, "blobs")
+    BLOB_S3_BUCKET = settings.blob_s3_bucket
+    BLOB_S3_ENDPOINT_URL = settings.blob_s3_endpoint_url
+    BLOB_S3_PREFIX = settings.blob_s3_prefix
+
+    # Resized image variant cache (see app/utils/image_variants.py)
+    IMAGE_VARIANT_CACHE_PATH = settings.image_variant_cache_path or os.path.join(settings.upload_folder, "variants")
+    IMAGE_VARIANT_CACHE_MAX_MB = settings.image_variant_cache_max_mb
     
     # Model path for YOLO detector
     MODEL_PATH = settings.model_path
@@ -13,6 +13,7 @@ from .camera import Camera
 from .face_embedding import FaceEmbedding
 from .presence_event import PresenceEvent
 from .attendance import AttendanceRecord
+from .attendance_daily_stat import AttendanceDailyStat
 from .leave_request import LeaveRequest
 from .attendance_change_request import AttendanceChangeRequest
 from .audit_log import AuditLog
@@ -24,6 +25,8 @@ from .visitor import (
     DeliveryLog, VIPVisitorPreference
 )
 from .lpr import LPRLog, LPRHotlist, LPRWhitelist
+from .processing_checkpoint import ProcessingCheckpoint
+from .report_snapshot import ReportSnapshot
 
 __all__ = [
     "Organization",
@@ -37,6 +40,7 @@ __all__ = [
     "FaceEmbedding",
     "PresenceEvent",
     "AttendanceRecord",
+    "AttendanceDailyStat",
     "LeaveRequest",
     "AttendanceChangeRequest",
     "AuditLog",
@@ -57,6 +61,8 @@ __all__ = [
     "LPRLog",
     "LPRHotlist",
     "LPRWhitelist",
+    "ProcessingCheckpoint",
+    "ReportSnapshot",
 ]
 
 # Backwards-compat: some older code and migrations expect legacy models
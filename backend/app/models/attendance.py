@@ -41,6 +41,10 @@ class AttendanceRecord(db.Model):
     # Computed work hours
     work_hours = db.Column(db.Float, default=0.0)
     
+    # Lateness against the employee's shift, set when check_in_time is written
+    is_late = db.Column(db.Boolean, nullable=False, default=False)
+    minutes_late = db.Column(db.Integer, nullable=True)  # minutes after shift start; NULL until evaluated
+    
     # Location data (GPS coordinates stored as JSON)
     # Example: {"latitude": 12.345, "longitude": 67.890}
     location_check_in = db.Column(db.JSON)
@@ -83,6 +87,7 @@ class AttendanceRecord(db.Model):
         db.UniqueConstraint("employee_id", "date", name="uq_employee_date"),
         db.Index("idx_org_date", "organization_id", "date"),
         db.Index("idx_emp_date", "employee_id", "date"),
+        db.Index("idx_org_date_late", "organization_id", "date", "is_late"),
     )
 
     def to_dict(self, include_employee=False):
@@ -97,6 +102,8 @@ class AttendanceRecord(db.Model):
             "check_out_time": self.check_out_time.isoformat() if self.check_out_time else None,
             "status": self.status,
             "work_hours": self.work_hours,
+            "is_late": self.is_late,
+            "minutes_late": self.minutes_late,
             "location_check_in": self.location_check_in,
             "location_check_out": self.location_check_out,
             "device_info": self.device_info,
@@ -0,0 +1,51 @@
+from ..extensions import db
+from datetime import datetime
+
+
+class AttendanceDailyStat(db.Model):
+    """
+    Daily attendance rollup per (organization, department, employment type).
+    Maintained from attendance_records by AttendanceStatsService so analytics
+    never aggregate raw records at request time.
+    """
+    __tablename__ = "attendance_daily_stats"
+
+    organization_id = db.Column(db.String(36), db.ForeignKey("organizations.id"), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    # Plain ids (no FK) so hard-deleting a department does not block on its history
+    department_id = db.Column(db.String(36), primary_key=True)
+    employment_type = db.Column(db.String(20), primary_key=True, default="")  # "" when not set on the employee
+
+    # Employees with a check-in that day
+    present_count = db.Column(db.Integer, nullable=False, default=0)
+    late_count = db.Column(db.Integer, nullable=False, default=0)
+    # Active employees of the group without a check-in that day
+    absent_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Sum and count of work hours over checked-out records (average = total / count)
+    work_hours_total = db.Column(db.Float, nullable=False, default=0.0)
+    work_hours_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Audit timestamp
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def avg_work_hours(self):
+        return self.work_hours_total / self.work_hours_count if self.work_hours_count else 0.0
+
+    def to_dict(self):
+        """Convert rollup row to dictionary"""
+        return {
+            "organization_id": self.organization_id,
+            "date": self.date.isoformat() if self.date else None,
+            "department_id": self.department_id,
+            "employment_type": self.employment_type or None,
+            "present": self.present_count,
+            "late": self.late_count,
+            "absent": self.absent_count,
+            "avg_work_hours": round(self.avg_work_hours, 2),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def __repr__(self):
+        return f"<AttendanceDailyStat {self.organization_id} {self.department_id} on {self.date}>"
@@ -1,5 +1,8 @@
 from ..extensions import db
+from ..utils.blob_store import get_blob_store, BlobNotFoundError
+from ..utils.image_variants import variant_url
 from datetime import datetime
+import base64
 import uuid
 
 
@@ -8,6 +11,10 @@ class Image(db.Model):
     Unified image storage for all users/entities in the system.
     Supports storing images for employees, visitors, and other entities.
     Uses a polymorphic design with entity_type to track what entity owns the image.
+
+    The picture itself lives in the blob store under ``content_sha256``; rows
+    only hold metadata. ``legacy_base64`` is the old inline column, kept for
+    rows not yet moved out by ``ImageService.migrate_legacy_images``.
     """
     __tablename__ = "images"
 
@@ -21,8 +28,10 @@ class Image(db.Model):
     organization_id = db.Column(db.String(36), db.ForeignKey('organizations.id'), nullable=False, index=True)
     organization = db.relationship('Organization', backref='images')
     
-    # Image data (Base64 encoded)
-    image_base64 = db.Column(db.Text, nullable=False)
+    # Image data: SHA-256 of the bytes in the blob store
+    content_sha256 = db.Column(db.String(64), nullable=True, index=True)
+    # Inline Base64 of rows created before the blob store; never loaded with the row
+    legacy_base64 = db.deferred(db.Column('image_base64', db.Text, nullable=True))
     
     # Image metadata
     image_type = db.Column(db.String(50), default='photo')  # 'photo', 'id_card', 'signature', etc.
@@ -55,14 +64,38 @@ class Image(db.Model):
     def __repr__(self):
         return f"<Image {self.id} for {self.entity_type}:{self.entity_id}>"
 
-    def to_dict(self):
-        """Convert image record to dictionary"""
-        return {
+    def read_bytes(self):
+        """The image bytes from the blob store (None for legacy inline rows)"""
+        return get_blob_store().get(self.content_sha256) if self.content_sha256 else None
+
+    def variant_url(self, variant='thumb'):
+        """Signed API path serving this image resized (thumb, medium) or as original"""
+        return variant_url(self.id, variant)
+
+    @property
+    def image_base64(self):
+        """The image as a data URL, as clients have always received it"""
+        if not self.content_sha256:
+            return self.legacy_base64
+        try:
+            encoded = base64.b64encode(self.read_bytes()).decode('ascii')
+        except BlobNotFoundError:
+            return None
+        return f"data:{self.mime_type or 'image/jpeg'};base64,{encoded}"
+
+    def to_dict(self, include_data=False):
+        """
+        Convert image record to dictionary. The picture is referenced by
+        ``thumbnail_url``; ``include_data`` adds it inline as ``image_base64``,
+        which reads the blob, so it is only meant for single-image responses.
+        """
+        data = {
             'id': self.id,
             'entity_type': self.entity_type,
             'entity_id': self.entity_id,
             'organization_id': self.organization_id,
-            'image_base64': self.image_base64,
+            'content_sha256': self.content_sha256,
+            'thumbnail_url': self.variant_url('thumb'),
             'image_type': self.image_type,
             'file_name': self.file_name,
             'file_size': self.file_size,
@@ -72,3 +105,6 @@ class Image(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
+        if include_data:
+            data['image_base64'] = self.image_base64
+        return data
@@ -52,6 +52,10 @@ class LPRLog(db.Model):
     organization = db.relationship("Organization", backref="lpr_logs")
     camera = db.relationship("Camera")
 
+    __table_args__ = (
+        db.Index("idx_lpr_org_timestamp", "organization_id", "timestamp"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -7,6 +7,10 @@ class PresenceEvent(db.Model):
     """
     Raw presence detection events from cameras.
     Every face detection creates a presence event that can be reviewed and approved.
+
+    On PostgreSQL the table is range-partitioned by month on ``timestamp``
+    (see PresencePartitionService), so the primary and unique keys include it.
+    Filter on ``timestamp`` wherever possible so only matching partitions are scanned.
     """
     __tablename__ = "presence_events"
 
@@ -30,7 +34,7 @@ class PresenceEvent(db.Model):
     
     # Event details
     event_type = db.Column(db.String(20), nullable=False)  # CHECK_IN, CHECK_OUT (from camera_type)
-    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    timestamp = db.Column(db.DateTime, primary_key=True, nullable=False, default=datetime.utcnow, index=True)
     
     # Face recognition details
     confidence_score = db.Column(db.Float)  # Face match confidence (0-1)
@@ -64,6 +68,9 @@ class PresenceEvent(db.Model):
     device_info = db.Column(db.JSON)  # Camera device details
     processing_time_ms = db.Column(db.Integer)  # Time taken for face recognition
     
+    # Client-supplied (or derived) key used to drop duplicates when camera workers retry
+    idempotency_key = db.Column(db.String(64), nullable=True)
+    
     # Flags
     is_unknown_face = db.Column(db.Boolean, default=False)  # Face detected but not recognized
     is_anomaly = db.Column(db.Boolean, default=False)  # Flagged for manual review
@@ -77,7 +84,9 @@ class PresenceEvent(db.Model):
         db.Index("idx_org_timestamp", "organization_id", "timestamp"),
         db.Index("idx_emp_timestamp", "employee_id", "timestamp"),
         db.Index("idx_camera_timestamp", "camera_id", "timestamp"),
-        db.Index("idx_review_status", "review_status", "organization_id"),
+        db.Index("idx_review_status", "review_status", "organization_id", "timestamp", "id"),
+        db.Index("idx_presence_created_at", "created_at", "id"),
+        db.UniqueConstraint("organization_id", "idempotency_key", "timestamp", name="uq_presence_org_idempotency_key"),
     )
 
     def to_dict(self, include_employee=True, include_camera=True):
@@ -0,0 +1,36 @@
+from ..extensions import db
+from datetime import datetime
+
+
+class ProcessingCheckpoint(db.Model):
+    """
+    Resume position for background jobs that stream over append-only tables.
+    One row per job; ``position`` holds the job-specific cursor (JSON).
+    """
+    __tablename__ = "processing_checkpoints"
+
+    name = db.Column(db.String(100), primary_key=True)  # e.g., "attendance_aggregator"
+    position = db.Column(db.JSON, nullable=False, default={})
+    
+    # Audit timestamp
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def load(cls, name):
+        """Return the stored position for a job (empty dict if it never ran)."""
+        checkpoint = db.session.get(cls, name)
+        return dict(checkpoint.position or {}) if checkpoint else {}
+
+    @classmethod
+    def save(cls, name, position):
+        """Stage the new position in the current transaction (caller commits)."""
+        checkpoint = db.session.get(cls, name)
+        if checkpoint is None:
+            checkpoint = cls(name=name)
+            db.session.add(checkpoint)
+        checkpoint.position = position
+        checkpoint.updated_at = datetime.utcnow()
+        return checkpoint
+
+    def __repr__(self):
+        return f"<ProcessingCheckpoint {self.name}>"
@@ -0,0 +1,65 @@
+from ..extensions import db
+from datetime import datetime
+import uuid
+
+
+class ReportSnapshot(db.Model):
+    """
+    Precomputed report for one (organization, department, period).
+    Each regeneration adds a new version; readers are served the newest
+    ready version while a pending one is built in the background.
+    """
+    __tablename__ = "report_snapshots"
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+
+    # Scope of the report
+    organization_id = db.Column(db.String(36), db.ForeignKey("organizations.id"), nullable=False)
+    report_type = db.Column(db.String(50), nullable=False)  # team_performance
+    department_id = db.Column(db.String(36), nullable=False, default="")  # "" for all departments
+    period_start = db.Column(db.Date, nullable=False)
+    period_end = db.Column(db.Date, nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+    # Generation state
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, running, ready, failed
+    data = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    requested_by = db.Column(db.String(36), nullable=True)  # user id of an on-demand refresh
+    generation_ms = db.Column(db.Integer, nullable=True)
+
+    # Audit timestamps
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    generated_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "organization_id", "report_type", "department_id", "period_start", "period_end", "version",
+            name="uq_report_snapshot_version"
+        ),
+        db.Index("idx_report_snapshot_status", "status", "created_at"),
+    )
+
+    def to_dict(self, include_data=False):
+        """Convert snapshot to dictionary"""
+        data = {
+            "id": self.id,
+            "organization_id": self.organization_id,
+            "report_type": self.report_type,
+            "department_id": self.department_id or None,
+            "period_start": self.period_start.isoformat() if self.period_start else None,
+            "period_end": self.period_end.isoformat() if self.period_end else None,
+            "version": self.version,
+            "status": self.status,
+            "error": self.error,
+            "generation_ms": self.generation_ms,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "generated_at": self.generated_at.isoformat() if self.generated_at else None,
+        }
+        if include_data:
+            data["data"] = self.data
+        return data
+
+    def __repr__(self):
+        return f"<ReportSnapshot {self.report_type} {self.organization_id} v{self.version} {self.status}>"
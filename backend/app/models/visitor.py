@@ -1,4 +1,6 @@
 from ..extensions import db
+from ..utils.validators import normalize_phone
+from sqlalchemy.orm import validates
 from datetime import datetime
 import uuid
 
@@ -16,6 +18,8 @@ class OrganizationVisitor(db.Model):
     # Visitor information
     visitor_name = db.Column(db.String(255), nullable=False)
     mobile_number = db.Column(db.String(20), nullable=False)
+    # Digits of mobile_number, kept in sync by the validator below; searched by exact/prefix match
+    mobile_normalized = db.Column(db.String(20), nullable=True)
     email = db.Column(db.String(255), nullable=True)
     purpose_of_visit = db.Column(db.String(500), nullable=False)
     allowed_floor = db.Column(db.String(100), nullable=False)
@@ -115,6 +119,21 @@ class OrganizationVisitor(db.Model):
     organization = db.relationship('Organization', backref='visitors')
     movement_logs = db.relationship('VisitorMovementLog', backref='visitor', cascade='all, delete-orphan')
     alerts = db.relationship('VisitorAlert', backref='visitor', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        db.Index("idx_visitor_org_check_in", "organization_id", "check_in_time"),
+        # Phone search: exact and prefix (LIKE 'digits%') matches within the organization
+        db.Index("idx_visitor_org_mobile", "organization_id", "mobile_normalized",
+                 postgresql_ops={"mobile_normalized": "text_pattern_ops"}),
+        # Name search: pg_trgm similarity / substring matches within the organization (btree_gin)
+        db.Index("idx_visitor_org_name_trgm", "organization_id", "visitor_name",
+                 postgresql_using="gin", postgresql_ops={"visitor_name": "gin_trgm_ops"}),
+    )
+
+    @validates("mobile_number")
+    def _normalize_mobile_number(self, key, value):
+        self.mobile_normalized = normalize_phone(value)
+        return value
     
     # Methods to work with unified Image table
     def get_images(self):
@@ -193,6 +212,10 @@ class VisitorAlert(db.Model):
     # Relationships
     organization = db.relationship('Organization', backref='visitor_alerts')
 
+    __table_args__ = (
+        db.Index("idx_visitor_alert_org_time", "organization_id", "alert_time"),
+    )
+
     def __repr__(self):
         return f"<VisitorAlert {self.visitor_id} - {self.alert_type}>"
 
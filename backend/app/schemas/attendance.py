@@ -151,6 +151,8 @@ class AttendanceRecordSchema(Schema):
     check_out_time = fields.DateTime(allow_none=True)
     status = fields.String(validate=validate.OneOf(['present', 'absent', 'late', 'half_day', 'on_leave', 'holiday']))
     work_hours = fields.Float()
+    is_late = fields.Boolean(dump_only=True)
+    minutes_late = fields.Integer(dump_only=True, allow_none=True)
     location_check_in = fields.Raw(allow_none=True)
     location_check_out = fields.Raw(allow_none=True)
     device_info = fields.Raw(allow_none=True)
@@ -7,7 +7,11 @@ from . import TimestampMixin
 
 
 class EmployeeSchema(Schema, TimestampMixin):
-    """Complete employee schema"""
+    """
+    Complete employee schema. Photos are referenced by id and thumbnail URL;
+    pass ``include_photo_data=True`` for single-employee responses that also
+    need them inline as Base64 (one blob read per image).
+    """
     id = fields.String(dump_only=True)
     user_id = fields.String(required=True)
     organization_id = fields.String(required=True)
@@ -36,6 +40,7 @@ class EmployeeSchema(Schema, TimestampMixin):
     # Photo fields
     photo_id = fields.Method('get_photo_id', dump_only=True)
     photo_base64 = fields.Method('get_photo_base64', dump_only=True)
+    photo_thumbnail_url = fields.Method('get_photo_thumbnail_url', dump_only=True)
     images = fields.Method('get_images', dump_only=True)
     
     # Nested objects (dump_only) - using Method to convert SQLAlchemy objects to dicts
@@ -43,6 +48,10 @@ class EmployeeSchema(Schema, TimestampMixin):
     department = fields.Method('get_department', dump_only=True)
     shift = fields.Method('get_shift', dump_only=True)
     
+    def __init__(self, *args, include_photo_data=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.include_photo_data = include_photo_data
+
     def get_photo_id(self, obj):
         """Get the primary photo ID for this employee"""
         if hasattr(obj, 'get_primary_image'):
@@ -50,9 +59,16 @@ class EmployeeSchema(Schema, TimestampMixin):
             return primary_image.id if primary_image else None
         return None
     
-    def get_photo_base64(self, obj):
-        """Get the primary photo Base64 for this employee"""
+    def get_photo_thumbnail_url(self, obj):
+        """Get the URL of the primary photo thumbnail for this employee"""
         if hasattr(obj, 'get_primary_image'):
+            primary_image = obj.get_primary_image()
+            return primary_image.variant_url('thumb') if primary_image else None
+        return None
+
+    def get_photo_base64(self, obj):
+        """Get the primary photo Base64 for this employee (single-employee responses only)"""
+        if self.include_photo_data and hasattr(obj, 'get_primary_image'):
             primary_image = obj.get_primary_image()
             return primary_image.image_base64 if primary_image else None
         return None
@@ -60,17 +76,22 @@ class EmployeeSchema(Schema, TimestampMixin):
     def get_images(self, obj):
         """Get all images for this employee"""
         if hasattr(obj, 'get_images'):
-            images = obj.get_images()
-            return [{
-                'id': img.id,
-                'image_type': img.image_type,
-                'file_name': img.file_name,
-                'mime_type': img.mime_type,
-                'primary': img.primary,
-                'is_active': img.is_active,
-                'image_base64': img.image_base64,
-                'created_at': img.created_at.isoformat() if img.created_at else None
-            } for img in images]
+            images = []
+            for img in obj.get_images():
+                image = {
+                    'id': img.id,
+                    'image_type': img.image_type,
+                    'file_name': img.file_name,
+                    'mime_type': img.mime_type,
+                    'primary': img.primary,
+                    'is_active': img.is_active,
+                    'thumbnail_url': img.variant_url('thumb'),
+                    'created_at': img.created_at.isoformat() if img.created_at else None
+                }
+                if self.include_photo_data:
+                    image['image_base64'] = img.image_base64
+                images.append(image)
+            return images
         return []
     
     def get_user(self, obj):
@@ -0,0 +1,40 @@
+"""
+Presence event schemas for request/response validation.
+"""
+
+from marshmallow import Schema, fields, validate
+
+
+class PresenceEventBulkIngestSchema(Schema):
+    """
+    Envelope for bulk ingestion from camera workers.
+    Individual events are validated column-wise by PresenceEventService.
+    """
+    organization_id = fields.String(load_default=None)
+    events = fields.List(fields.Raw(), required=True, validate=validate.Length(min=1, max=10000))
+
+
+class PresenceReviewQueueSchema(Schema):
+    """Query parameters for the keyset-paginated review queue"""
+    organization_id = fields.String(load_default=None)
+    review_status = fields.String(
+        load_default='pending',
+        validate=validate.OneOf(['pending', 'approved', 'rejected', 'auto_approved'])
+    )
+    camera_id = fields.String(load_default=None)
+    start = fields.DateTime(load_default=None)
+    end = fields.DateTime(load_default=None)
+    order = fields.String(load_default='asc', validate=validate.OneOf(['asc', 'desc']))
+    limit = fields.Integer(load_default=50, validate=validate.Range(min=1, max=200))
+    cursor = fields.String(load_default=None)
+
+
+class PresenceEventReviewSchema(Schema):
+    """Bulk approve / reject of presence events"""
+    organization_id = fields.String(load_default=None)
+    event_ids = fields.List(fields.String(), required=True, validate=validate.Length(min=1, max=1000))
+    # Timestamps of the earliest and latest events in event_ids, so the UPDATE prunes partitions
+    start = fields.DateTime(required=True)
+    end = fields.DateTime(required=True)
+    review_status = fields.String(required=True, validate=validate.OneOf(['approved', 'rejected']))
+    notes = fields.String(allow_none=True)
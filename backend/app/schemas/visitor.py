@@ -4,6 +4,8 @@ Marshmallow schemas for organization visitor management validation.
 
 from marshmallow import Schema, fields, validates, ValidationError, post_dump
 
+from ..utils.image_variants import variant_url
+
 
 class VisitorCreateSchema(Schema):
     """Schema for creating a new visitor"""
@@ -59,7 +61,11 @@ class VisitorUpdateSchema(Schema):
 
 
 class VisitorResponseSchema(Schema):
-    """Schema for visitor response"""
+    """
+    Schema for visitor response. The photo is referenced by id and thumbnail
+    URL; pass ``include_photo_data=True`` for single-visitor responses that
+    also need it inline as Base64.
+    """
     id = fields.String()
     organization_id = fields.String()
     visitor_name = fields.String()
@@ -78,16 +84,22 @@ class VisitorResponseSchema(Schema):
     
     photo_id = fields.Method('get_photo_id', dump_only=True)
     photo_base64 = fields.Method('get_photo_base64', dump_only=True)
+    photo_thumbnail_url = fields.Method('get_photo_thumbnail_url', dump_only=True)
     visitor_image = fields.Method('get_visitor_image', dump_only=True)  # Alias for frontend compatibility
     
     # New Fields Response
     vehicle_number = fields.String()
+    vehicle_photos = fields.Method('get_vehicle_photos', dump_only=True)
     assets_carried = fields.Raw()
     delivery_package_count = fields.Integer()
     
     created_at = fields.DateTime()
     updated_at = fields.DateTime()
 
+    def __init__(self, *args, include_photo_data=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.include_photo_data = include_photo_data
+
     def get_photo_id(self, obj):
         """Get primary image ID for visitor"""
         if hasattr(obj, 'get_primary_image'):
@@ -95,13 +107,28 @@ class VisitorResponseSchema(Schema):
             return primary_image.id if primary_image else None
         return None
 
-    def get_photo_base64(self, obj):
-        """Get primary image base64 for visitor"""
+    def get_photo_thumbnail_url(self, obj):
+        """Get the URL of the primary photo thumbnail for this visitor"""
         if hasattr(obj, 'get_primary_image'):
+            primary_image = obj.get_primary_image()
+            return primary_image.variant_url('thumb') if primary_image else None
+        return None
+
+    def get_photo_base64(self, obj):
+        """Get primary image base64 for visitor (single-visitor responses only)"""
+        if self.include_photo_data and hasattr(obj, 'get_primary_image'):
             primary_image = obj.get_primary_image()
             return primary_image.image_base64 if primary_image else None
         return None
 
+    def get_vehicle_photos(self, obj):
+        """Vehicle photos with a signed URL of the original for each stored image id"""
+        return [
+            {**photo, 'url': variant_url(photo['image_id'], 'original')}
+            for photo in (getattr(obj, 'vehicle_photos', None) or [])
+            if photo.get('image_id')
+        ]
+
     def get_visitor_image(self, obj):
         """Get visitor image as base64 (alias for photo_base64 for frontend compatibility)"""
         return self.get_photo_base64(obj)
@@ -49,6 +49,7 @@ def create_roles():
                 "shifts": ["create", "read", "update", "delete"],
                 "visitors": ["create", "read", "update", "delete", "checkin", "checkout"],
                 "cameras": ["read"],
+                "presence_events": ["create", "read", "approve"],
                 "locations": ["read"],
                 "analytics": ["read"],
                 "settings": ["read", "update"],
@@ -62,6 +63,7 @@ def create_roles():
                 "employees": ["read", "update"],
                 "users": ["read"],
                 "attendance": ["read", "update", "approve"],
+                "presence_events": ["read", "approve"],
                 "leaves": ["read", "approve", "reject"],
                 "shifts": ["read"],
                 "analytics": ["read"],
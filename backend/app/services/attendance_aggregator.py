@@ -0,0 +1,313 @@
+"""
+Streaming aggregation of PresenceEvents into AttendanceRecords.
+"""
+
+import time
+import uuid
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_, tuple_, insert, update, bindparam
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from ..models import PresenceEvent, AttendanceRecord, ProcessingCheckpoint
+from .attendance_stats_service import AttendanceStatsService
+from .lateness_service import LatenessService, compute_lateness
+from .realtime_service import RealtimeService
+from .top_performers_service import TopPerformersService
+from .presence_event_service import INGEST_MAX_TRANSACTION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = "attendance_aggregator"
+# Events are read by created_at, which bulk_ingest stamps before committing.
+# Ingest rolls back batches that would commit more than
+# INGEST_MAX_TRANSACTION_SECONDS after stamping, so events younger than this
+# lag may still appear but older ones never will.
+AGGREGATOR_SAFETY_LAG_SECONDS = 3 * INGEST_MAX_TRANSACTION_SECONDS
+
+
+class _DayState:
+    """In-memory first-in / last-out for one (employee, date)."""
+    __slots__ = ("organization_id", "camera_id", "first_in", "last_out", "event_ids", "dirty")
+
+    def __init__(self, organization_id):
+        self.organization_id = organization_id
+        self.camera_id = None
+        self.first_in = None
+        self.last_out = None
+        self.event_ids = []
+        self.dirty = False
+
+    def apply(self, event):
+        if event.event_type == "CHECK_IN":
+            if self.first_in is None or event.timestamp < self.first_in:
+                self.first_in = event.timestamp
+                self.camera_id = event.camera_id
+                self.dirty = True
+        elif event.event_type == "CHECK_OUT":
+            if self.last_out is None or event.timestamp > self.last_out:
+                self.last_out = event.timestamp
+                self.dirty = True
+        # Timestamp kept with the id so the link UPDATE can prune partitions
+        self.event_ids.append((event.id, event.timestamp))
+
+
+def _merge_earliest(a, b):
+    values = [v for v in (a, b) if v is not None]
+    return min(values) if values else None
+
+
+def _merge_latest(a, b):
+    values = [v for v in (a, b) if v is not None]
+    return max(values) if values else None
+
+
+def _work_hours(check_in, check_out):
+    if check_in and check_out and check_out > check_in:
+        return round((check_out - check_in).total_seconds() / 3600, 2)
+    return 0.0
+
+
+class AttendanceAggregator:
+    """
+    Consumes presence events in ingestion order from a persisted checkpoint and
+    keeps first-in / last-out per (employee, date) in memory. Changed days are
+    written back to ``attendance_records`` in batches: one SELECT for the
+    affected rows, one executemany UPDATE and one multi-row INSERT per flush,
+    followed by a refresh of the attendance_daily_stats days they touched.
+
+    Late and out-of-order events are handled by min/max merging against both
+    the in-memory state and the stored record, so replaying events after a
+    crash is harmless. Records corrected by hand (``is_modified``) are left alone.
+
+    Usage:
+        aggregator = AttendanceAggregator()
+        aggregator.run_once()       # process what is available now
+        aggregator.run_forever(5)   # poll every 5 seconds
+    """
+
+    def __init__(self, batch_size=5000, safety_lag_seconds=AGGREGATOR_SAFETY_LAG_SECONDS, retain_days=2,
+                 checkpoint_name=CHECKPOINT_NAME):
+        self.batch_size = batch_size
+        # Skip events younger than this so transactions still committing are not overtaken
+        self.safety_lag = timedelta(seconds=safety_lag_seconds)
+        self.retain_days = retain_days
+        self.checkpoint_name = checkpoint_name
+
+        self.state = {}
+        self.position = None
+        # Records and (organization_id, date) pairs changed by the last flush,
+        # published once committed
+        self.written = []
+        self.changed_days = set()
+
+    # ------------------------------------------------------------------ reading
+
+    def _load_position(self):
+        if self.position is None:
+            position = ProcessingCheckpoint.load(self.checkpoint_name)
+            created_at = position.get("created_at")
+            self.position = {
+                "created_at": datetime.fromisoformat(created_at) if created_at else None,
+                "id": position.get("id"),
+            }
+        return self.position
+
+    def _fetch_batch(self):
+        position = self._load_position()
+        query = PresenceEvent.query.with_entities(
+            PresenceEvent.id,
+            PresenceEvent.organization_id,
+            PresenceEvent.employee_id,
+            PresenceEvent.camera_id,
+            PresenceEvent.event_type,
+            PresenceEvent.timestamp,
+            PresenceEvent.review_status,
+            PresenceEvent.created_at,
+        ).filter(PresenceEvent.created_at <= datetime.utcnow() - self.safety_lag)
+
+        if position["created_at"] is not None:
+            query = query.filter(or_(
+                PresenceEvent.created_at > position["created_at"],
+                and_(PresenceEvent.created_at == position["created_at"], PresenceEvent.id > position["id"])
+            ))
+
+        return query.order_by(PresenceEvent.created_at, PresenceEvent.id).limit(self.batch_size).all()
+
+    # ------------------------------------------------------------------ state
+
+    def apply_events(self, events):
+        """Fold a batch of events into the in-memory state (timestamp order)."""
+        for event in sorted(events, key=lambda e: e.timestamp):
+            if not event.employee_id or event.review_status == "rejected":
+                continue
+            key = (event.employee_id, event.timestamp.date())
+            day = self.state.get(key)
+            if day is None:
+                day = self.state[key] = _DayState(event.organization_id)
+            day.apply(event)
+
+    def _evict_old_days(self):
+        if not self.state:
+            return
+        newest = max(d for _, d in self.state)
+        cutoff = newest - timedelta(days=self.retain_days)
+        self.state = {k: v for k, v in self.state.items() if k[1] >= cutoff or v.dirty}
+
+    # ------------------------------------------------------------------ writing
+
+    def _flush(self):
+        """Write dirty days to attendance_records. Caller owns the transaction."""
+        # Days whose times did not change still need their new events linked
+        dirty = {k: v for k, v in self.state.items() if v.dirty or v.event_ids}
+        self.written = []
+        self.changed_days = set()
+        if not dirty:
+            return 0
+
+        existing = {
+            (r.employee_id, r.date): r for r in db.session.query(
+                AttendanceRecord.id,
+                AttendanceRecord.employee_id,
+                AttendanceRecord.date,
+                AttendanceRecord.check_in_time,
+                AttendanceRecord.check_out_time,
+                AttendanceRecord.is_modified,
+            ).filter(tuple_(AttendanceRecord.employee_id, AttendanceRecord.date).in_(list(dirty)))
+        }
+
+        now = datetime.utcnow()
+        rules = LatenessService.shift_rules({employee_id for employee_id, _ in dirty})
+        updates, inserts, links, written = [], [], [], []
+        changed_days = set()
+        for (employee_id, day), st in dirty.items():
+            record = existing.get((employee_id, day))
+            if record is not None:
+                if record.is_modified:
+                    continue
+                check_in = _merge_earliest(record.check_in_time, st.first_in)
+                check_out = _merge_latest(record.check_out_time, st.last_out)
+                if check_in == record.check_in_time and check_out == record.check_out_time:
+                    record_id = record.id
+                else:
+                    changed_days.add((st.organization_id, day))
+                    is_late, minutes_late = compute_lateness(check_in, *rules.get(employee_id, (None, 0, None)))
+                    updates.append({
+                        "id": record.id,
+                        "check_in_time": check_in,
+                        "check_out_time": check_out,
+                        "work_hours": _work_hours(check_in, check_out),
+                        "is_late": is_late,
+                        "minutes_late": minutes_late,
+                        "updated_at": now,
+                    })
+                    written.append({
+                        "organization_id": st.organization_id, "employee_id": employee_id, "date": day,
+                        "check_in_time": check_in, "check_out_time": check_out, "is_late": is_late,
+                    })
+                    record_id = record.id
+            else:
+                record_id = str(uuid.uuid4())
+                changed_days.add((st.organization_id, day))
+                is_late, minutes_late = compute_lateness(st.first_in, *rules.get(employee_id, (None, 0, None)))
+                inserts.append({
+                    "id": record_id,
+                    "employee_id": employee_id,
+                    "organization_id": st.organization_id,
+                    "camera_id": st.camera_id,
+                    "date": day,
+                    "check_in_time": st.first_in,
+                    "check_out_time": st.last_out,
+                    "status": "present",
+                    "work_hours": _work_hours(st.first_in, st.last_out),
+                    "is_late": is_late,
+                    "minutes_late": minutes_late,
+                    "review_status": "auto_approved",
+                    "is_modified": False,
+                    "liveness_verified": False,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                written.append(inserts[-1])
+            links.extend(
+                {"event_id": event_id, "event_ts": timestamp, "record_id": record_id}
+                for event_id, timestamp in st.event_ids
+            )
+
+        if updates:
+            db.session.execute(update(AttendanceRecord), updates)
+        if inserts:
+            db.session.execute(insert(AttendanceRecord.__table__), inserts)
+        if links:
+            table = PresenceEvent.__table__
+            db.session.execute(
+                table.update()
+                .where(table.c.id == bindparam("event_id"), table.c.timestamp == bindparam("event_ts"))
+                .values(attendance_record_id=bindparam("record_id")),
+                links
+            )
+        if changed_days:
+            AttendanceStatsService.refresh_days(changed_days)
+
+        self.written = written
+        self.changed_days = changed_days
+        return len(updates) + len(inserts)
+
+    def _mark_clean(self):
+        for st in self.state.values():
+            st.dirty = False
+            st.event_ids = []
+
+    # ------------------------------------------------------------------ driver
+
+    def run_once(self):
+        """
+        Process one batch from the checkpoint and commit results + checkpoint
+        in the same transaction.
+
+        Returns:
+            dict with events consumed and attendance records written
+        """
+        events = self._fetch_batch()
+        if not events:
+            return {"events": 0, "records": 0}
+
+        self.apply_events(events)
+        last = events[-1]
+        new_position = {"created_at": last.created_at, "id": last.id}
+
+        for attempt in range(2):
+            try:
+                written = self._flush()
+                ProcessingCheckpoint.save(self.checkpoint_name, {
+                    "created_at": new_position["created_at"].isoformat(),
+                    "id": new_position["id"],
+                })
+                db.session.commit()
+                break
+            except IntegrityError:
+                # A record was created concurrently (e.g. manual check-in); re-read and merge
+                db.session.rollback()
+                if attempt:
+                    raise
+
+        self.position = new_position
+        RealtimeService.attendance_changed(self.written)
+        TopPerformersService.invalidate_days(self.changed_days)
+        self._mark_clean()
+        self._evict_old_days()
+        return {"events": len(events), "records": written}
+
+    def run_forever(self, interval_seconds=5):
+        """Poll for new events until interrupted."""
+        logger.info("Attendance aggregator started")
+        while True:
+            try:
+                result = self.run_once()
+            except Exception:
+                db.session.rollback()
+                logger.exception("Attendance aggregation batch failed")
+                result = {"events": 0}
+            # Drain backlog without sleeping; otherwise wait for new events
+            if result["events"] < self.batch_size:
+                time.sleep(interval_seconds)
@@ -6,6 +6,9 @@ from datetime import datetime, date
 from ..extensions import db
 from ..models import AttendanceChangeRequest, Employee, AttendanceRecord
 from ..utils.exceptions import NotFoundError, ValidationError, ForbiddenError, ConflictError
+from .attendance_stats_service import AttendanceStatsService
+from .lateness_service import LatenessService
+from .top_performers_service import TopPerformersService
 
 
 class AttendanceChangeRequestService:
@@ -189,6 +192,8 @@ class AttendanceChangeRequestService:
                 attendance.check_in_time = datetime.fromisoformat(requested_changes['check_in_time'])
             except (ValueError, TypeError):
                 pass
+            else:
+                LatenessService.apply(attendance, attendance.employee or Employee.query.get(employee_id))
         
         if 'check_out_time' in requested_changes:
             try:
@@ -212,7 +217,9 @@ class AttendanceChangeRequestService:
         attendance.is_modified = True
         attendance.modified_by_request_id = change_request.id
         
+        AttendanceStatsService.refresh(attendance.organization_id, attendance.date)
         db.session.commit()
+        TopPerformersService.invalidate(attendance.organization_id, attendance.date)
         
         return change_request
 
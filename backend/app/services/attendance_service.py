@@ -2,9 +2,13 @@
 Business logic for Attendance management.
 """
 
-from sqlalchemy import or_, and_, case
+from sqlalchemy import or_, and_
 from ..extensions import db
 from ..models import AttendanceRecord, Employee
+from .attendance_stats_service import AttendanceStatsService
+from .lateness_service import LatenessService
+from .realtime_service import RealtimeService
+from .top_performers_service import TopPerformersService
 from ..utils.exceptions import NotFoundError, ConflictError, BadRequestError
 from datetime import datetime, date, timedelta
 
@@ -44,6 +48,7 @@ class AttendanceService:
                 status='present'
             )
             db.session.add(attendance)
+        LatenessService.apply(attendance, employee)
         
         # Update optional fields
         if data.get('camera_id'):
@@ -57,7 +62,10 @@ class AttendanceService:
         if data.get('liveness_verified'):
             attendance.liveness_verified = data['liveness_verified']
         
+        AttendanceStatsService.refresh(employee.organization_id, today, employee=employee)
         db.session.commit()
+        TopPerformersService.invalidate(employee.organization_id, today)
+        RealtimeService.attendance_changed([attendance])
         
         return attendance
     
@@ -101,7 +109,10 @@ class AttendanceService:
         if data.get('device_info') and not attendance.device_info:
             attendance.device_info = data['device_info']
         
+        AttendanceStatsService.refresh(employee.organization_id, today, employee=employee)
         db.session.commit()
+        TopPerformersService.invalidate(employee.organization_id, today)
+        RealtimeService.attendance_changed([attendance])
         
         return attendance
     
@@ -178,6 +189,7 @@ class AttendanceService:
     def update_attendance(attendance_id, data):
         """Update an attendance record"""
         attendance = AttendanceService.get_attendance(attendance_id)
+        previous_date = attendance.date
         
         # Update fields
         for key, value in data.items():
@@ -188,8 +200,18 @@ class AttendanceService:
             time_diff = attendance.check_out_time - attendance.check_in_time
             attendance.work_hours = round(time_diff.total_seconds() / 3600, 2)
         
+        if 'check_in_time' in data:
+            LatenessService.apply(attendance, attendance.employee)
+        
         attendance.updated_at = datetime.utcnow()
+        changed_days = {
+            (attendance.organization_id, previous_date),
+            (attendance.organization_id, attendance.date),
+        }
+        AttendanceStatsService.refresh_days(changed_days)
         db.session.commit()
+        TopPerformersService.invalidate_days(changed_days)
+        RealtimeService.attendance_changed([attendance])
         
         return attendance
     
@@ -200,7 +222,9 @@ class AttendanceService:
         
         # Hard delete (attendance records don't have soft delete)
         db.session.delete(attendance)
+        AttendanceStatsService.refresh(attendance.organization_id, attendance.date)
         db.session.commit()
+        TopPerformersService.invalidate(attendance.organization_id, attendance.date)
         
         return True
     
@@ -227,8 +251,8 @@ class AttendanceService:
 
         Returns a dict with daily series, summary stats and distributions.
         """
-        from sqlalchemy import func, distinct
-        from ..models import AttendanceRecord, Employee, Shift, Department
+        from sqlalchemy import func
+        from ..models import Employee, Department
 
         if filters is None:
             filters = {}
@@ -251,85 +275,19 @@ class AttendanceService:
 
         total_active = emp_q.scalar() or 0
 
-        # Daily present and late counts
-        ar = AttendanceRecord
-        # base attendance query
-        base_q = db.session.query(
-            ar.date.label('date'),
-            func.count(distinct(ar.employee_id)).label('present_count'),
-            func.sum(case((ar.check_in_time != None, 1), else_=0)).label('records_with_checkin'),
-            func.avg(ar.work_hours).label('avg_work_hours')
-        ).filter(
-            ar.organization_id == organization_id,
-            ar.date >= start_date,
-            ar.date <= end_date
-        )
-
-        if filters.get('department_id'):
-            base_q = base_q.join(Employee).filter(Employee.department_id == filters['department_id'])
-        if filters.get('employment_type'):
-            base_q = base_q.join(Employee).filter(Employee.employment_type == filters['employment_type'])
-
-        base_q = base_q.group_by(ar.date).order_by(ar.date)
-
-        daily = []
-        try:
-            rows = base_q.all()
-        except Exception:
-            db.session.rollback()
-            rows = []
-
-        date_map = { }
-        for r in rows:
-            date_map[r.date.isoformat()] = {
-                'date': r.date.isoformat(),
-                'present': int(r.present_count or 0),
-                'late': 0,  # late needs separate calculation
-                'avg_work_hours': float(r.avg_work_hours or 0)
-            }
-
-        # Calculate late counts per day by comparing check_in_time to shift start_time + grace
-        # Join AttendanceRecord -> Employee -> Shift and compute late where possible
-        late_q = db.session.query(
-            ar.date.label('date'),
-            func.count(distinct(ar.employee_id)).label('late_count')
-        ).join(Employee, Employee.id == ar.employee_id).outerjoin(Shift, Shift.id == Employee.shift_id)
-        late_q = late_q.filter(
-            ar.organization_id == organization_id,
-            ar.date >= start_date,
-            ar.date <= end_date,
-            ar.check_in_time != None,
-            Shift.id != None  # Only count records where shift exists
-        )
-        # late condition: check_in_time > (date + shift.start_time + grace)
-        # perform as numeric comparison using extract
-        late_q = late_q.filter(
-            func.extract('hour', ar.check_in_time) * 60 + func.extract('minute', ar.check_in_time) > (
-                func.extract('hour', Shift.start_time) * 60 + func.extract('minute', Shift.start_time) + Shift.grace_period_minutes
-            )
-        ).group_by(ar.date).order_by(ar.date)
-
-        try:
-            late_rows = late_q.all()
-        except Exception as e:
-            print(f"[get_organization_attendance_summary] Error calculating late counts: {e}")
-            db.session.rollback()
-            late_rows = []
-
-        for r in late_rows:
-            key = r.date.isoformat()
-            if key in date_map:
-                date_map[key]['late'] = int(r.late_count or 0)
-            else:
-                date_map[key] = {'date': key, 'present': 0, 'late': int(r.late_count or 0), 'avg_work_hours': 0}
+        # Daily present, late and absent counts come from the attendance_daily_stats rollup
+        date_map = {
+            day.isoformat(): {'date': day.isoformat(), **totals}
+            for day, totals in AttendanceStatsService.daily_totals(organization_id, start_date, end_date, filters).items()
+        }
 
         # Build series covering full range
+        daily = []
         cur = start_date
         while cur <= end_date:
             key = cur.isoformat()
-            entry = date_map.get(key, {'date': key, 'present': 0, 'late': 0, 'avg_work_hours': 0})
-            # absent estimation
-            entry['absent'] = max(0, total_active - entry['present']) if total_active > 0 else 0
+            # Days the rollup has not covered yet count everyone active as absent
+            entry = date_map.get(key, {'date': key, 'present': 0, 'late': 0, 'absent': total_active, 'avg_work_hours': 0})
             daily.append(entry)
             cur = cur + timedelta(days=1)
 
@@ -384,3 +342,98 @@ class AttendanceService:
         }
 
         return payload
+
+    @staticmethod
+    def get_employees_attendance_summary(organization_id, start_date, end_date, page=1, per_page=50):
+        """Per-employee attendance totals for one page of an organization's active employees.
+
+        The page of employees is selected once (as a CTE, with the total count
+        as a window over the unpaginated rows) and attendance and approved
+        leave are aggregated only for those employees, so the whole page is one
+        statement whatever ``per_page`` is.
+
+        Returns a dict with items and pagination.
+        """
+        from sqlalchemy import func
+        from ..models import Department, LeaveRequest
+
+        ar = AttendanceRecord
+        page_employees = db.session.query(
+            Employee.id,
+            Employee.full_name,
+            Employee.employee_code,
+            Employee.department_id,
+            func.count().over().label('total')
+        ).filter(
+            Employee.organization_id == organization_id,
+            Employee.is_active.is_(True),
+            Employee.deleted_at.is_(None)
+        ).order_by(Employee.full_name, Employee.id).offset((page - 1) * per_page).limit(per_page).cte('page_employees')
+
+        attendance = db.session.query(
+            ar.employee_id,
+            func.count(ar.id).label('present_days'),
+            func.avg(ar.work_hours).label('avg_hours')
+        ).join(page_employees, page_employees.c.id == ar.employee_id).filter(
+            ar.date >= start_date,
+            ar.date <= end_date,
+            ar.check_in_time.isnot(None)
+        ).group_by(ar.employee_id).subquery()
+
+        leaves = db.session.query(
+            LeaveRequest.employee_id,
+            func.count(LeaveRequest.id).label('leave_count')
+        ).join(page_employees, page_employees.c.id == LeaveRequest.employee_id).filter(
+            LeaveRequest.status == 'approved',
+            LeaveRequest.start_date <= end_date,
+            LeaveRequest.end_date >= start_date
+        ).group_by(LeaveRequest.employee_id).subquery()
+
+        rows = db.session.query(
+            page_employees,
+            Department.name.label('department'),
+            attendance.c.present_days,
+            attendance.c.avg_hours,
+            leaves.c.leave_count
+        ).outerjoin(Department, Department.id == page_employees.c.department_id) \
+            .outerjoin(attendance, attendance.c.employee_id == page_employees.c.id) \
+            .outerjoin(leaves, leaves.c.employee_id == page_employees.c.id) \
+            .order_by(page_employees.c.full_name, page_employees.c.id).all()
+
+        if rows:
+            total = rows[0].total
+        elif page > 1:
+            # Past the last page the window has no rows to report the total on
+            total = Employee.query.filter(
+                Employee.organization_id == organization_id,
+                Employee.is_active.is_(True),
+                Employee.deleted_at.is_(None)
+            ).count()
+        else:
+            total = 0
+
+        total_days = (end_date - start_date).days + 1
+        items = []
+        for r in rows:
+            present_days = int(r.present_days or 0)
+            items.append({
+                'employee_id': r.id,
+                'full_name': r.full_name,
+                'employee_code': r.employee_code,
+                'department': r.department or '',
+                'present_days': present_days,
+                'absent_days': max(0, total_days - present_days),
+                'leave_count': int(r.leave_count or 0),
+                'avg_hours_per_day': round(float(r.avg_hours or 0), 1),
+                'attendance_percentage': round((present_days / total_days * 100), 1) if total_days > 0 else 0
+            })
+
+        return {
+            'items': items,
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'pages': (total + per_page - 1) // per_page
+            }
+        }
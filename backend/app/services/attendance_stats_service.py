@@ -0,0 +1,246 @@
+"""
+Maintenance of the attendance_daily_stats rollup.
+"""
+
+import logging
+from datetime import datetime, date, timedelta
+from sqlalchemy import func, case, insert, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from ..extensions import db
+from ..models import AttendanceRecord, AttendanceDailyStat, Employee, Organization
+from .top_performers_service import TopPerformersService
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ["organization_id", "date", "department_id", "employment_type"]
+VALUE_COLUMNS = ["present_count", "late_count", "absent_count", "work_hours_total", "work_hours_count", "updated_at"]
+
+# Days recomputed per statement by reconcile; keeps each transaction short
+RECONCILE_CHUNK_DAYS = 31
+UPSERT_CHUNK_SIZE = 1000
+
+
+def _employment_type():
+    return func.coalesce(Employee.employment_type, "")
+
+
+def _days(start_date, end_date):
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+class AttendanceStatsService:
+    """
+    Keeps attendance_daily_stats in step with attendance_records.
+
+    Write paths that change attendance (check-in/out, edits, the presence
+    aggregator, auto check-out) call ``refresh`` for the days they touched,
+    inside their own transaction. ``reconcile`` recomputes a date range for
+    every organization and runs nightly to pick up everything else (seeded or
+    imported records, employees moving department, deactivations).
+    Refreshing a range also drops the cached top performer rankings of its months.
+    """
+
+    @staticmethod
+    def _compute(organization_id, start_date, end_date, group, now):
+        """Rollup rows for one organization and date range, optionally one (department, type) group."""
+        ar = AttendanceRecord
+        employment_type = _employment_type()
+
+        attendance = db.session.query(
+            ar.date,
+            Employee.department_id,
+            employment_type.label("employment_type"),
+            func.count(ar.id).label("present"),
+            func.sum(case((ar.is_late.is_(True), 1), else_=0)).label("late"),
+            func.sum(case((ar.check_out_time.isnot(None), ar.work_hours), else_=0)).label("hours_total"),
+            func.count(ar.check_out_time).label("hours_count"),
+        ).join(Employee, Employee.id == ar.employee_id).filter(
+            ar.organization_id == organization_id,
+            ar.date >= start_date,
+            ar.date <= end_date,
+            ar.check_in_time.isnot(None),
+        )
+        headcount = db.session.query(
+            Employee.department_id,
+            employment_type.label("employment_type"),
+            func.count(Employee.id).label("active"),
+        ).filter(
+            Employee.organization_id == organization_id,
+            Employee.is_active.is_(True),
+            Employee.deleted_at.is_(None),
+        )
+        if group is not None:
+            department_id, type_key = group
+            attendance = attendance.filter(Employee.department_id == department_id, employment_type == type_key)
+            headcount = headcount.filter(Employee.department_id == department_id, employment_type == type_key)
+
+        active = {
+            (r.department_id, r.employment_type): r.active
+            for r in headcount.group_by(Employee.department_id, employment_type)
+        }
+        present = {}
+        for r in attendance.group_by(ar.date, Employee.department_id, employment_type):
+            present.setdefault(r.date, {})[(r.department_id, r.employment_type)] = r
+
+        rows = []
+        for day in _days(start_date, end_date):
+            day_rows = present.get(day, {})
+            for key in set(active) | set(day_rows):
+                r = day_rows.get(key)
+                present_count = int(r.present) if r else 0
+                rows.append({
+                    "organization_id": organization_id,
+                    "date": day,
+                    "department_id": key[0],
+                    "employment_type": key[1],
+                    "present_count": present_count,
+                    "late_count": int(r.late or 0) if r else 0,
+                    "absent_count": max(0, active.get(key, 0) - present_count),
+                    "work_hours_total": float(r.hours_total or 0) if r else 0.0,
+                    "work_hours_count": int(r.hours_count or 0) if r else 0,
+                    "updated_at": now,
+                })
+        return rows
+
+    @staticmethod
+    def _upsert(rows):
+        table = AttendanceDailyStat.__table__
+        dialect = db.session.get_bind().dialect.name
+
+        if dialect in ('postgresql', 'sqlite'):
+            dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=KEY_COLUMNS,
+                set_={column: stmt.excluded[column] for column in VALUE_COLUMNS}
+            )
+        else:
+            stmt = insert(table)
+            for row in rows:
+                db.session.execute(delete(table).where(*(table.c[c] == row[c] for c in KEY_COLUMNS)))
+
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            db.session.execute(stmt, rows[start:start + UPSERT_CHUNK_SIZE])
+
+    @staticmethod
+    def refresh(organization_id, start_date, end_date=None, employee=None):
+        """
+        Recompute the rollup of one organization for ``start_date``..``end_date``
+        (inclusive). With ``employee`` only that employee's department and
+        employment type are recomputed, which is all a single check-in or
+        check-out can change. Caller owns the transaction and invalidates
+        the range's TopPerformersService rankings once it is committed.
+
+        Returns:
+            Number of rollup rows written
+        """
+        end_date = end_date or start_date
+        group = (employee.department_id, employee.employment_type or "") if employee is not None else None
+        now = datetime.utcnow()
+
+        rows = AttendanceStatsService._compute(organization_id, start_date, end_date, group, now)
+        if rows:
+            AttendanceStatsService._upsert(rows)
+
+        # Groups that no longer have employees or records in the range
+        stale = delete(AttendanceDailyStat).where(
+            AttendanceDailyStat.organization_id == organization_id,
+            AttendanceDailyStat.date >= start_date,
+            AttendanceDailyStat.date <= end_date,
+            AttendanceDailyStat.updated_at < now,
+        )
+        if group is not None:
+            stale = stale.where(
+                AttendanceDailyStat.department_id == group[0],
+                AttendanceDailyStat.employment_type == group[1],
+            )
+        db.session.execute(stale.execution_options(synchronize_session=False))
+        return len(rows)
+
+    @staticmethod
+    def refresh_days(days):
+        """
+        Refresh every (organization_id, date) pair in ``days``, one range per
+        organization. Caller owns the transaction.
+        """
+        ranges = {}
+        for organization_id, day in days:
+            low, high = ranges.get(organization_id, (day, day))
+            ranges[organization_id] = (min(low, day), max(high, day))
+        return sum(
+            AttendanceStatsService.refresh(organization_id, low, high)
+            for organization_id, (low, high) in ranges.items()
+        )
+
+    @staticmethod
+    def reconcile(start_date=None, end_date=None, organization_ids=None):
+        """
+        Recompute the rollup for all (or the given) organizations, committing
+        one organization-month at a time. Defaults to yesterday and today.
+
+        Returns:
+            dict with organizations processed and rollup rows written
+        """
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=1)
+
+        if organization_ids is None:
+            organization_ids = [
+                org_id for (org_id,) in db.session.query(Organization.id)
+                .filter(Organization.deleted_at.is_(None))
+                .order_by(Organization.id)
+            ]
+
+        written = 0
+        for organization_id in organization_ids:
+            chunk_start = start_date
+            while chunk_start <= end_date:
+                chunk_end = min(end_date, chunk_start + timedelta(days=RECONCILE_CHUNK_DAYS - 1))
+                written += AttendanceStatsService.refresh(organization_id, chunk_start, chunk_end)
+                db.session.commit()
+                TopPerformersService.invalidate(organization_id, chunk_start, chunk_end)
+                chunk_start = chunk_end + timedelta(days=1)
+            logger.info(f"Reconciled attendance stats for organization {organization_id}")
+
+        return {"organizations": len(organization_ids), "rows": written}
+
+    @staticmethod
+    def daily_totals(organization_id, start_date, end_date, filters=None):
+        """
+        Per-day totals from the rollup, optionally restricted to a department
+        and/or employment type.
+
+        Returns:
+            dict of date -> {'present', 'late', 'absent', 'avg_work_hours'}
+        """
+        filters = filters or {}
+        st = AttendanceDailyStat
+        query = db.session.query(
+            st.date,
+            func.sum(st.present_count).label("present"),
+            func.sum(st.late_count).label("late"),
+            func.sum(st.absent_count).label("absent"),
+            func.sum(st.work_hours_total).label("hours_total"),
+            func.sum(st.work_hours_count).label("hours_count"),
+        ).filter(
+            st.organization_id == organization_id,
+            st.date >= start_date,
+            st.date <= end_date,
+        )
+        if filters.get('department_id'):
+            query = query.filter(st.department_id == filters['department_id'])
+        if filters.get('employment_type'):
+            query = query.filter(st.employment_type == filters['employment_type'])
+
+        return {
+            r.date: {
+                'present': int(r.present or 0),
+                'late': int(r.late or 0),
+                'absent': int(r.absent or 0),
+                'avg_work_hours': float(r.hours_total or 0) / r.hours_count if r.hours_count else 0,
+            }
+            for r in query.group_by(st.date)
+        }
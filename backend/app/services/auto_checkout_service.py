@@ -0,0 +1,134 @@
+"""
+Closing attendance records left open by people who never checked out.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, func, cast, literal_column, Float
+from ..extensions import db
+from ..models import AttendanceRecord, Camera, ProcessingCheckpoint
+from .attendance_stats_service import AttendanceStatsService
+from .top_performers_service import TopPerformersService
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = "auto_check_out"
+
+# Camera.auto_check_out_hours default; also used for records without a camera
+DEFAULT_AUTO_CHECK_OUT_HOURS = 12
+# Smallest threshold a camera can be configured with (see CameraSchema)
+MIN_AUTO_CHECK_OUT_HOURS = 1
+
+
+def _add_hours(timestamp, hours, dialect):
+    """``timestamp + hours`` as a SQL expression."""
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m-%d %H:%M:%f", timestamp, func.printf("+%d hours", hours), type_=db.DateTime)
+    return timestamp + hours * literal_column("interval '1 hour'")
+
+
+class AutoCheckOutSweeper:
+    """
+    Checks out attendance records that are still open after the check-in
+    camera's ``auto_check_out_hours``.
+
+    Each organization is handled by one UPDATE that computes the threshold,
+    check-out time and work hours in SQL, so no records are loaded into
+    Python. Progress is checkpointed per organization: an interrupted run
+    resumes after the last organization it committed. Records corrected by
+    hand (``is_modified``) are left alone.
+
+    Usage:
+        AutoCheckOutSweeper().run()
+    """
+
+    def __init__(self, default_hours=DEFAULT_AUTO_CHECK_OUT_HOURS, checkpoint_name=CHECKPOINT_NAME):
+        self.default_hours = default_hours
+        self.checkpoint_name = checkpoint_name
+
+    def _open_records(self):
+        return (
+            AttendanceRecord.check_out_time.is_(None),
+            AttendanceRecord.check_in_time.isnot(None),
+            AttendanceRecord.is_modified.isnot(True),
+        )
+
+    def _pending_organizations(self, after_org_id, now):
+        query = db.session.query(AttendanceRecord.organization_id).filter(
+            *self._open_records(),
+            AttendanceRecord.check_in_time <= now - timedelta(hours=MIN_AUTO_CHECK_OUT_HOURS),
+        )
+        if after_org_id:
+            query = query.filter(AttendanceRecord.organization_id > after_org_id)
+        return [row.organization_id for row in query.distinct().order_by(AttendanceRecord.organization_id)]
+
+    def close_organization(self, organization_id, now):
+        """
+        Close every overdue open record of one organization with a single UPDATE
+        and refresh the attendance_daily_stats days it touched. Caller owns the
+        transaction.
+
+        Returns:
+            Dates of the records checked out, one per record
+        """
+        dialect = db.session.get_bind().dialect.name
+
+        hours = func.coalesce(
+            select(Camera.auto_check_out_hours)
+            .where(Camera.id == AttendanceRecord.camera_id)
+            .scalar_subquery(),
+            self.default_hours
+        )
+        check_out = _add_hours(AttendanceRecord.check_in_time, hours, dialect)
+
+        closed_dates = db.session.execute(
+            update(AttendanceRecord)
+            .where(
+                AttendanceRecord.organization_id == organization_id,
+                *self._open_records(),
+                AttendanceRecord.check_in_time <= now - timedelta(hours=MIN_AUTO_CHECK_OUT_HOURS),
+                check_out <= now,
+            )
+            .values(
+                check_out_time=check_out,
+                work_hours=cast(hours, Float),
+                notes=func.coalesce(AttendanceRecord.notes, "Auto check-out"),
+                updated_at=now,
+            )
+            .returning(AttendanceRecord.date)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        if closed_dates:
+            AttendanceStatsService.refresh(organization_id, min(closed_dates), max(closed_dates))
+        return closed_dates
+
+    def run(self, now=None):
+        """
+        Sweep all organizations with open records, resuming an interrupted run.
+
+        Returns:
+            dict with organizations processed, records closed and per-organization counts
+        """
+        now = now or datetime.utcnow()
+        position = ProcessingCheckpoint.load(self.checkpoint_name)
+
+        organizations = self._pending_organizations(position.get("organization_id"), now)
+        per_organization = {}
+        for organization_id in organizations:
+            closed_dates = self.close_organization(organization_id, now)
+            ProcessingCheckpoint.save(self.checkpoint_name, {"organization_id": organization_id})
+            db.session.commit()
+            if closed_dates:
+                TopPerformersService.invalidate(organization_id, min(closed_dates), max(closed_dates))
+                per_organization[organization_id] = len(closed_dates)
+                logger.info(f"Auto checked out {len(closed_dates)} attendance records for organization {organization_id}")
+
+        # Finished a full pass; the next run starts from the first organization again
+        ProcessingCheckpoint.save(self.checkpoint_name, {})
+        db.session.commit()
+
+        return {
+            "organizations": len(organizations),
+            "closed": sum(per_organization.values()),
+            "per_organization": per_organization,
+        }
@@ -0,0 +1,119 @@
+"""
+Probe sets answering "certainly not blacklisted" without the database.
+"""
+
+import re
+import hashlib
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import or_
+from ..models import VisitorBlacklist
+from ..utils.blacklist_probe_store import get_blacklist_probe_store, later_expiry, PERMANENT
+from ..utils.validators import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(kind, value):
+    return hashlib.sha256(f"{kind}:{value}".encode()).hexdigest()[:32]
+
+
+def probe_keys(phone=None, email=None, id_proof=None):
+    """
+    Hashed probe keys of the given identifiers. Normalization only merges
+    spellings (formatting, case), so values equal in the database always
+    share a key; the store never holds the identifiers themselves.
+    """
+    keys = []
+    if phone:
+        keys.append(_digest("phone", normalize_phone(phone) or phone.strip()))
+    if email:
+        keys.append(_digest("email", email.strip().lower()))
+    if id_proof:
+        keys.append(_digest("id_proof", re.sub(r"[\s-]", "", id_proof).upper()))
+    return keys
+
+
+def _expiry(end_date):
+    if end_date is None:
+        return PERMANENT
+    return end_date.replace(tzinfo=timezone.utc).timestamp()
+
+
+class BlacklistProbeService:
+    """
+    Keeps a probe set per organization in the blacklist probe store (Redis
+    when REDIS_URL is set): the hashed phone, email and ID proof keys of its
+    active blacklist entries, each with its expiry.
+
+    ``might_match`` is checked before the database. A miss means no active
+    entry can match, so the common case (a visitor who is not blacklisted)
+    costs one store lookup; a hit is only probable and VisitorService
+    confirms it in the database with the exact criteria.
+
+    Only a ``shared`` store (Redis) may rule a visitor out: per-process
+    sets do not see entries added through other workers, so without Redis
+    every check goes to the database.
+
+    The set is built from the database on first use and again after the
+    store's TTL. New entries are added as soon as they are committed.
+    Removed entries stay in the set until the next build, as probable hits
+    the database turns down; lowering expiries in place could race with a
+    concurrent add of the same identifier and hide an active entry. If the
+    store fails, every check goes to the database.
+    """
+
+    @staticmethod
+    def might_match(organization_id, phone=None, email=None, id_proof=None):
+        """False only when no active blacklist entry can match."""
+        keys = probe_keys(phone, email, id_proof)
+        if not keys:
+            return False
+        store = get_blacklist_probe_store()
+        if not store.shared:
+            return True
+        try:
+            hit = store.lookup(organization_id, keys)
+            if hit is None:
+                BlacklistProbeService.build(organization_id)
+                hit = store.lookup(organization_id, keys)
+        except Exception:
+            logger.exception(f"Blacklist probe failed for organization {organization_id}")
+            return True
+        return hit is not False
+
+    @staticmethod
+    def build(organization_id):
+        """Load the organization's active entries into its probe set."""
+        rows = VisitorBlacklist.query.with_entities(
+            VisitorBlacklist.phone_number,
+            VisitorBlacklist.email,
+            VisitorBlacklist.id_proof_number,
+            VisitorBlacklist.end_date,
+        ).filter(
+            VisitorBlacklist.organization_id == organization_id,
+            or_(VisitorBlacklist.end_date.is_(None), VisitorBlacklist.end_date > datetime.utcnow())
+        ).all()
+        expiries = {}
+        for row in rows:
+            expiry = _expiry(row.end_date)
+            for key in probe_keys(row.phone_number, row.email, row.id_proof_number):
+                expiries[key] = later_expiry(expiries.get(key, expiry), expiry)
+        get_blacklist_probe_store().add(organization_id, expiries, loaded=True)
+        return len(rows)
+
+    @staticmethod
+    def entry_added(entry):
+        """Add a committed blacklist entry to its organization's probe set."""
+        expiry = _expiry(entry.end_date)
+        keys = probe_keys(entry.phone_number, entry.email, entry.id_proof_number)
+        store = get_blacklist_probe_store()
+        try:
+            store.add(entry.organization_id, {key: expiry for key in keys})
+        except Exception:
+            logger.exception(f"Failed to add blacklist entry {entry.id} to the probe set")
+            # The set must not miss an active entry: drop it so it is rebuilt
+            try:
+                store.clear(entry.organization_id)
+            except Exception:
+                logger.exception(f"Failed to drop the blacklist probe set of organization {entry.organization_id}")
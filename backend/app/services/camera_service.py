@@ -2,11 +2,37 @@
 Business logic for Camera management.
 """
 
-from sqlalchemy import or_, and_
+import time
+import logging
+import threading
+from flask import current_app
+from sqlalchemy import or_, and_, update, bindparam
 from ..extensions import db
 from ..models import Camera
 from ..utils.exceptions import NotFoundError, ConflictError
-from datetime import datetime
+from .realtime_service import RealtimeService
+from ..utils.heartbeat_store import (
+    get_heartbeat_store,
+    is_stale,
+    CAMERA_HEARTBEAT_FLUSH_SECONDS,
+    CAMERA_HEARTBEAT_TIMEOUT_SECONDS,
+)
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+_heartbeat_writer_lock = threading.Lock()
+
+
+def _heartbeat_cutoff(now=None, timeout_seconds=CAMERA_HEARTBEAT_TIMEOUT_SECONDS):
+    return (now or datetime.utcnow()) - timedelta(seconds=timeout_seconds)
+
+
+def _live_status(stored_status, stored_heartbeat, entry, cutoff):
+    """Status from the live entry, falling back to the stored row; silent cameras read as offline."""
+    if entry is None:
+        entry = {"status": stored_status, "last_heartbeat": stored_heartbeat or datetime.min}
+    return "offline" if is_stale(entry, cutoff) else entry["status"]
 
 
 class CameraService:
@@ -129,17 +155,151 @@ class CameraService:
     
     @staticmethod
     def update_heartbeat(camera_id, data):
-        """Update camera heartbeat"""
+        """
+        Record a camera heartbeat.
+
+        Heartbeats only touch the heartbeat store; last_heartbeat / status are
+        written to the cameras table in batches by the background writer.
+        """
         camera = CameraService.get_camera(camera_id)
-        
-        camera.last_heartbeat = datetime.utcnow()
-        camera.status = data['status']
-        
-        if data.get('error_message'):
-            camera.error_message = data['error_message']
-        else:
-            camera.error_message = None
-        
-        db.session.commit()
-        
+        store = get_heartbeat_store()
+        previous = _live_status(
+            camera.status, camera.last_heartbeat, store.get_many([camera.id]).get(camera.id), _heartbeat_cutoff()
+        )
+        store.record(camera.id, data['status'], data.get('error_message') or None)
+        CameraService._ensure_heartbeat_writer()
+        if data['status'] != previous:
+            RealtimeService.camera_status_changed([(camera.organization_id, camera.id, data['status'])])
         return camera
+
+    @staticmethod
+    def apply_live_status(items, now=None):
+        """Overlay live heartbeat data on serialized cameras (list of dicts)."""
+        entries = get_heartbeat_store().get_many([item['id'] for item in items])
+        cutoff = _heartbeat_cutoff(now)
+        for item in items:
+            entry = entries.get(item['id'])
+            if entry is not None:
+                item['last_heartbeat'] = entry['last_heartbeat'].isoformat()
+                item['error_message'] = entry['error_message']
+            stored_heartbeat = datetime.fromisoformat(item['last_heartbeat']) if item.get('last_heartbeat') else None
+            item['status'] = _live_status(item.get('status'), stored_heartbeat, entry, cutoff)
+        return items
+
+    @staticmethod
+    def count_online(organization_id=None, now=None):
+        """Number of cameras currently online, using live heartbeat data."""
+        query = db.session.query(Camera.id, Camera.status, Camera.last_heartbeat)
+        if organization_id:
+            query = query.filter(Camera.organization_id == organization_id)
+        rows = query.all()
+
+        entries = get_heartbeat_store().get_many([row.id for row in rows])
+        cutoff = _heartbeat_cutoff(now)
+        return sum(1 for row in rows if _live_status(row.status, row.last_heartbeat, entries.get(row.id), cutoff) == "online")
+
+    @staticmethod
+    def flush_heartbeats():
+        """
+        Write heartbeats received since the last flush in one executemany UPDATE.
+
+        Returns:
+            Number of cameras written
+        """
+        store = get_heartbeat_store()
+        dirty = store.take_dirty()
+        if not dirty:
+            return 0
+
+        table = Camera.__table__
+        rows = [
+            {
+                "camera_id": camera_id,
+                "last_heartbeat": entry["last_heartbeat"],
+                "status": entry["status"],
+                "error_message": entry["error_message"],
+            }
+            for camera_id, entry in dirty.items()
+        ]
+        try:
+            db.session.execute(
+                table.update()
+                .where(table.c.id == bindparam("camera_id"))
+                .values(
+                    last_heartbeat=bindparam("last_heartbeat"),
+                    status=bindparam("status"),
+                    error_message=bindparam("error_message"),
+                ),
+                rows
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            store.mark_dirty(list(dirty))
+            raise
+        return len(rows)
+
+    @staticmethod
+    def sweep_stale_heartbeats(timeout_seconds=CAMERA_HEARTBEAT_TIMEOUT_SECONDS, now=None):
+        """
+        Flush pending heartbeats and mark cameras silent for longer than
+        ``timeout_seconds`` offline.
+
+        Returns:
+            dict with cameras flushed and cameras marked offline
+        """
+        cutoff = _heartbeat_cutoff(now, timeout_seconds)
+        stale = get_heartbeat_store().mark_stale(cutoff)
+        flushed = CameraService.flush_heartbeats()
+
+        # Cameras without a live entry (e.g. after a restart) are swept in SQL
+        swept = db.session.execute(
+            update(Camera)
+            .where(
+                Camera.status != "offline",
+                Camera.deleted_at.is_(None),
+                or_(Camera.last_heartbeat.is_(None), Camera.last_heartbeat < cutoff)
+            )
+            .values(status="offline")
+            .returning(Camera.id, Camera.organization_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+
+        offline = {row.id: row.organization_id for row in swept}
+        if stale:
+            offline.update(db.session.query(Camera.id, Camera.organization_id).filter(Camera.id.in_(stale)).all())
+        RealtimeService.camera_status_changed(
+            (organization_id, camera_id, "offline") for camera_id, organization_id in offline.items()
+        )
+        return {"flushed": flushed, "offline": len(offline)}
+
+    @staticmethod
+    def _ensure_heartbeat_writer():
+        """Start the background flush/sweep thread for this app once."""
+        app = current_app._get_current_object()
+        if app.config.get('TESTING') or 'camera_heartbeat_writer' in app.extensions:
+            return
+        with _heartbeat_writer_lock:
+            if 'camera_heartbeat_writer' in app.extensions:
+                return
+            thread = threading.Thread(
+                target=CameraService._run_heartbeat_writer,
+                args=(app,),
+                name='camera-heartbeat-writer',
+                daemon=True
+            )
+            app.extensions['camera_heartbeat_writer'] = thread
+            thread.start()
+
+    @staticmethod
+    def _run_heartbeat_writer(app, interval_seconds=CAMERA_HEARTBEAT_FLUSH_SECONDS):
+        while True:
+            time.sleep(interval_seconds)
+            with app.app_context():
+                try:
+                    CameraService.sweep_stale_heartbeats()
+                except Exception:
+                    logger.exception("Camera heartbeat flush failed")
+                finally:
+                    db.session.remove()
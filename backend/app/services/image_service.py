@@ -5,8 +5,41 @@ Handles creation, retrieval, and management of images for employees and visitors
 
 from ..extensions import db
 from ..models.image import Image
+from ..utils.blob_store import get_blob_store, content_digest, LocalBlobStore, BlobNotFoundError
+from ..utils.image_variants import IMAGE_VARIANTS, VARIANT_MIME_TYPE, render_variant, get_variant_cache
+from sqlalchemy import update, bindparam
 from datetime import datetime
+import re
 import uuid
+import base64
+import binascii
+import logging
+
+logger = logging.getLogger(__name__)
+
+DATA_URL_PREFIX = re.compile(r'^data:(?P<mime>[\w.+-]+/[\w.+-]+)?(?:;[^,;]+)*;base64,', re.IGNORECASE)
+
+
+def decode_image_base64(value):
+    """
+    Bytes and MIME type of a Base64 image, given bare or as a data URL
+    (the MIME type is None when the value does not carry one).
+
+    Raises:
+        ValueError: for empty or malformed data
+    """
+    mime_type = None
+    match = DATA_URL_PREFIX.match(value or '')
+    if match:
+        mime_type = match.group('mime')
+        value = value[match.end():]
+    try:
+        data = base64.b64decode(''.join((value or '').split()), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid Base64 image data")
+    if not data:
+        raise ValueError("Empty image data")
+    return data, mime_type
 
 
 class ImageService:
@@ -28,12 +61,15 @@ class ImageService:
     ) -> Image:
         """
         Create a new image record in the unified image storage.
+
+        The decoded bytes go to the blob store, addressed (and deduplicated)
+        by SHA-256; the row only keeps the digest and metadata.
         
         Args:
             entity_type: Type of entity ('employee', 'visitor', etc.)
             entity_id: ID of the entity that owns the image
             organization_id: Organization ID for multi-tenancy
-            image_base64: Base64 encoded image data
+            image_base64: Base64 encoded image data or data URL
             image_type: Type of image ('photo', 'id_card', 'signature', etc.)
             file_name: Original file name
             mime_type: MIME type of the image
@@ -45,6 +81,10 @@ class ImageService:
         Returns:
             Image: Created image record
         """
+        data, data_mime_type = decode_image_base64(image_base64)
+        mime_type = data_mime_type or mime_type
+        content_sha256 = get_blob_store().put(data, content_type=mime_type)
+
         # If this is being set as primary, deactivate other primary images
         if primary:
             db.session.query(Image).filter_by(
@@ -55,18 +95,15 @@ class ImageService:
                 deleted=False
             ).update({'primary': False})
         
-        # Calculate file size
-        file_size = len(image_base64.encode('utf-8')) if image_base64 else 0
-        
         image = Image(
             id=str(uuid.uuid4()),
             entity_type=entity_type,
             entity_id=entity_id,
             organization_id=organization_id,
-            image_base64=image_base64,
+            content_sha256=content_sha256,
             image_type=image_type,
             file_name=file_name,
-            file_size=file_size,
+            file_size=len(data),
             mime_type=mime_type,
             captured_by=captured_by,
             capture_device=capture_device,
@@ -85,6 +122,53 @@ class ImageService:
         """Get a specific image by ID"""
         return Image.query.filter_by(id=image_id, deleted=False).first()
 
+    @staticmethod
+    def get_variant_file(image: Image, variant: str) -> tuple:
+        """
+        Local file holding the image in the given variant (see IMAGE_VARIANTS).
+
+        Resized variants are rendered once per content digest and then served
+        from the variant cache. Originals in a local blob store are served in
+        place; other originals are copied into the cache first.
+
+        Returns:
+            (path, mime_type, digest)
+
+        Raises:
+            BlobNotFoundError: if the image bytes are missing from the store
+                               or not persisted yet
+            ValueError: if the stored bytes cannot be decoded as an image
+        """
+        store = get_blob_store()
+        digest = image.content_sha256
+        if digest is None:
+            if image.legacy_base64 is None:
+                # Placeholder whose photo is still being persisted
+                raise BlobNotFoundError(image.id)
+            # Not yet moved to the blob store: key the cache by the inline content
+            data, _ = decode_image_base64(image.legacy_base64)
+            digest = content_digest(data)
+        else:
+            data = None
+
+        if variant == 'original':
+            mime_type = image.mime_type or 'application/octet-stream'
+            if data is None and isinstance(store, LocalBlobStore):
+                if not store.exists(digest):
+                    raise BlobNotFoundError(digest)
+                return store.path(digest), mime_type, digest
+        else:
+            mime_type = VARIANT_MIME_TYPE
+
+        cache = get_variant_cache()
+        path = cache.get(digest, variant)
+        if path is None:
+            if data is None:
+                data = store.get(digest)
+            max_side = IMAGE_VARIANTS[variant]
+            path = cache.put(digest, variant, render_variant(data, max_side) if max_side else data)
+        return path, mime_type, digest
+
     @staticmethod
     def get_entity_images(
         entity_type: str,
@@ -209,3 +293,66 @@ class ImageService:
             'total': total,
             'items': query.all()
         }
+
+    @staticmethod
+    def migrate_legacy_images(batch_size: int = 100, max_batches: int = None) -> dict:
+        """
+        Move inline Base64 images (``legacy_base64``) to the blob store.
+
+        Rows are read as plain tuples in id order, ``batch_size`` at a time, so
+        memory stays bounded by one batch. Each batch writes its blobs, then updates the
+        rows (digest, real byte size, MIME type, inline data cleared) in one
+        executemany UPDATE and commits, so the job can be stopped and rerun.
+        Undecodable rows are logged and left in place.
+
+        Returns:
+            dict with rows migrated, rows failed and bytes moved
+        """
+        store = get_blob_store()
+        result = {'migrated': 0, 'failed': 0, 'bytes': 0}
+        last_id = ''
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            rows = db.session.query(Image.id, Image.legacy_base64, Image.mime_type).filter(
+                Image.content_sha256.is_(None),
+                Image.legacy_base64.isnot(None),
+                Image.id > last_id
+            ).order_by(Image.id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            batches += 1
+
+            updates = []
+            for row in rows:
+                try:
+                    data, data_mime_type = decode_image_base64(row.legacy_base64)
+                except ValueError as e:
+                    logger.warning(f"Image {row.id} not migrated: {e}")
+                    result['failed'] += 1
+                    continue
+                mime_type = data_mime_type or row.mime_type
+                updates.append({
+                    'image_id': row.id,
+                    'content_sha256': store.put(data, content_type=mime_type),
+                    'file_size': len(data),
+                    'mime_type': mime_type,
+                })
+                result['bytes'] += len(data)
+
+            if updates:
+                table = Image.__table__
+                db.session.execute(
+                    update(table)
+                    .where(table.c.id == bindparam('image_id'))
+                    .values(
+                        content_sha256=bindparam('content_sha256'),
+                        file_size=bindparam('file_size'),
+                        mime_type=bindparam('mime_type'),
+                        image_base64=None,
+                    ),
+                    updates
+                )
+            db.session.commit()
+            result['migrated'] += len(updates)
+        return result
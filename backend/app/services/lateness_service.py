@@ -0,0 +1,140 @@
+"""
+Lateness of attendance check-ins against the employee's shift.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import bindparam
+from ..extensions import db
+from ..models import AttendanceRecord, Employee, Shift, Organization
+from ..utils.date_ranges import zone
+from .attendance_stats_service import AttendanceStatsService
+
+logger = logging.getLogger(__name__)
+
+
+def compute_lateness(check_in_time, shift_start, grace_minutes, timezone_name=None):
+    """
+    Lateness of a check-in (naive UTC, as stored) against a shift start given
+    in the organization's local time.
+
+    Returns:
+        (is_late, minutes_late) where minutes_late counts from the shift start
+        and is 0 unless the check-in is past the grace period
+    """
+    if check_in_time is None or shift_start is None:
+        return False, 0
+
+    local = check_in_time.replace(tzinfo=timezone.utc).astimezone(zone(timezone_name)).replace(tzinfo=None)
+    delta = local - datetime.combine(local.date(), shift_start)
+    # Shifts starting around midnight: measure against the nearest start
+    if delta > timedelta(hours=12):
+        delta -= timedelta(days=1)
+    elif delta < timedelta(hours=-12):
+        delta += timedelta(days=1)
+
+    minutes = int(delta.total_seconds() // 60)
+    if minutes > (grace_minutes or 0):
+        return True, minutes
+    return False, 0
+
+
+class LatenessService:
+    """
+    Stores ``is_late`` / ``minutes_late`` on attendance records when the
+    check-in time is written, so analytics filter and sum plain columns.
+    ``minutes_late`` is NULL on records not evaluated yet; ``backfill``
+    fills those in.
+    """
+
+    @staticmethod
+    def shift_rules(employee_ids):
+        """
+        Shift start, grace period and organization timezone per employee in one query.
+
+        Returns:
+            dict of employee_id -> (start_time, grace_minutes, timezone) (start_time None without a shift)
+        """
+        if not employee_ids:
+            return {}
+        rows = db.session.query(
+            Employee.id, Shift.start_time, Shift.grace_period_minutes, Organization.timezone
+        ).join(Organization, Organization.id == Employee.organization_id).outerjoin(
+            Shift, Shift.id == Employee.shift_id
+        ).filter(Employee.id.in_(set(employee_ids)))
+        return {r.id: (r.start_time, r.grace_period_minutes, r.timezone) for r in rows}
+
+    @staticmethod
+    def apply(attendance, employee):
+        """Set the lateness columns of ``attendance`` from its check-in time."""
+        shift = employee.shift
+        attendance.is_late, attendance.minutes_late = compute_lateness(
+            attendance.check_in_time,
+            shift.start_time if shift else None,
+            shift.grace_period_minutes if shift else 0,
+            employee.organization.timezone if employee.organization else None,
+        )
+        return attendance
+
+    @staticmethod
+    def backfill(batch_size=1000, recompute=False):
+        """
+        Evaluate lateness for records that have a check-in but no lateness yet
+        (or all of them with ``recompute``, e.g. after shift times changed),
+        committing batch by batch, then re-reconciles the daily stats of the
+        days whose late flag changed.
+
+        Returns:
+            dict with records updated and records that turned out late
+        """
+        table = AttendanceRecord.__table__
+        statement = table.update().where(table.c.id == bindparam("record_id")).values(
+            is_late=bindparam("late"), minutes_late=bindparam("minutes")
+        )
+
+        updated = late = 0
+        last_id = None
+        changed = {}
+        while True:
+            query = db.session.query(
+                AttendanceRecord.id,
+                AttendanceRecord.organization_id,
+                AttendanceRecord.date,
+                AttendanceRecord.check_in_time,
+                AttendanceRecord.is_late,
+                Shift.start_time,
+                Shift.grace_period_minutes,
+                Organization.timezone,
+            ).join(Employee, Employee.id == AttendanceRecord.employee_id).join(
+                Organization, Organization.id == AttendanceRecord.organization_id
+            ).outerjoin(Shift, Shift.id == Employee.shift_id).filter(
+                AttendanceRecord.check_in_time.isnot(None)
+            )
+            if not recompute:
+                query = query.filter(AttendanceRecord.minutes_late.is_(None))
+            if last_id is not None:
+                query = query.filter(AttendanceRecord.id > last_id)
+            rows = query.order_by(AttendanceRecord.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            params = []
+            for r in rows:
+                is_late, minutes = compute_lateness(r.check_in_time, r.start_time, r.grace_period_minutes, r.timezone)
+                params.append({"record_id": r.id, "late": is_late, "minutes": minutes})
+                late += is_late
+                if is_late != bool(r.is_late):
+                    low, high = changed.get(r.organization_id, (r.date, r.date))
+                    changed[r.organization_id] = (min(low, r.date), max(high, r.date))
+            db.session.execute(statement, params)
+            db.session.commit()
+
+            updated += len(rows)
+            last_id = rows[-1].id
+            logger.info(f"Backfilled lateness for {updated} attendance records")
+
+        # Late counts in the daily rollup only move where a flag flipped
+        for organization_id, (low, high) in changed.items():
+            AttendanceStatsService.reconcile(low, high, [organization_id])
+
+        return {"updated": updated, "late": late}
@@ -6,6 +6,7 @@ from sqlalchemy import or_, and_
 from ..extensions import db
 from ..models import LeaveRequest, Employee
 from ..utils.exceptions import NotFoundError, ConflictError, BadRequestError
+from .top_performers_service import TopPerformersService
 from datetime import datetime
 
 
@@ -210,6 +211,9 @@ class LeaveService:
         
         leave_request.updated_at = datetime.utcnow()
         db.session.commit()
+        TopPerformersService.invalidate(
+            leave_request.organization_id, leave_request.start_date, leave_request.end_date
+        )
         
         return leave_request
     
@@ -1,21 +1,23 @@
 from ..extensions import db
 from ..models.lpr import LPRLog, LPRHotlist, LPRWhitelist
 from ..schemas.lpr import LPRLogSchema, LPRHotlistSchema, LPRWhitelistSchema
+from ..utils.date_ranges import within_days, parse_day, local_today, organization_timezone
+from .realtime_service import RealtimeService
 from datetime import datetime, timedelta
 import uuid
 
 class LPRService:
     @staticmethod
     def get_logs(organization_id, page=1, per_page=20, vehicle_number=None, date=None):
-        from sqlalchemy import func
         query = LPRLog.query.filter_by(organization_id=organization_id)
         
         if vehicle_number:
             query = query.filter(LPRLog.vehicle_number.ilike(f"%{vehicle_number}%"))
             
-        if date:
-            # Assumes date is passed as 'YYYY-MM-DD' string
-            query = query.filter(func.date(LPRLog.timestamp) == date)
+        day = parse_day(date)
+        if day:
+            # 'YYYY-MM-DD' in the organization's timezone
+            query = query.filter(within_days(LPRLog.timestamp, day, timezone_name=organization_timezone(organization_id)))
             
         return query.order_by(LPRLog.timestamp.desc()).paginate(page=page, per_page=per_page, error_out=False)
 
@@ -78,6 +80,7 @@ class LPRService:
         
         db.session.add(log_entry)
         db.session.commit()
+        RealtimeService.lpr_logged(log_entry, 'entry')
         
         # Return dict with alert flag
         result = log_entry.to_dict()
@@ -111,17 +114,18 @@ class LPRService:
             log_entry.is_overstay = True
             
         db.session.commit()
+        RealtimeService.lpr_logged(log_entry, 'exit')
         return log_entry
 
     @staticmethod
     def get_dashboard_stats(organization_id):
-        from sqlalchemy import func, and_
-        today = datetime.now().date()
+        timezone_name = organization_timezone(organization_id)
+        logged_today = within_days(LPRLog.timestamp, local_today(timezone_name), timezone_name=timezone_name)
         
         # Entries Today (Total logs for today)
         entries_today = LPRLog.query.filter(
             LPRLog.organization_id == organization_id,
-            func.date(LPRLog.timestamp) == today
+            logged_today
         ).count()
         
         # Security Alerts (Hotlist hits today - status='denied' or just hotlist match)
@@ -129,14 +133,14 @@ class LPRService:
         security_alerts = LPRLog.query.filter(
             LPRLog.organization_id == organization_id,
             LPRLog.status == 'denied',
-            func.date(LPRLog.timestamp) == today
+            logged_today
         ).count()
         
         # VIP Movements (Whitelist hits today)
         vip_movements = LPRLog.query.filter(
             LPRLog.organization_id == organization_id,
             LPRLog.category == 'whitelist',
-            func.date(LPRLog.timestamp) == today
+            logged_today
         ).count()
         
         return {
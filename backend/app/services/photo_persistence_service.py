@@ -0,0 +1,244 @@
+"""
+Background persistence of photos captured at registration.
+"""
+
+import os
+import queue
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import update, bindparam
+from ..extensions import db
+from ..models.image import Image
+from ..utils.blob_store import get_blob_store
+from ..utils.image_variants import render_variant
+from .image_service import decode_image_base64
+
+logger = logging.getLogger(__name__)
+
+# Stored photos are re-encoded as JPEG no larger than this on the longest side
+PHOTO_MAX_SIDE = int(os.environ.get("PHOTO_MAX_SIDE", 1920))
+PHOTO_JPEG_QUALITY = int(os.environ.get("PHOTO_JPEG_QUALITY", 90))
+PHOTO_BATCH_SIZE = int(os.environ.get("PHOTO_BATCH_SIZE", 16))
+PHOTO_BATCH_WAIT_SECONDS = float(os.environ.get("PHOTO_BATCH_WAIT_SECONDS", 0.2))
+# Jobs waiting beyond this are persisted in the request instead (backpressure)
+PHOTO_QUEUE_SIZE = int(os.environ.get("PHOTO_QUEUE_SIZE", 256))
+# Placeholders still without content this long after registration lost their
+# photo (process died with it queued) and are soft deleted by the sweep
+PHOTO_PLACEHOLDER_MAX_AGE_MINUTES = int(os.environ.get("PHOTO_PLACEHOLDER_MAX_AGE_MINUTES", 30))
+
+_worker_lock = threading.Lock()
+
+
+class PhotoPersistenceService:
+    """
+    Takes photo decoding, re-encoding and storage out of the request.
+
+    ``reserve`` adds a placeholder Image row per photo to the caller's
+    transaction, so the entity and its image ids are committed together
+    and can be returned at once. After the commit, ``submit`` queues the
+    Base64 payloads; a background thread per app drains the queue in
+    batches, storing each photo in the blob store and filling in the rows
+    with one executemany UPDATE and one commit per batch.
+
+    Until then a placeholder has no content (``image_base64`` is None and
+    its variants answer 404). Photos that cannot be decoded have their
+    placeholder soft deleted. The queue lives in process memory: photos
+    still queued when the process dies are lost, and
+    ``sweep_stale_placeholders`` (``python manage.py
+    sweep_photo_placeholders``, run periodically) soft deletes their
+    placeholders once they are PHOTO_PLACEHOLDER_MAX_AGE_MINUTES old, so
+    entities fall back to having no photo instead of a broken one.
+
+    Usage:
+        jobs = PhotoPersistenceService.reserve(org_id, 'visitor', visitor.id, photos)
+        db.session.commit()
+        PhotoPersistenceService.submit(jobs)
+    """
+
+    @staticmethod
+    def reserve(organization_id, entity_type, entity_id, photos):
+        """
+        Add placeholder Image rows to the session (the caller commits).
+
+        Args:
+            photos: dicts with image_base64 and optionally image_type,
+                    capture_device, primary
+        Returns:
+            jobs for ``submit``: (image_id, image_base64) in ``photos`` order
+        """
+        jobs = []
+        for photo in photos:
+            image = Image(
+                id=str(uuid.uuid4()),
+                entity_type=entity_type,
+                entity_id=entity_id,
+                organization_id=organization_id,
+                image_type=photo.get('image_type', 'photo'),
+                capture_device=photo.get('capture_device'),
+                primary=photo.get('primary', False),
+                mime_type='image/jpeg',
+                is_active=True
+            )
+            db.session.add(image)
+            jobs.append((image.id, photo['image_base64']))
+        return jobs
+
+    @staticmethod
+    def submit(jobs):
+        """Queue reserved photos for the background worker."""
+        if not jobs:
+            return
+        app = current_app._get_current_object()
+        photo_queue = PhotoPersistenceService._queue(app)
+        PhotoPersistenceService._ensure_worker(app)
+        overflow = []
+        for job in jobs:
+            try:
+                photo_queue.put_nowait(job)
+            except queue.Full:
+                overflow.append(job)
+        if overflow:
+            logger.warning(f"Photo queue full, persisting {len(overflow)} photos in the request")
+            PhotoPersistenceService.persist(overflow)
+
+    @staticmethod
+    def drain():
+        """Persist everything queued right now in the calling thread."""
+        photo_queue = PhotoPersistenceService._queue(current_app._get_current_object())
+        result = {'stored': 0, 'failed': 0}
+        while True:
+            batch = []
+            while len(batch) < PHOTO_BATCH_SIZE:
+                try:
+                    batch.append(photo_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return result
+            counts = PhotoPersistenceService.persist(batch)
+            result['stored'] += counts['stored']
+            result['failed'] += counts['failed']
+
+    @staticmethod
+    def persist(jobs):
+        """
+        Decode, re-encode and store a batch of photos, then fill in their
+        placeholder rows in one transaction. A photo that cannot be decoded
+        or stored is marked deleted on its own; the rest of the batch is kept.
+
+        Returns:
+            dict with photos stored and failed
+        """
+        store = get_blob_store()
+        stored, failed = [], []
+        for image_id, image_base64 in jobs:
+            try:
+                data, _ = decode_image_base64(image_base64)
+                data = render_variant(data, PHOTO_MAX_SIDE, quality=PHOTO_JPEG_QUALITY)
+                content_sha256 = store.put(data, content_type='image/jpeg')
+            except ValueError as e:
+                logger.warning(f"Photo {image_id} not stored: {e}")
+                failed.append({'image_id': image_id})
+                continue
+            except Exception:
+                logger.exception(f"Photo {image_id} not stored")
+                failed.append({'image_id': image_id})
+                continue
+            stored.append({'image_id': image_id, 'content_sha256': content_sha256, 'file_size': len(data)})
+
+        table = Image.__table__
+        now = datetime.utcnow()
+        if stored:
+            db.session.execute(
+                update(table)
+                .where(table.c.id == bindparam('image_id'))
+                .values(content_sha256=bindparam('content_sha256'), file_size=bindparam('file_size'),
+                        mime_type='image/jpeg', updated_at=now),
+                stored
+            )
+        if failed:
+            db.session.execute(
+                update(table)
+                .where(table.c.id == bindparam('image_id'))
+                .values(deleted=True, is_active=False, updated_at=now),
+                failed
+            )
+        db.session.commit()
+        return {'stored': len(stored), 'failed': len(failed)}
+
+    @staticmethod
+    def sweep_stale_placeholders(max_age_minutes=PHOTO_PLACEHOLDER_MAX_AGE_MINUTES, now=None):
+        """
+        Soft delete placeholders created more than ``max_age_minutes`` ago
+        that never got content, in one UPDATE, and commit.
+
+        Returns:
+            Number of placeholders deleted
+        """
+        now = now or datetime.utcnow()
+        table = Image.__table__
+        swept = db.session.execute(
+            update(table)
+            .where(
+                table.c.content_sha256.is_(None),
+                table.c.image_base64.is_(None),
+                table.c.deleted.is_(False),
+                table.c.created_at < now - timedelta(minutes=max_age_minutes),
+            )
+            .values(deleted=True, is_active=False, updated_at=now)
+        ).rowcount
+        db.session.commit()
+        if swept:
+            logger.warning(f"Soft deleted {swept} photo placeholders that never received their photo")
+        return swept
+
+    @staticmethod
+    def _queue(app):
+        photo_queue = app.extensions.get('photo_persistence_queue')
+        if photo_queue is None:
+            photo_queue = app.extensions.setdefault('photo_persistence_queue', queue.Queue(maxsize=PHOTO_QUEUE_SIZE))
+        return photo_queue
+
+    @staticmethod
+    def _ensure_worker(app):
+        """Start the background persistence thread for this app once."""
+        if app.config.get('TESTING') or 'photo_persistence_worker' in app.extensions:
+            return
+        with _worker_lock:
+            if 'photo_persistence_worker' in app.extensions:
+                return
+            thread = threading.Thread(
+                target=PhotoPersistenceService._run_worker,
+                args=(app,),
+                name='photo-persistence',
+                daemon=True
+            )
+            app.extensions['photo_persistence_worker'] = thread
+            thread.start()
+
+    @staticmethod
+    def _run_worker(app):
+        photo_queue = PhotoPersistenceService._queue(app)
+        while True:
+            batch = [photo_queue.get()]
+            deadline = time.monotonic() + PHOTO_BATCH_WAIT_SECONDS
+            while len(batch) < PHOTO_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(photo_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with app.app_context():
+                try:
+                    PhotoPersistenceService.persist(batch)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception(f"Persisting a batch of {len(batch)} photos failed")
+                finally:
+                    db.session.remove()
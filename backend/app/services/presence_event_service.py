@@ -0,0 +1,418 @@
+"""
+Business logic for PresenceEvent ingestion and review.
+"""
+
+import uuid
+import json
+import base64
+import hashlib
+import binascii
+from datetime import datetime, timezone
+from sqlalchemy import insert, update, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload
+from ..extensions import db
+from ..models import PresenceEvent, Camera, Employee, Location
+from ..utils.exceptions import APIException, BadRequestError
+
+
+# Rows per INSERT statement; keeps bind-parameter counts well under driver limits
+BULK_INSERT_CHUNK_SIZE = 1000
+MAX_BULK_EVENTS = 10000
+# Longest an ingest transaction may take between stamping created_at and
+# committing. The attendance aggregator reads events older than its safety
+# lag by created_at, so this must stay well below that lag (see
+# AGGREGATOR_SAFETY_LAG_SECONDS) or late commits would be skipped.
+INGEST_MAX_TRANSACTION_SECONDS = 10
+
+# References looked up per batch; must be strings to be collected into sets
+ID_FIELDS = ('camera_id', 'employee_id', 'location_id')
+EVENT_TYPES = {'CHECK_IN', 'CHECK_OUT'}
+REVIEW_STATUSES = {'pending', 'approved', 'rejected', 'auto_approved'}
+
+# Optional per-event columns copied as-is after validation
+OPTIONAL_FIELDS = (
+    'employee_id', 'confidence_score', 'liveness_verified', 'liveness_score',
+    'face_bbox', 'face_quality_score', 'image_url', 'device_info',
+    'processing_time_ms', 'is_unknown_face', 'is_anomaly', 'anomaly_reason',
+)
+UNIT_INTERVAL_FIELDS = ('confidence_score', 'liveness_score', 'face_quality_score')
+
+
+def _is_number(value):
+    # bool is an int subclass but never a valid score or duration
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# Type/length checks of the optional columns that are not unit interval scores
+# or coerced flags: (check, error message)
+OPTIONAL_FIELD_CHECKS = {
+    'processing_time_ms': (
+        lambda v: _is_number(v) and float(v).is_integer() and 0 <= v <= 2 ** 31 - 1,
+        'processing_time_ms must be a non-negative integer'
+    ),
+    'face_bbox': (lambda v: isinstance(v, (list, dict)), 'face_bbox must be a list or an object'),
+    'device_info': (lambda v: isinstance(v, dict), 'device_info must be an object'),
+    'image_url': (
+        lambda v: isinstance(v, str) and len(v) <= 512,
+        'image_url must be a string of at most 512 characters'
+    ),
+    'anomaly_reason': (
+        lambda v: isinstance(v, str) and len(v) <= 255,
+        'anomaly_reason must be a string of at most 255 characters'
+    ),
+}
+
+
+def _optional_field_error(event):
+    """Error message for the first invalid optional field of an event, if any."""
+    for field in UNIT_INTERVAL_FIELDS:
+        value = event.get(field)
+        if value is not None and not (_is_number(value) and 0.0 <= value <= 1.0):
+            return f'{field} must be between 0 and 1'
+    for field, (check, message) in OPTIONAL_FIELD_CHECKS.items():
+        value = event.get(field)
+        if value is not None and not check(value):
+            return message
+    return None
+
+
+def _parse_timestamp(value):
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # Stored as naive UTC like the rest of the schema
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def encode_cursor(event):
+    raw = json.dumps({'t': event.timestamp.isoformat(), 'id': event.id})
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(position['t']), position['id']
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise BadRequestError('Invalid cursor')
+
+
+def derive_idempotency_key(camera_id, employee_id, event_type, timestamp):
+    """Deterministic key for events sent without one, so retries still collapse."""
+    raw = f"{camera_id}|{employee_id or ''}|{event_type}|{timestamp.isoformat()}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class PresenceEventService:
+    """Service class for presence event operations"""
+
+    @staticmethod
+    def _validate_events(events, organization_id):
+        """
+        Validate a batch column by column.
+
+        Camera, employee and location references are checked with one query
+        each for the whole batch instead of one lookup per event, and only
+        against the organization's own rows.
+
+        Returns:
+            Tuple of (rows ready for insert, {index: error message})
+        """
+        errors = {}
+
+        for index, event in enumerate(events):
+            if not isinstance(event, dict):
+                errors[index] = 'Event must be an object'
+                continue
+            for field in ID_FIELDS:
+                value = event.get(field)
+                if value is not None and not isinstance(value, str):
+                    errors[index] = f"{field} must be a string"
+                    break
+        valid = [e for index, e in enumerate(events) if index not in errors]
+
+        camera_ids = {e.get('camera_id') for e in valid if e.get('camera_id')}
+        employee_ids = {e.get('employee_id') for e in valid if e.get('employee_id')}
+
+        cameras = {}
+        if camera_ids:
+            cameras = {
+                c.id: c for c in db.session.query(
+                    Camera.id, Camera.location_id, Camera.camera_type
+                ).filter(
+                    Camera.organization_id == organization_id,
+                    Camera.id.in_(camera_ids),
+                    Camera.deleted_at.is_(None)
+                )
+            }
+
+        location_ids = {e.get('location_id') for e in valid if e.get('location_id')}
+        known_locations = set()
+        if location_ids:
+            known_locations = {
+                row.id for row in db.session.query(Location.id).filter(
+                    Location.organization_id == organization_id,
+                    Location.id.in_(location_ids)
+                )
+            }
+
+        known_employees = set()
+        if employee_ids:
+            known_employees = {
+                row.id for row in db.session.query(Employee.id).filter(
+                    Employee.organization_id == organization_id,
+                    Employee.id.in_(employee_ids)
+                )
+            }
+
+        now = datetime.utcnow()
+        rows = []
+        for index, event in enumerate(events):
+            if index in errors:
+                continue
+
+            camera = cameras.get(event.get('camera_id'))
+            if camera is None:
+                errors[index] = 'Unknown camera_id for this organization'
+                continue
+
+            timestamp = _parse_timestamp(event.get('timestamp'))
+            if timestamp is None:
+                errors[index] = 'timestamp must be an ISO 8601 datetime'
+                continue
+
+            event_type = event.get('event_type') or camera.camera_type
+            if event_type not in EVENT_TYPES:
+                errors[index] = f"event_type must be one of {sorted(EVENT_TYPES)}"
+                continue
+
+            employee_id = event.get('employee_id')
+            if employee_id and employee_id not in known_employees:
+                errors[index] = 'Unknown employee_id for this organization'
+                continue
+
+            review_status = event.get('review_status') or 'pending'
+            if review_status not in REVIEW_STATUSES:
+                errors[index] = f"review_status must be one of {sorted(REVIEW_STATUSES)}"
+                continue
+
+            location_id = event.get('location_id')
+            if location_id and location_id not in known_locations:
+                errors[index] = 'Unknown location_id for this organization'
+                continue
+
+            field_error = _optional_field_error(event)
+            if field_error:
+                errors[index] = field_error
+                continue
+
+            key = event.get('idempotency_key') or derive_idempotency_key(
+                camera.id, employee_id, event_type, timestamp
+            )
+            if not isinstance(key, str) or len(key) > 64:
+                errors[index] = 'idempotency_key must be a string of at most 64 characters'
+                continue
+
+            row = {field: event.get(field) for field in OPTIONAL_FIELDS}
+            row.update({
+                'id': str(uuid.uuid4()),
+                'organization_id': organization_id,
+                'camera_id': camera.id,
+                'location_id': location_id or camera.location_id,
+                'event_type': event_type,
+                'timestamp': timestamp,
+                'review_status': review_status,
+                'idempotency_key': key,
+                'liveness_verified': bool(event.get('liveness_verified', False)),
+                'is_unknown_face': bool(event.get('is_unknown_face', employee_id is None)),
+                'is_anomaly': bool(event.get('is_anomaly', False)),
+                'created_at': now,
+            })
+            rows.append(row)
+
+        return rows, errors
+
+    @staticmethod
+    def _insert_ignore_duplicates(rows):
+        """
+        Multi-row INSERT that skips rows whose (organization_id, idempotency_key,
+        timestamp) already exists. Returns the number of rows actually inserted.
+        """
+        table = PresenceEvent.__table__
+        dialect = db.session.get_bind().dialect.name
+
+        if dialect in ('postgresql', 'sqlite'):
+            dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = dialect_insert(table).on_conflict_do_nothing(
+                index_elements=['organization_id', 'idempotency_key', 'timestamp']
+            ).returning(table.c.id)
+            inserted = 0
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + BULK_INSERT_CHUNK_SIZE]
+                inserted += len(db.session.execute(stmt, chunk).all())
+            return inserted
+
+        # Generic fallback: filter out keys that already exist, then plain INSERT
+        inserted = 0
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            chunk = rows[start:start + BULK_INSERT_CHUNK_SIZE]
+            existing = {
+                (r.idempotency_key, r.timestamp) for r in db.session.query(
+                    PresenceEvent.idempotency_key, PresenceEvent.timestamp
+                ).filter(
+                    PresenceEvent.organization_id == chunk[0]['organization_id'],
+                    PresenceEvent.idempotency_key.in_([r['idempotency_key'] for r in chunk])
+                )
+            }
+            chunk = [r for r in chunk if (r['idempotency_key'], r['timestamp']) not in existing]
+            if chunk:
+                db.session.execute(insert(table), chunk)
+                inserted += len(chunk)
+        return inserted
+
+    @staticmethod
+    def bulk_ingest(events, organization_id):
+        """
+        Validate and insert a batch of presence events in one transaction.
+
+        Invalid events are reported and skipped; duplicates (same idempotency
+        key, either within the batch or already stored) are dropped silently.
+        A batch that cannot commit within INGEST_MAX_TRANSACTION_SECONDS of
+        being stamped is rolled back with a 503; retrying it is safe.
+
+        Returns:
+            dict with received / inserted / duplicates / rejected counts and errors
+        """
+        if not isinstance(events, list) or not events:
+            raise BadRequestError('events must be a non-empty list')
+        if len(events) > MAX_BULK_EVENTS:
+            raise BadRequestError(f'At most {MAX_BULK_EVENTS} events can be ingested per request')
+
+        rows, errors = PresenceEventService._validate_events(events, organization_id)
+
+        # Drop in-batch duplicates before hitting the database
+        unique_rows = list({r['idempotency_key']: r for r in reversed(rows)}.values())[::-1]
+
+        inserted = 0
+        if unique_rows:
+            stamped_at = unique_rows[0]['created_at']
+            try:
+                inserted = PresenceEventService._insert_ignore_duplicates(unique_rows)
+                if (datetime.utcnow() - stamped_at).total_seconds() > INGEST_MAX_TRANSACTION_SECONDS:
+                    # Committing now could land behind the aggregator's checkpoint
+                    raise APIException('Ingest took too long, retry the batch', 503)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        return {
+            'received': len(events),
+            'inserted': inserted,
+            'duplicates': len(rows) - inserted,
+            'rejected': len(errors),
+            'errors': [{'index': i, 'message': m} for i, m in sorted(errors.items())],
+        }
+
+    @staticmethod
+    def review_queue(organization_id, filters):
+        """
+        One page of the review queue, keyset-paginated on (timestamp, id).
+
+        The filter and ordering follow idx_review_status (review_status,
+        organization_id, timestamp, id), so each page is an index range scan
+        regardless of depth. No total count is computed.
+
+        Returns:
+            dict with items, next_cursor and has_more
+        """
+        limit = filters.get('limit', 50)
+        descending = filters.get('order') == 'desc'
+
+        query = PresenceEvent.query.options(
+            joinedload(PresenceEvent.employee),
+            joinedload(PresenceEvent.camera),
+            joinedload(PresenceEvent.location),
+        ).filter(
+            PresenceEvent.review_status == filters.get('review_status', 'pending'),
+            PresenceEvent.organization_id == organization_id,
+        )
+
+        if filters.get('camera_id'):
+            query = query.filter(PresenceEvent.camera_id == filters['camera_id'])
+        if filters.get('start'):
+            query = query.filter(PresenceEvent.timestamp >= filters['start'])
+        if filters.get('end'):
+            query = query.filter(PresenceEvent.timestamp < filters['end'])
+
+        if filters.get('cursor'):
+            after_ts, after_id = decode_cursor(filters['cursor'])
+            # Row comparison keeps the seek inside the index; the plain timestamp
+            # bound is redundant but lets the planner prune partitions
+            position = tuple_(PresenceEvent.timestamp, PresenceEvent.id)
+            if descending:
+                query = query.filter(position < tuple_(after_ts, after_id), PresenceEvent.timestamp <= after_ts)
+            else:
+                query = query.filter(position > tuple_(after_ts, after_id), PresenceEvent.timestamp >= after_ts)
+
+        if descending:
+            query = query.order_by(PresenceEvent.timestamp.desc(), PresenceEvent.id.desc())
+        else:
+            query = query.order_by(PresenceEvent.timestamp.asc(), PresenceEvent.id.asc())
+
+        # One extra row tells whether another page exists
+        events = query.limit(limit + 1).all()
+        has_more = len(events) > limit
+        events = events[:limit]
+
+        return {
+            'items': [event.to_dict() for event in events],
+            'next_cursor': encode_cursor(events[-1]) if has_more else None,
+            'has_more': has_more,
+        }
+
+    @staticmethod
+    def bulk_review(organization_id, event_ids, start, end, review_status, reviewer_id, notes=None):
+        """
+        Approve or reject many presence events with a single UPDATE.
+
+        ``start`` and ``end`` are the earliest and latest timestamps of the
+        events (both inclusive), as shown in the review queue. They bound the
+        UPDATE so PostgreSQL only scans the partitions covering that range
+        instead of probing every month for each id.
+
+        Events of other organizations, events outside the range and events
+        already in the requested status are left untouched.
+
+        Returns:
+            dict with requested and updated counts
+        """
+        event_ids = list(dict.fromkeys(event_ids))
+        result = db.session.execute(
+            update(PresenceEvent)
+            .where(
+                PresenceEvent.organization_id == organization_id,
+                PresenceEvent.id.in_(event_ids),
+                PresenceEvent.timestamp >= start,
+                PresenceEvent.timestamp <= end,
+                PresenceEvent.review_status != review_status,
+            )
+            .values(
+                review_status=review_status,
+                reviewed_by=reviewer_id,
+                reviewed_at=datetime.utcnow(),
+                review_notes=notes,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        return {'requested': len(event_ids), 'updated': result.rowcount}
@@ -0,0 +1,185 @@
+"""
+Maintenance of the monthly presence_events partitions (PostgreSQL only).
+"""
+
+import os
+import re
+import gzip
+import logging
+from datetime import datetime
+from sqlalchemy import text
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "presence_events"
+DEFAULT_PARTITION = "presence_events_default"
+PARTITION_PATTERN = re.compile(r"^presence_events_p(\d{4})_(\d{2})$")
+
+
+def month_start(value):
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month):
+    return f"presence_events_p{month:%Y_%m}"
+
+
+def _partition_month(name):
+    match = PARTITION_PATTERN.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+class PresencePartitionService:
+    """
+    Creates future monthly partitions and archives expired ones.
+
+    Run ``ensure_partitions`` at least once a month (the ``maintain_presence_partitions``
+    CLI command does both steps) so incoming events never land in the default
+    partition. Retention detaches a partition, streams it to a gzip'd CSV with
+    COPY and drops it; the parent table is only locked for the detach.
+    """
+
+    @staticmethod
+    def is_partitioned():
+        if db.session.get_bind().dialect.name != "postgresql":
+            return False
+        relkind = db.session.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": PARENT_TABLE}
+        ).scalar()
+        return relkind == "p"
+
+    @staticmethod
+    def list_partitions():
+        """Attached monthly partitions as {month_start: table name}."""
+        rows = db.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:parent)"
+        ), {"parent": PARENT_TABLE}).scalars()
+        return {month: name for name in rows if (month := _partition_month(name)) is not None}
+
+    @staticmethod
+    def _detached_partitions():
+        """Partition tables left behind by an interrupted archive run."""
+        rows = db.session.execute(text(
+            "SELECT c.relname FROM pg_class c "
+            "WHERE c.relkind = 'r' AND c.relname LIKE 'presence\\_events\\_p%' AND NOT c.relispartition"
+        )).scalars()
+        return {month: name for name in rows if (month := _partition_month(name)) is not None}
+
+    @staticmethod
+    def _create_partition(month):
+        """
+        Create and attach the partition for ``month``, moving any rows that
+        already landed in the default partition into it.
+        """
+        name = partition_name(month)
+        lower, upper = f"{month:%Y-%m-%d}", f"{add_months(month, 1):%Y-%m-%d}"
+        in_range = f"timestamp >= '{lower}' AND timestamp < '{upper}'"
+
+        db.session.execute(text(
+            f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        db.session.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+        db.session.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+        db.session.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        db.session.commit()
+        return name
+
+    @staticmethod
+    def ensure_partitions(months_ahead=3, now=None):
+        """
+        Make sure partitions exist from the current month up to ``months_ahead``
+        months ahead, plus any month that currently has rows in the default
+        partition (e.g. backfilled history).
+
+        Returns:
+            List of created partition names
+        """
+        if not PresencePartitionService.is_partitioned():
+            logger.info("presence_events is not partitioned; skipping partition maintenance")
+            return []
+
+        current = month_start(now or datetime.utcnow())
+        wanted = {add_months(current, i) for i in range(months_ahead + 1)}
+        wanted.update(db.session.execute(text(
+            f"SELECT DISTINCT date_trunc('month', timestamp) FROM {DEFAULT_PARTITION}"
+        )).scalars())
+
+        existing = PresencePartitionService.list_partitions()
+        created = []
+        for month in sorted(wanted - set(existing)):
+            created.append(PresencePartitionService._create_partition(month))
+            logger.info(f"Created presence_events partition {created[-1]}")
+        return created
+
+    @staticmethod
+    def archive_partition(name, archive_dir):
+        """
+        Detach a partition, export it to ``<archive_dir>/<name>.csv.gz`` and drop it.
+
+        Returns:
+            Path of the archive file
+        """
+        if not PARTITION_PATTERN.match(name):
+            raise ValueError(f"Not a presence_events partition: {name}")
+
+        is_attached = db.session.execute(
+            text("SELECT relispartition FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}
+        ).scalar()
+        if is_attached:
+            db.session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            db.session.commit()
+
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"{name}.csv.gz")
+        partial = f"{path}.partial"
+
+        raw = db.engine.raw_connection()
+        try:
+            with gzip.open(partial, "wb") as archive:
+                cursor = raw.cursor()
+                cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+                cursor.close()
+            raw.commit()
+        finally:
+            raw.close()
+        os.replace(partial, path)
+
+        db.session.execute(text(f"DROP TABLE {name}"))
+        db.session.commit()
+        logger.info(f"Archived presence_events partition {name} to {path}")
+        return path
+
+    @staticmethod
+    def apply_retention(retain_months, archive_dir, now=None):
+        """
+        Archive every partition whose month ended more than ``retain_months``
+        months before the current one.
+
+        Returns:
+            List of archive file paths
+        """
+        if not PresencePartitionService.is_partitioned():
+            logger.info("presence_events is not partitioned; skipping retention")
+            return []
+
+        cutoff = add_months(month_start(now or datetime.utcnow()), -retain_months)
+        candidates = {
+            **PresencePartitionService.list_partitions(),
+            **PresencePartitionService._detached_partitions(),
+        }
+        return [
+            PresencePartitionService.archive_partition(name, archive_dir)
+            for month, name in sorted(candidates.items())
+            if month < cutoff
+        ]
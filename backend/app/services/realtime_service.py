@@ -0,0 +1,118 @@
+"""
+Real-time dashboard push over Socket.IO.
+"""
+
+import logging
+from ..extensions import socketio
+
+logger = logging.getLogger(__name__)
+
+# Dashboards connect to this namespace and are placed in their organization's room
+NAMESPACE = "/dashboard"
+
+
+def organization_room(organization_id):
+    return f"org:{organization_id}"
+
+
+def _field(record, name):
+    return record.get(name) if isinstance(record, dict) else getattr(record, name, None)
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def message_queue_url(redis_url=None):
+    """
+    Redis URL for the Socket.IO message queue when Redis is reachable, else
+    None so the server falls back to its in-process manager (one worker only).
+    """
+    if not redis_url:
+        return None
+    try:
+        import redis
+        redis.Redis.from_url(redis_url).ping()
+        return redis_url
+    except Exception as e:
+        logger.warning(f"Redis unavailable for Socket.IO, using the in-process message queue: {e}")
+        return None
+
+
+class RealtimeService:
+    """
+    Pushes small change events to the dashboards of an organization so they
+    do not have to poll the stats endpoints.
+
+    Events are published after the change is committed. With a message queue
+    (REDIS_URL), any process that created the app - API workers, the
+    attendance aggregator, CLI jobs - can publish and every Socket.IO worker
+    relays the event to its connected clients. Publishing never raises.
+
+    Events (namespace ``/dashboard``, room ``org:<organization_id>``):
+        visitor_stats   {"delta": {<visitor dashboard key>: <change>}}
+        attendance      {"records": [{employee_id, date, check_in_time, check_out_time, is_late}]}
+        lpr             {"action": "entry" | "exit", "log": {...}, "delta": {<LPR dashboard key>: <change>}}
+        camera_status   {"cameras": [{"id", "status"}]}
+    """
+
+    @staticmethod
+    def publish(organization_id, event, payload):
+        """Emit ``event`` to the dashboards of the organization."""
+        if not organization_id or socketio.server is None:
+            return
+        try:
+            socketio.emit(event, payload, to=organization_room(organization_id), namespace=NAMESPACE)
+        except Exception:
+            logger.exception(f"Failed to publish {event} to organization {organization_id}")
+
+    @staticmethod
+    def attendance_changed(records):
+        """
+        Publish attendance records (AttendanceRecord instances or dicts with
+        the same fields), grouped by organization.
+        """
+        by_organization = {}
+        for record in records:
+            by_organization.setdefault(_field(record, "organization_id"), []).append({
+                "employee_id": _field(record, "employee_id"),
+                "date": _isoformat(_field(record, "date")),
+                "check_in_time": _isoformat(_field(record, "check_in_time")),
+                "check_out_time": _isoformat(_field(record, "check_out_time")),
+                "is_late": bool(_field(record, "is_late")),
+            })
+        for organization_id, items in by_organization.items():
+            RealtimeService.publish(organization_id, "attendance", {"records": items})
+
+    @staticmethod
+    def lpr_logged(log_entry, action):
+        """Publish an LPR entry or exit."""
+        delta = {}
+        if action == "entry":
+            delta["entries_today"] = 1
+            if log_entry.status == "denied":
+                delta["security_alerts"] = 1
+            if log_entry.category == "whitelist":
+                delta["vip_movements"] = 1
+        RealtimeService.publish(log_entry.organization_id, "lpr", {
+            "action": action,
+            "log": {
+                "id": log_entry.id,
+                "vehicle_number": log_entry.vehicle_number,
+                "direction": log_entry.direction,
+                "status": log_entry.status,
+                "gate_name": log_entry.gate_name,
+                "timestamp": _isoformat(log_entry.timestamp),
+                "exit_time": _isoformat(log_entry.exit_time),
+            },
+            "delta": delta,
+        })
+
+    @staticmethod
+    def camera_status_changed(changes):
+        """Publish camera status changes, given (organization_id, camera_id, status) tuples."""
+        by_organization = {}
+        for organization_id, camera_id, status in changes:
+            by_organization.setdefault(organization_id, []).append({"id": camera_id, "status": status})
+        for organization_id, cameras in by_organization.items():
+            RealtimeService.publish(organization_id, "camera_status", {"cameras": cameras})
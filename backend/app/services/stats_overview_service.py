@@ -0,0 +1,160 @@
+"""
+System-wide statistics overview for the super admin dashboard.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, select, true
+from ..extensions import db, cache
+from ..models import Organization, Employee, FaceEmbedding, PresenceEvent, Camera
+from .. import models as legacy_models
+from ..utils.heartbeat_store import CAMERA_HEARTBEAT_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "stats_overview:snapshot"
+REFRESH_LOCK_KEY = "stats_overview:refreshing"
+# Snapshots younger than this are served as is
+FRESH_SECONDS = 30
+# Older ones are still served while a background refresh runs, up to this age
+SNAPSHOT_TIMEOUT = 600
+# A refresh that has not finished by then (worker died) may be retried
+REFRESH_LOCK_TIMEOUT = 120
+
+
+class StatsOverviewService:
+    """
+    Builds the overview counters in one statement: one single-row subselect
+    per table with ``COUNT(*) FILTER (WHERE ...)`` aggregates, cross joined.
+
+    The result is cached as a snapshot. Requests within FRESH_SECONDS of
+    the snapshot are served from cache; older snapshots are served while a
+    single background thread (guarded by a cache lock) rebuilds them, so
+    only a cold cache makes a request wait for the database.
+    """
+
+    @staticmethod
+    def get_overview():
+        """Overview payload, from the cached snapshot when there is one."""
+        snapshot = cache.get(SNAPSHOT_KEY)
+        if snapshot is None:
+            return StatsOverviewService.refresh()
+
+        if time.time() - snapshot["computed_at"] > FRESH_SECONDS and cache.add(
+            REFRESH_LOCK_KEY, True, timeout=REFRESH_LOCK_TIMEOUT
+        ):
+            app = current_app._get_current_object()
+            threading.Thread(
+                target=StatsOverviewService._refresh_in_background, args=(app,),
+                name="stats-overview-refresh", daemon=True
+            ).start()
+        return snapshot["data"]
+
+    @staticmethod
+    def _refresh_in_background(app):
+        with app.app_context():
+            try:
+                StatsOverviewService.refresh()
+            except Exception:
+                logger.exception("Stats overview refresh failed")
+            finally:
+                cache.delete(REFRESH_LOCK_KEY)
+                db.session.remove()
+
+    @staticmethod
+    def refresh():
+        """Recompute the overview and store it as the cached snapshot."""
+        data = StatsOverviewService._compute()
+        cache.set(SNAPSHOT_KEY, {"computed_at": time.time(), "data": data}, timeout=SNAPSHOT_TIMEOUT)
+        return data
+
+    @staticmethod
+    def _compute():
+        organizations = select(
+            func.count().label("total"),
+            func.count().filter(Organization.is_active.is_(True)).label("active"),
+        ).select_from(Organization).subquery("organizations")
+        employees = select(
+            func.count().label("total"),
+            func.count().filter(Employee.is_active.is_(True)).label("active"),
+        ).select_from(Employee).subquery("employees")
+        faces = select(
+            func.count().label("total"),
+            func.count().filter(FaceEmbedding.is_primary.is_(True)).label("primary"),
+            func.avg(FaceEmbedding.quality_score).label("avg_quality"),
+        ).select_from(FaceEmbedding).subquery("faces")
+        events = select(
+            func.count().label("total"),
+            func.count().filter(PresenceEvent.is_unknown_face.is_(True)).label("unknown_faces"),
+            func.count().filter(PresenceEvent.is_anomaly.is_(True)).label("anomalies"),
+            func.count().filter(PresenceEvent.review_status == "pending").label("pending_reviews"),
+        ).select_from(PresenceEvent).subquery("events")
+        # Online from the flushed heartbeat columns, which trail the live store by at
+        # most one flush interval; silent cameras read as offline as in CameraService
+        heartbeat_cutoff = datetime.utcnow() - timedelta(seconds=CAMERA_HEARTBEAT_TIMEOUT_SECONDS)
+        cameras = select(
+            func.count().label("total"),
+            func.count().filter(
+                Camera.status == "online", Camera.last_heartbeat >= heartbeat_cutoff
+            ).label("online"),
+        ).select_from(Camera).subquery("cameras")
+
+        columns = [
+            organizations.c.total.label("org_total"),
+            organizations.c.active.label("org_active"),
+            employees.c.total.label("emp_total"),
+            employees.c.active.label("emp_active"),
+            faces.c.total.label("face_total"),
+            faces.c.primary.label("face_primary"),
+            faces.c.avg_quality.label("face_avg_quality"),
+            events.c.total.label("pe_total"),
+            events.c.unknown_faces.label("pe_unknown"),
+            events.c.anomalies.label("pe_anomalies"),
+            events.c.pending_reviews.label("pe_pending"),
+            cameras.c.total.label("cam_total"),
+            cameras.c.online.label("cam_online"),
+        ]
+        statement = select(*columns).select_from(
+            organizations.join(employees, true()).join(faces, true()).join(events, true()).join(cameras, true())
+        )
+
+        # Legacy visitors (app/models.py), when that module is present
+        VisitorDetails = getattr(legacy_models, "VisitorDetails", None)
+        if VisitorDetails is not None:
+            visitors = select(func.count().label("total")).select_from(VisitorDetails).subquery("legacy_visitors")
+            statement = statement.add_columns(visitors.c.total.label("visitors_total")).join(visitors, true())
+
+        row = db.session.execute(statement).one()
+
+        return {
+            "organizations": {
+                "total": int(row.org_total),
+                "active": int(row.org_active),
+            },
+            "employees": {
+                "total": int(row.emp_total),
+                "active": int(row.emp_active),
+            },
+            "face_embeddings": {
+                "total": int(row.face_total),
+                "primary": int(row.face_primary),
+                "avg_quality": float(row.face_avg_quality) if row.face_avg_quality is not None else 0.0,
+            },
+            "presence_events": {
+                "total": int(row.pe_total),
+                "unknown_faces": int(row.pe_unknown),
+                "anomalies": int(row.pe_anomalies),
+                "pending_reviews": int(row.pe_pending),
+            },
+            "cameras": {
+                "total": int(row.cam_total),
+                "online": int(row.cam_online),
+            },
+            "visitors": {
+                "total": int(getattr(row, "visitors_total", 0) or 0),
+            },
+            "generated_at": datetime.utcnow().isoformat(),
+        }
@@ -0,0 +1,433 @@
+"""
+Background generation of manager team performance reports.
+"""
+
+import time
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, update, delete
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from ..models import (
+    ReportSnapshot, Organization, Department, Employee, User, AttendanceRecord, LeaveRequest
+)
+
+logger = logging.getLogger(__name__)
+
+REPORT_TYPE = "team_performance"
+TOP_PERFORMERS = 5
+# Ready versions kept per scope; older ones are pruned when a new one is ready
+KEEP_VERSIONS = 3
+# The scheduler re-queues a scope's current month once its newest snapshot is this old
+STALE_AFTER_MINUTES = 30
+# Snapshots stuck "running" this long (worker died) are handed out again
+RUNNING_TIMEOUT_MINUTES = 15
+# Longest period a report may cover
+MAX_PERIOD_DAYS = 366
+
+
+def month_period(day):
+    """First and last date of the month containing ``day``."""
+    start = day.replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+class TeamReportService:
+    """
+    Team performance reports are built by a worker process
+    (``python manage.py generate_team_reports --loop``) and stored as
+    versioned ``report_snapshots`` per (organization, department, period).
+    Requests are served the newest ready version, so report generation never
+    runs on web workers next to check-ins. The default view is keyed by the
+    whole running month (evaluated up to the day it is built), so it keeps
+    one scope all month instead of a new one every day.
+
+    ``request_snapshot`` queues a new version (the on-demand refresh API),
+    ``schedule_current_periods`` queues the running month of every scope
+    that went stale, and ``run_pending`` builds queued snapshots.
+    """
+
+    # ------------------------------------------------------------------ reading
+
+    @staticmethod
+    def _scope(organization_id, department_id, start_date, end_date):
+        return (
+            ReportSnapshot.organization_id == organization_id,
+            ReportSnapshot.report_type == REPORT_TYPE,
+            ReportSnapshot.department_id == (department_id or ""),
+            ReportSnapshot.period_start == start_date,
+            ReportSnapshot.period_end == end_date,
+        )
+
+    @staticmethod
+    def latest(organization_id, department_id, start_date, end_date):
+        """Newest ready snapshot of the scope, or None."""
+        return ReportSnapshot.query.filter(
+            *TeamReportService._scope(organization_id, department_id, start_date, end_date),
+            ReportSnapshot.status == "ready"
+        ).order_by(ReportSnapshot.version.desc()).first()
+
+    @staticmethod
+    def in_progress(organization_id, department_id, start_date, end_date):
+        """Queued or running snapshot of the scope, or None."""
+        return ReportSnapshot.query.filter(
+            *TeamReportService._scope(organization_id, department_id, start_date, end_date),
+            ReportSnapshot.status.in_(["pending", "running"])
+        ).order_by(ReportSnapshot.version.desc()).first()
+
+    # ------------------------------------------------------------------ queueing
+
+    @staticmethod
+    def period_error(start_date, end_date):
+        """Why ``start_date``..``end_date`` cannot be reported on, or None."""
+        if start_date > end_date:
+            return "start_date must not be after end_date"
+        if (end_date - start_date).days >= MAX_PERIOD_DAYS:
+            return f"Report period must not exceed {MAX_PERIOD_DAYS} days"
+        return None
+
+    @staticmethod
+    def request_snapshot(organization_id, department_id, start_date, end_date, requested_by=None):
+        """
+        Queue a new version of the scope's report unless one is already queued
+        or running, and commit.
+
+        Returns:
+            The queued (or already in progress) ReportSnapshot
+        """
+        return TeamReportService._queue(organization_id, department_id, start_date, end_date, requested_by)[0]
+
+    @staticmethod
+    def _queue(organization_id, department_id, start_date, end_date, requested_by=None):
+        """``request_snapshot`` that also tells whether this call queued the snapshot."""
+        existing = TeamReportService.in_progress(organization_id, department_id, start_date, end_date)
+        if existing is not None:
+            return existing, False
+
+        last_version = db.session.query(func.max(ReportSnapshot.version)).filter(
+            *TeamReportService._scope(organization_id, department_id, start_date, end_date)
+        ).scalar() or 0
+        snapshot = ReportSnapshot(
+            organization_id=organization_id,
+            report_type=REPORT_TYPE,
+            department_id=department_id or "",
+            period_start=start_date,
+            period_end=end_date,
+            version=last_version + 1,
+            status="pending",
+            requested_by=requested_by,
+        )
+        db.session.add(snapshot)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request queued the same version first
+            db.session.rollback()
+            return TeamReportService.in_progress(organization_id, department_id, start_date, end_date), False
+        return snapshot, True
+
+    @staticmethod
+    def schedule_current_periods(today=None, stale_after_minutes=STALE_AFTER_MINUTES):
+        """
+        Queue the running month's report of every organization (all
+        departments and each department) whose newest snapshot is older than
+        ``stale_after_minutes``.
+
+        Returns:
+            Number of snapshots queued (scopes already in progress not counted)
+        """
+        start_date, end_date = month_period(today or datetime.utcnow().date())
+        cutoff = datetime.utcnow() - timedelta(minutes=stale_after_minutes)
+
+        scopes = [
+            (org_id, "") for (org_id,) in db.session.query(Organization.id).filter(
+                Organization.is_active.is_(True), Organization.deleted_at.is_(None)
+            )
+        ]
+        scopes += db.session.query(Department.organization_id, Department.id).join(
+            Organization, Organization.id == Department.organization_id
+        ).filter(Organization.is_active.is_(True), Organization.deleted_at.is_(None)).all()
+
+        newest = {
+            (r.organization_id, r.department_id): r.created_at
+            for r in db.session.query(
+                ReportSnapshot.organization_id,
+                ReportSnapshot.department_id,
+                func.max(ReportSnapshot.created_at).label("created_at")
+            ).filter(
+                ReportSnapshot.report_type == REPORT_TYPE,
+                ReportSnapshot.period_start == start_date,
+                ReportSnapshot.period_end == end_date
+            ).group_by(ReportSnapshot.organization_id, ReportSnapshot.department_id)
+        }
+
+        queued = 0
+        for organization_id, department_id in scopes:
+            created_at = newest.get((organization_id, department_id))
+            if created_at is None or created_at < cutoff:
+                _, created = TeamReportService._queue(organization_id, department_id, start_date, end_date)
+                queued += created
+        return queued
+
+    # ------------------------------------------------------------------ generation
+
+    @staticmethod
+    def _claim(snapshot_id):
+        """Mark a queued snapshot running; False if another worker got it first."""
+        stale_running = datetime.utcnow() - timedelta(minutes=RUNNING_TIMEOUT_MINUTES)
+        claimed = db.session.execute(
+            update(ReportSnapshot).where(
+                ReportSnapshot.id == snapshot_id,
+                (ReportSnapshot.status == "pending") | (
+                    (ReportSnapshot.status == "running") & (ReportSnapshot.started_at < stale_running)
+                )
+            ).values(status="running", started_at=datetime.utcnow()).execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return claimed == 1
+
+    @staticmethod
+    def generate(snapshot):
+        """Build ``snapshot`` and store it as ready (or failed), committing."""
+        started = time.monotonic()
+        # A period still running is evaluated up to today
+        end_date = max(snapshot.period_start, min(snapshot.period_end, datetime.utcnow().date()))
+        try:
+            snapshot.data = TeamReportService.build_report(
+                snapshot.organization_id, snapshot.department_id or None,
+                snapshot.period_start, end_date
+            )
+            snapshot.status = "ready"
+            snapshot.error = None
+        except Exception as e:
+            db.session.rollback()
+            logger.exception(f"Failed to build report snapshot {snapshot.id}")
+            snapshot.status = "failed"
+            snapshot.error = str(e)
+        snapshot.generated_at = datetime.utcnow()
+        snapshot.generation_ms = int((time.monotonic() - started) * 1000)
+
+        if snapshot.status == "ready":
+            db.session.execute(delete(ReportSnapshot).where(
+                *TeamReportService._scope(
+                    snapshot.organization_id, snapshot.department_id, snapshot.period_start, snapshot.period_end
+                ),
+                ReportSnapshot.status.in_(["ready", "failed"]),
+                ReportSnapshot.version <= snapshot.version - KEEP_VERSIONS
+            ).execution_options(synchronize_session=False))
+        db.session.commit()
+        return snapshot
+
+    @staticmethod
+    def run_pending(limit=20):
+        """
+        Build up to ``limit`` queued snapshots, oldest first.
+
+        Returns:
+            dict with snapshots built and failed
+        """
+        stale_running = datetime.utcnow() - timedelta(minutes=RUNNING_TIMEOUT_MINUTES)
+        candidates = [
+            snapshot_id for (snapshot_id,) in db.session.query(ReportSnapshot.id).filter(
+                (ReportSnapshot.status == "pending") | (
+                    (ReportSnapshot.status == "running") & (ReportSnapshot.started_at < stale_running)
+                )
+            ).order_by(ReportSnapshot.created_at).limit(limit)
+        ]
+
+        built = failed = 0
+        for snapshot_id in candidates:
+            if not TeamReportService._claim(snapshot_id):
+                continue
+            snapshot = db.session.get(ReportSnapshot, snapshot_id)
+            TeamReportService.generate(snapshot)
+            if snapshot.status == "ready":
+                built += 1
+            else:
+                failed += 1
+        return {"built": built, "failed": failed}
+
+    @staticmethod
+    def run_forever(interval_seconds=10, schedule_every_seconds=300):
+        """Build queued snapshots and re-queue stale current months until interrupted."""
+        logger.info("Team report worker started")
+        last_schedule = 0
+        while True:
+            try:
+                if time.monotonic() - last_schedule >= schedule_every_seconds:
+                    TeamReportService.schedule_current_periods()
+                    last_schedule = time.monotonic()
+                result = TeamReportService.run_pending()
+            except Exception:
+                db.session.rollback()
+                logger.exception("Team report generation failed")
+                result = {"built": 0, "failed": 0}
+            if not result["built"] and not result["failed"]:
+                time.sleep(interval_seconds)
+
+    # ------------------------------------------------------------------ report
+
+    @staticmethod
+    def build_report(organization_id, department_id, start_date, end_date):
+        """
+        Team performance report for the organization (or one department) over
+        ``start_date``..``end_date`` (inclusive), from grouped queries only.
+        """
+        ar = AttendanceRecord
+        working_days = (end_date - start_date).days + 1
+
+        organization = db.session.query(Organization.name).filter(Organization.id == organization_id).first()
+        departments = db.session.query(Department.id, Department.name).filter(
+            Department.organization_id == organization_id
+        ).order_by(Department.name).all()
+        department_names = dict(departments)
+
+        # Active members by department, gender and employment type
+        members = db.session.query(
+            Employee.department_id,
+            Employee.gender,
+            Employee.employment_type,
+            func.count(Employee.id).label("count")
+        ).join(User, User.id == Employee.user_id).filter(
+            Employee.organization_id == organization_id,
+            Employee.is_active.is_(True),
+            User.is_active.is_(True)
+        ).group_by(Employee.department_id, Employee.gender, Employee.employment_type).all()
+
+        org_total_employees = sum(r.count for r in members)
+        department_members = {}
+        gender_breakdown = {}
+        employment_type_breakdown = {}
+        for r in members:
+            department_members[r.department_id] = department_members.get(r.department_id, 0) + r.count
+            if department_id and r.department_id != department_id:
+                continue
+            gender = r.gender or 'not_specified'
+            gender_breakdown[gender] = gender_breakdown.get(gender, 0) + r.count
+            emp_type = r.employment_type or 'not_specified'
+            employment_type_breakdown[emp_type] = employment_type_breakdown.get(emp_type, 0) + r.count
+        total_team_members = department_members.get(department_id, 0) if department_id else org_total_employees
+
+        # Check-ins and late arrivals by department
+        in_range = (
+            ar.organization_id == organization_id,
+            ar.date >= start_date,
+            ar.date <= end_date,
+            ar.check_in_time.isnot(None),
+        )
+        attendance_query = db.session.query(
+            Employee.department_id,
+            func.count(ar.id).label("records"),
+            func.sum(case((ar.is_late.is_(True), 1), else_=0)).label("late")
+        ).join(Employee, Employee.id == ar.employee_id).filter(*in_range)
+        if department_id:
+            attendance_query = attendance_query.filter(Employee.department_id == department_id)
+        department_attendance = {
+            r.department_id: (r.records, int(r.late or 0))
+            for r in attendance_query.group_by(Employee.department_id)
+        }
+        actual_attendance = sum(records for records, _ in department_attendance.values())
+        late_arrivals = sum(late for _, late in department_attendance.values())
+        expected_attendance = total_team_members * working_days
+        avg_attendance_rate = (actual_attendance / expected_attendance * 100) if expected_attendance > 0 else 0
+
+        # Top performers by days attended
+        attended = func.count(ar.id)
+        top_query = db.session.query(
+            Employee.employee_code,
+            Employee.full_name,
+            attended.label("attendance_days")
+        ).join(Employee, Employee.id == ar.employee_id).filter(*in_range)
+        if department_id:
+            top_query = top_query.filter(Employee.department_id == department_id)
+        top_rows = top_query.group_by(Employee.id, Employee.employee_code, Employee.full_name) \
+            .order_by(attended.desc(), Employee.employee_code).limit(TOP_PERFORMERS).all()
+
+        # Leaves overlapping the period by status and type
+        leave_query = db.session.query(
+            LeaveRequest.status,
+            LeaveRequest.leave_type,
+            func.count(LeaveRequest.id).label("count"),
+            func.sum(LeaveRequest.total_days).label("days")
+        ).filter(
+            LeaveRequest.organization_id == organization_id,
+            LeaveRequest.start_date <= end_date,
+            LeaveRequest.end_date >= start_date
+        )
+        if department_id:
+            leave_query = leave_query.join(Employee, Employee.id == LeaveRequest.employee_id).filter(
+                Employee.department_id == department_id
+            )
+
+        leave_stats = {
+            'pending': 0,
+            'approved': 0,
+            'rejected': 0,
+            'total_leave_days': 0
+        }
+        leave_type_breakdown = {}
+        for r in leave_query.group_by(LeaveRequest.status, LeaveRequest.leave_type):
+            leave_stats[r.status] = leave_stats.get(r.status, 0) + r.count
+            breakdown = leave_type_breakdown.setdefault(r.leave_type, {'count': 0, 'days': 0})
+            breakdown['count'] += r.count
+            if r.status == 'approved':
+                leave_stats['total_leave_days'] += float(r.days or 0)
+                breakdown['days'] += float(r.days or 0)
+
+        department_breakdown = []
+        if not department_id:
+            for dept_id, dept_name in departments:
+                dept_expected = department_members.get(dept_id, 0) * working_days
+                dept_attendance = department_attendance.get(dept_id, (0, 0))[0]
+                department_breakdown.append({
+                    'id': dept_id,
+                    'name': dept_name,
+                    'employee_count': department_members.get(dept_id, 0),
+                    'attendance_rate': round((dept_attendance / dept_expected * 100) if dept_expected > 0 else 0, 2)
+                })
+
+        report_data = {
+            'organization': {
+                'id': organization_id,
+                'name': organization.name if organization else 'Unknown',
+                'total_employees': org_total_employees
+            },
+            'report_scope': {
+                'department': department_names.get(department_id, 'Unknown') if department_id else 'All Departments',
+                'date_range': {
+                    'start_date': start_date.isoformat(),
+                    'end_date': end_date.isoformat(),
+                    'working_days': working_days
+                }
+            },
+            'team_summary': {
+                'total_team_members': total_team_members,
+                'active_employees': total_team_members,
+                'department_count': len(department_breakdown) if department_breakdown else 1
+            },
+            'attendance_summary': {
+                'total_attendance_records': actual_attendance,
+                'expected_attendance': expected_attendance,
+                'average_attendance_rate': round(avg_attendance_rate, 2),
+                'late_arrivals': late_arrivals,
+                'late_arrival_rate': round((late_arrivals / actual_attendance * 100) if actual_attendance > 0 else 0, 2)
+            },
+            'leave_summary': leave_stats,
+            'leave_type_breakdown': leave_type_breakdown,
+            'demographics': {
+                'gender_breakdown': gender_breakdown,
+                'employment_type_breakdown': employment_type_breakdown
+            },
+            'top_performers': [
+                {
+                    'employee_code': r.employee_code,
+                    'name': r.full_name,
+                    'attendance_days': r.attendance_days,
+                    'attendance_rate': round(r.attendance_days / working_days * 100, 2)
+                }
+                for r in top_rows
+            ]
+        }
+        if department_breakdown:
+            report_data['department_breakdown'] = department_breakdown
+        return report_data
@@ -0,0 +1,118 @@
+"""
+Manager dashboard statistics for a team (an organization or one of its departments).
+"""
+
+import logging
+from datetime import datetime
+from sqlalchemy import func
+from ..extensions import db, cache
+from ..models import Employee, User, AttendanceRecord, LeaveRequest, Organization, Department
+
+logger = logging.getLogger(__name__)
+
+# Dashboard widgets tolerate this much staleness; bounds load from polling clients
+TEAM_STATS_TIMEOUT = 60
+
+
+class TeamStatsService:
+    """
+    Computes every manager dashboard counter in a single statement of
+    scalar subqueries (headcounts, today's presence and lateness, the
+    month's check-ins, pending leaves, organization and department names)
+    so neither memory nor latency grows with team size times days.
+
+    Results are cached per (organization, department, day) for
+    TEAM_STATS_TIMEOUT seconds; every manager with the same scope shares
+    the entry.
+    """
+
+    @staticmethod
+    def cache_key(organization_id, department_id, today):
+        return f"team_stats:{organization_id}:{department_id or 'all'}:{today.isoformat()}"
+
+    @staticmethod
+    def get_team_stats(organization_id, department_id=None, today=None):
+        """
+        Dashboard statistics of the team, scoped to ``department_id`` when given.
+
+        Returns:
+            dict with total_members, total_organization_members, organization_name,
+            department_name, present_today, pending_leaves, late_arrivals and
+            attendance_percentage
+        """
+        today = today or datetime.utcnow().date()
+        key = TeamStatsService.cache_key(organization_id, department_id, today)
+        stats = cache.get(key)
+        if stats is None:
+            stats = TeamStatsService._compute(organization_id, department_id, today)
+            cache.set(key, stats, timeout=TEAM_STATS_TIMEOUT)
+        return stats
+
+    @staticmethod
+    def _compute(organization_id, department_id, today):
+        ar = AttendanceRecord
+        start_of_month = today.replace(day=1)
+
+        def members(scoped):
+            query = db.session.query(func.count(Employee.id)).join(User, User.id == Employee.user_id).filter(
+                Employee.organization_id == organization_id,
+                Employee.is_active.is_(True),
+                User.is_active.is_(True)
+            )
+            if scoped and department_id:
+                query = query.filter(Employee.department_id == department_id)
+            return query.scalar_subquery()
+
+        def checked_in(*criteria):
+            query = db.session.query(func.count(ar.id)).filter(
+                ar.organization_id == organization_id,
+                ar.check_in_time.isnot(None),
+                *criteria
+            )
+            if department_id:
+                query = query.join(Employee, Employee.id == ar.employee_id).filter(
+                    Employee.department_id == department_id
+                )
+            return query.scalar_subquery()
+
+        pending_leaves = db.session.query(func.count(LeaveRequest.id)).filter(
+            LeaveRequest.organization_id == organization_id,
+            LeaveRequest.status == 'pending'
+        )
+        if department_id:
+            pending_leaves = pending_leaves.join(Employee, Employee.id == LeaveRequest.employee_id).filter(
+                Employee.department_id == department_id
+            )
+
+        organization_name = db.session.query(Organization.name).filter(
+            Organization.id == organization_id
+        ).scalar_subquery()
+        department_name = db.session.query(Department.name).filter(
+            Department.id == department_id
+        ).scalar_subquery()
+
+        row = db.session.query(
+            members(True).label('total_members'),
+            members(False).label('total_organization_members'),
+            checked_in(ar.date == today).label('present_today'),
+            checked_in(ar.date == today, ar.is_late.is_(True)).label('late_arrivals'),
+            checked_in(ar.date >= start_of_month, ar.date <= today).label('month_attendance'),
+            pending_leaves.scalar_subquery().label('pending_leaves'),
+            organization_name.label('organization_name'),
+            department_name.label('department_name')
+        ).one()
+
+        working_days = (today - start_of_month).days + 1
+        expected_attendance = row.total_members * working_days
+        attendance_percentage = (row.month_attendance / expected_attendance * 100) if expected_attendance > 0 else 0
+
+        return {
+            'total_members': row.total_members,
+            'total_organization_members': row.total_organization_members,
+            'organization_name': row.organization_name or 'Unknown Organization',
+            'department_name': row.department_name if department_id and row.department_name else 'All Departments',
+            'present_today': row.present_today,
+            'pending_leaves': row.pending_leaves,
+            'late_arrivals': row.late_arrivals,
+            'attendance_percentage': round(attendance_percentage, 1)
+        }
@@ -0,0 +1,215 @@
+"""
+Monthly top performer rankings for an organization.
+"""
+
+import logging
+from datetime import date, timedelta
+from sqlalchemy import func, case, or_, and_
+from ..extensions import db, cache
+from ..models import Employee, AttendanceRecord, LeaveRequest, Department, User
+
+logger = logging.getLogger(__name__)
+
+# Rankings are cached this deep; requests may ask for fewer
+MAX_LIMIT = 100
+# The running month is also invalidated on writes; this only bounds day rollover
+CURRENT_MONTH_TIMEOUT = 300
+# Closed months only change through late corrections, which invalidate them too;
+# this bounds a missed invalidation (e.g. a write committed by another process)
+CLOSED_MONTH_TIMEOUT = 3600
+
+# Punctual: at most one day without a check-in and never late; low leave: at most this many days
+PUNCTUAL_MAX_MISSED_DAYS = 1
+LOW_LEAVE_MAX_DAYS = 2
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+class TopPerformersService:
+    """
+    Ranks an organization's active employees for one month: punctual
+    employees by days present and low-leave employees by approved leave
+    days, each with ``RANK()`` over the per-employee aggregates, in one
+    statement.
+
+    Results are cached per (organization, month): closed months for
+    CLOSED_MONTH_TIMEOUT, the running month for CURRENT_MONTH_TIMEOUT.
+    Writers call ``invalidate`` once their transaction is committed, so a
+    reader cannot cache rankings of data that is about to change.
+    """
+
+    @staticmethod
+    def cache_key(organization_id, month):
+        return f"top_performers:{organization_id}:{month:%Y-%m}"
+
+    @staticmethod
+    def invalidate(organization_id, start_date, end_date=None):
+        """Drop cached rankings of every month overlapping ``start_date``..``end_date``."""
+        month = _month_start(start_date)
+        last = _month_start(end_date or start_date)
+        while month <= last:
+            cache.delete(TopPerformersService.cache_key(organization_id, month))
+            month = _next_month(month)
+
+    @staticmethod
+    def invalidate_days(days):
+        """``invalidate`` every (organization_id, date) pair in ``days``."""
+        ranges = {}
+        for organization_id, day in days:
+            low, high = ranges.get(organization_id, (day, day))
+            ranges[organization_id] = (min(low, day), max(high, day))
+        for organization_id, (low, high) in ranges.items():
+            TopPerformersService.invalidate(organization_id, low, high)
+
+    @staticmethod
+    def get_top_performers(organization_id, month, limit=10, today=None):
+        """
+        Top performers of ``month`` (any date in it). The running month is
+        evaluated up to ``today``.
+
+        Returns:
+            dict with punctual_employees, low_leave_employees, month and total_employees
+        """
+        today = today or date.today()
+        start_date = _month_start(month)
+        end_date = _next_month(start_date) - timedelta(days=1)
+        if start_date <= today:
+            end_date = min(end_date, today)
+        is_closed = end_date < today
+
+        key = TopPerformersService.cache_key(organization_id, start_date)
+        result = cache.get(key)
+        if result is None:
+            result = TopPerformersService._rank(organization_id, start_date, end_date)
+            cache.set(key, result, timeout=CLOSED_MONTH_TIMEOUT if is_closed else CURRENT_MONTH_TIMEOUT)
+
+        return {
+            **result,
+            'punctual_employees': result['punctual_employees'][:limit],
+            'low_leave_employees': result['low_leave_employees'][:limit],
+        }
+
+    @staticmethod
+    def _rank(organization_id, start_date, end_date):
+        ar = AttendanceRecord
+        total_days = (end_date - start_date).days + 1
+
+        attendance = db.session.query(
+            ar.employee_id,
+            func.count(ar.id).label('present_days'),
+            func.sum(case((ar.is_late.is_(True), 1), else_=0)).label('late_arrivals')
+        ).filter(
+            ar.organization_id == organization_id,
+            ar.date >= start_date,
+            ar.date <= end_date,
+            ar.check_in_time.isnot(None)
+        ).group_by(ar.employee_id).subquery('attendance')
+
+        leave_filter = (
+            LeaveRequest.organization_id == organization_id,
+            LeaveRequest.status == 'approved',
+            LeaveRequest.start_date <= end_date,
+            LeaveRequest.end_date >= start_date,
+        )
+        leave_totals = db.session.query(
+            LeaveRequest.employee_id,
+            func.sum(LeaveRequest.total_days).label('leave_days')
+        ).filter(*leave_filter).group_by(LeaveRequest.employee_id).subquery('leave_totals')
+        leave_types = db.session.query(
+            LeaveRequest.employee_id,
+            LeaveRequest.leave_type,
+            func.sum(LeaveRequest.total_days).label('days')
+        ).filter(*leave_filter).group_by(LeaveRequest.employee_id, LeaveRequest.leave_type).subquery('leave_types')
+
+        present_days = func.coalesce(attendance.c.present_days, 0)
+        late_arrivals = func.coalesce(attendance.c.late_arrivals, 0)
+        leave_days = func.coalesce(leave_totals.c.leave_days, 0)
+        is_punctual = case(
+            (and_(present_days >= total_days - PUNCTUAL_MAX_MISSED_DAYS, late_arrivals == 0), 1), else_=0
+        )
+        is_low_leave = case((leave_days <= LOW_LEAVE_MAX_DAYS, 1), else_=0)
+
+        ranked = db.session.query(
+            Employee.id.label('employee_id'),
+            Employee.full_name,
+            Employee.employee_code,
+            Employee.joining_date,
+            Department.name.label('department'),
+            User.email,
+            present_days.label('present_days'),
+            late_arrivals.label('late_arrivals'),
+            leave_days.label('leave_days'),
+            is_punctual.label('is_punctual'),
+            is_low_leave.label('is_low_leave'),
+            func.rank().over(partition_by=is_punctual, order_by=(present_days - late_arrivals).desc()).label('punctual_rank'),
+            func.rank().over(partition_by=is_low_leave, order_by=leave_days.asc()).label('leave_rank'),
+            func.row_number().over(order_by=Employee.id).label('row_number'),
+            func.count().over().label('total_employees')
+        ).outerjoin(Department, Department.id == Employee.department_id) \
+            .outerjoin(User, User.id == Employee.user_id) \
+            .outerjoin(attendance, attendance.c.employee_id == Employee.id) \
+            .outerjoin(leave_totals, leave_totals.c.employee_id == Employee.id) \
+            .filter(
+                Employee.organization_id == organization_id,
+                Employee.is_active.is_(True),
+                Employee.deleted_at.is_(None)
+            ).subquery('ranked')
+
+        rows = db.session.query(
+            ranked,
+            leave_types.c.leave_type,
+            leave_types.c.days.label('leave_type_days')
+        ).outerjoin(leave_types, leave_types.c.employee_id == ranked.c.employee_id).filter(or_(
+            and_(ranked.c.is_punctual == 1, ranked.c.punctual_rank <= MAX_LIMIT),
+            and_(ranked.c.is_low_leave == 1, ranked.c.leave_rank <= MAX_LIMIT),
+            # Carries total_employees when nobody qualifies
+            ranked.c.row_number == 1
+        )).all()
+
+        employees = {}
+        for r in rows:
+            entry = employees.get(r.employee_id)
+            if entry is None:
+                entry = employees[r.employee_id] = {'row': r, 'leave_types': {}}
+            if r.leave_type:
+                entry['leave_types'][r.leave_type] = float(r.leave_type_days)
+
+        punctual, low_leave = [], []
+        for entry in employees.values():
+            r = entry['row']
+            employee_data = {
+                'employee_id': r.employee_id,
+                'full_name': r.full_name,
+                'employee_code': r.employee_code,
+                'department': r.department or '',
+                'email': r.email or '',
+                'joining_date': r.joining_date.isoformat() if r.joining_date else None,
+            }
+            if r.is_punctual and r.punctual_rank <= MAX_LIMIT:
+                punctual.append((r.punctual_rank, r.full_name, {
+                    **employee_data,
+                    'rank': r.punctual_rank,
+                    'present_days': int(r.present_days),
+                    'late_arrivals': int(r.late_arrivals),
+                    'attendance_percentage': round((int(r.present_days) / total_days * 100), 1),
+                }))
+            if r.is_low_leave and r.leave_rank <= MAX_LIMIT:
+                low_leave.append((r.leave_rank, r.full_name, {
+                    **employee_data,
+                    'rank': r.leave_rank,
+                    'leave_days': float(r.leave_days),
+                    'leave_types': entry['leave_types'],
+                }))
+
+        return {
+            'punctual_employees': [item for *_, item in sorted(punctual, key=lambda p: p[:2])][:MAX_LIMIT],
+            'low_leave_employees': [item for *_, item in sorted(low_leave, key=lambda p: p[:2])][:MAX_LIMIT],
+            'month': start_date.strftime('%Y-%m'),
+            'total_employees': int(rows[0].total_employees) if rows else 0,
+        }
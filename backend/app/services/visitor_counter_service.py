@@ -0,0 +1,244 @@
+"""
+Incremental visitor dashboard counters.
+"""
+
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import func
+from ..extensions import db
+from ..models import (
+    Organization, OrganizationVisitor, VisitorAlert, VisitorHealthScreening,
+    DeliveryLog, VisitorPreRegistration
+)
+from ..utils.date_ranges import within_days, local_today, organization_timezone, zone
+from ..utils.visitor_counter_store import get_visitor_counter_store
+from .realtime_service import RealtimeService
+
+logger = logging.getLogger(__name__)
+
+# Dashboard keys of the per-type entries of the day
+TYPE_FIELDS = {
+    'guest': 'guests_today',
+    'contractor': 'contractors_today',
+    'vendor': 'vendors_today',
+    'interview_candidate': 'interviews_today',
+    'delivery': 'delivery_today',
+    'service_provider': 'service_today',
+    'vip': 'vip_today',
+}
+GAUGE_FIELDS = ('active_visitors', 'contractors_active', 'pending_preregistrations')
+DAY_FIELDS = ('entries_today', 'alerts_today', 'health_cleared_today', 'vip_visitors_today', 'deliveries_today')
+
+
+def _type_field(visitor_type):
+    return f"type:{visitor_type}"
+
+
+def _dashboard_key(field):
+    if field.startswith("type:"):
+        return TYPE_FIELDS.get(field[len("type:"):])
+    return field
+
+
+def _local_day(at, timezone_name):
+    return at.replace(tzinfo=timezone.utc).astimezone(zone(timezone_name)).date()
+
+
+class VisitorCounterService:
+    """
+    Keeps the reception dashboard counters of each organization in the
+    visitor counter store (Redis when REDIS_URL is set) so reading them is
+    O(1) instead of ten COUNT queries per poll.
+
+    VisitorService reports each committed change: ``visitor_changed`` with
+    the visitor's state before and after, ``event_recorded`` for alerts,
+    cleared health screenings and deliveries, ``preregistration_changed``
+    for pre-registration status. Counters are rebuilt from the database when
+    missing (first read, new day, store restart) and by ``reconcile_all``,
+    run periodically to correct drift (e.g. cascaded deletes). A reconcile
+    that overlaps a change keeps the stored counters instead of its possibly
+    older count. Without Redis each process has its own counters, which
+    ``reconcile_all`` in another process (the CLI) cannot reach; they are
+    recomputed once MEMORY_BASELINE_MAX_AGE_SECONDS old instead. Every change
+    is also pushed to the organization's dashboards as a ``visitor_stats``
+    delta.
+    """
+
+    @staticmethod
+    def visitor_state(visitor):
+        """The fields of a visitor that the counters depend on (None for no visitor)."""
+        if visitor is None:
+            return None
+        return (bool(visitor.is_checked_in), visitor.visitor_type, visitor.check_in_time)
+
+    @staticmethod
+    def _contribution(state, timezone_name, today):
+        gauges, counters = {}, {}
+        if state is None:
+            return gauges, counters
+        is_checked_in, visitor_type, check_in_time = state
+        if is_checked_in:
+            gauges['active_visitors'] = 1
+            if visitor_type == 'contractor':
+                gauges['contractors_active'] = 1
+        if check_in_time is not None and _local_day(check_in_time, timezone_name) == today:
+            counters['entries_today'] = 1
+            counters[_type_field(visitor_type)] = 1
+            if visitor_type == 'vip':
+                counters['vip_visitors_today'] = 1
+        return gauges, counters
+
+    @staticmethod
+    def _apply(organization_id, gauge_deltas, day_deltas, today):
+        gauge_deltas = {k: v for k, v in gauge_deltas.items() if v}
+        day_deltas = {k: v for k, v in day_deltas.items() if v}
+        if not gauge_deltas and not day_deltas:
+            return
+        try:
+            day = today.isoformat() if today else None
+            get_visitor_counter_store().apply(organization_id, day, gauge_deltas, day_deltas)
+        except Exception:
+            # The next reconciliation restores the counters
+            logger.exception(f"Failed to update visitor counters of organization {organization_id}")
+
+        delta = {_dashboard_key(k): v for k, v in {**gauge_deltas, **day_deltas}.items()}
+        delta.pop(None, None)
+        RealtimeService.publish(organization_id, 'visitor_stats', {'delta': delta})
+
+    @staticmethod
+    def visitor_changed(organization_id, before, after):
+        """Apply the difference between two ``visitor_state`` values (after commit)."""
+        timezone_name = organization_timezone(organization_id)
+        today = local_today(timezone_name)
+        old_gauges, old_counters = VisitorCounterService._contribution(before, timezone_name, today)
+        new_gauges, new_counters = VisitorCounterService._contribution(after, timezone_name, today)
+        VisitorCounterService._apply(
+            organization_id,
+            {k: new_gauges.get(k, 0) - old_gauges.get(k, 0) for k in set(old_gauges) | set(new_gauges)},
+            {k: new_counters.get(k, 0) - old_counters.get(k, 0) for k in set(old_counters) | set(new_counters)},
+            today
+        )
+
+    @staticmethod
+    def event_recorded(organization_id, field, at=None):
+        """Count an alert, cleared screening or delivery of the day (after commit)."""
+        timezone_name = organization_timezone(organization_id)
+        today = local_today(timezone_name)
+        if _local_day(at or datetime.utcnow(), timezone_name) == today:
+            VisitorCounterService._apply(organization_id, {}, {field: 1}, today)
+
+    @staticmethod
+    def preregistration_changed(organization_id, old_status, new_status):
+        """Track the pending pre-registration gauge (after commit)."""
+        delta = (new_status == 'pending') - (old_status == 'pending')
+        if delta:
+            VisitorCounterService._apply(organization_id, {'pending_preregistrations': delta}, {}, None)
+
+    # ------------------------------------------------------------------ reading
+
+    @staticmethod
+    def get_stats(organization_id):
+        """Dashboard statistics of the organization's local day."""
+        timezone_name = organization_timezone(organization_id)
+        today = local_today(timezone_name)
+        counters = None
+        try:
+            counters = get_visitor_counter_store().load(organization_id, today.isoformat())
+        except Exception:
+            logger.exception("Visitor counter store unavailable; counting from the database")
+        if counters is None:
+            counters = VisitorCounterService.reconcile(organization_id, timezone_name, today)
+
+        stats = {field: counters.get(field, 0) for field in GAUGE_FIELDS + DAY_FIELDS}
+        for visitor_type, key in TYPE_FIELDS.items():
+            stats[key] = counters.get(_type_field(visitor_type), 0)
+        return stats
+
+    @staticmethod
+    def compute(organization_id, timezone_name, today):
+        """
+        Counters from the database: one statement of scalar counts and one
+        grouped count of the day's entries by visitor type.
+
+        Returns:
+            (gauges, day_counters)
+        """
+        ov = OrganizationVisitor
+        checked_in = db.session.query(func.count(ov.id)).filter(
+            ov.organization_id == organization_id, ov.is_checked_in.is_(True)
+        )
+        row = db.session.query(
+            checked_in.scalar_subquery().label('active_visitors'),
+            checked_in.filter(ov.visitor_type == 'contractor').scalar_subquery().label('contractors_active'),
+            db.session.query(func.count(VisitorPreRegistration.id)).filter(
+                VisitorPreRegistration.organization_id == organization_id,
+                VisitorPreRegistration.status == 'pending'
+            ).scalar_subquery().label('pending_preregistrations'),
+            db.session.query(func.count(VisitorAlert.id)).filter(
+                VisitorAlert.organization_id == organization_id,
+                within_days(VisitorAlert.alert_time, today, timezone_name=timezone_name)
+            ).scalar_subquery().label('alerts_today'),
+            db.session.query(func.count(VisitorHealthScreening.id)).filter(
+                VisitorHealthScreening.organization_id == organization_id,
+                within_days(VisitorHealthScreening.screened_at, today, timezone_name=timezone_name),
+                VisitorHealthScreening.result == 'passed'
+            ).scalar_subquery().label('health_cleared_today'),
+            db.session.query(func.count(DeliveryLog.id)).filter(
+                DeliveryLog.organization_id == organization_id,
+                within_days(DeliveryLog.created_at, today, timezone_name=timezone_name)
+            ).scalar_subquery().label('deliveries_today')
+        ).one()
+
+        type_counts = dict(db.session.query(ov.visitor_type, func.count(ov.id)).filter(
+            ov.organization_id == organization_id,
+            within_days(ov.check_in_time, today, timezone_name=timezone_name)
+        ).group_by(ov.visitor_type).all())
+
+        gauges = {field: int(getattr(row, field)) for field in GAUGE_FIELDS}
+        counters = {
+            'entries_today': sum(type_counts.values()),
+            'alerts_today': int(row.alerts_today),
+            'health_cleared_today': int(row.health_cleared_today),
+            'vip_visitors_today': type_counts.get('vip', 0),
+            'deliveries_today': int(row.deliveries_today),
+        }
+        counters.update({_type_field(t): n for t, n in type_counts.items()})
+        return gauges, counters
+
+    @staticmethod
+    def reconcile(organization_id, timezone_name=None, today=None):
+        """Rebuild the organization's counters from the database and store them."""
+        if today is None:
+            timezone_name = organization_timezone(organization_id)
+            today = local_today(timezone_name)
+        store = get_visitor_counter_store()
+        try:
+            version = store.version(organization_id)
+        except Exception:
+            logger.exception(f"Failed to read the visitor counter version of organization {organization_id}")
+            version = None
+        gauges, counters = VisitorCounterService.compute(organization_id, timezone_name, today)
+        if version is None:
+            return {**gauges, **counters}
+        try:
+            if not store.replace(organization_id, today.isoformat(), gauges, counters, version=version):
+                # A change was applied while counting; the stored counters already include it
+                logger.info(f"Visitor counters of organization {organization_id} changed during reconcile, kept")
+        except Exception:
+            logger.exception(f"Failed to store visitor counters of organization {organization_id}")
+        return {**gauges, **counters}
+
+    @staticmethod
+    def reconcile_all():
+        """
+        Rebuild the counters of every active organization.
+
+        Returns:
+            Number of organizations reconciled
+        """
+        organizations = db.session.query(Organization.id, Organization.timezone).filter(
+            Organization.is_active.is_(True), Organization.deleted_at.is_(None)
+        ).all()
+        for organization_id, timezone_name in organizations:
+            VisitorCounterService.reconcile(organization_id, timezone_name, local_today(timezone_name))
+        return len(organizations)
@@ -10,9 +10,66 @@ from ..models import (
     DeliveryLog, VIPVisitorPreference
 )
 from ..extensions import db
-from .image_service import ImageService
+from .photo_persistence_service import PhotoPersistenceService
+from .blacklist_probe_service import BlacklistProbeService
+from .visitor_counter_service import VisitorCounterService
+from ..utils.date_ranges import since_day, until_day, parse_day, organization_timezone
+from ..utils.exceptions import ValidationError
+from ..utils.validators import normalize_phone, validate_uuid
 from datetime import datetime
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, case, cast, func, literal, tuple_, Float
+import re
+import json
+import base64
+import binascii
+
+# Queries made of digits and phone punctuation search mobile numbers once they have this many digits
+PHONE_QUERY_MIN_DIGITS = 3
+PHONE_QUERY_PATTERN = re.compile(r'^\+?[\d\s\-().]+$')
+# Shorter name queries have no trigrams to search with and only match name prefixes
+NAME_SUBSTRING_MIN_CHARS = 3
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _name_match(term):
+    """
+    Name filter and rank for a search term.
+
+    PostgreSQL uses pg_trgm (idx_visitor_org_name_trgm): ILIKE substring
+    matches plus fuzzy word similarity (``visitor_name %> term``), ranked by
+    ``word_similarity``. Other databases fall back to ILIKE with a coarse
+    exact / prefix / substring rank.
+    """
+    name = OrganizationVisitor.visitor_name
+    escaped = _escape_like(term)
+    pattern = f'%{escaped}%' if len(term) >= NAME_SUBSTRING_MIN_CHARS else f'{escaped}%'
+    substring = name.ilike(pattern, escape='\\')
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return or_(substring, name.op('%>')(term)), func.word_similarity(term, name)
+
+    rank = case(
+        (func.lower(name) == term.lower(), 1.0),
+        (name.ilike(f'{escaped}%', escape='\\'), 0.75),
+        else_=0.5
+    )
+    return substring, rank
+
+
+def _encode_search_cursor(visitor, rank):
+    raw = json.dumps({'r': rank, 't': visitor.check_in_time.isoformat(), 'id': visitor.id})
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_search_cursor(cursor):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return position['r'], datetime.fromisoformat(position['t']), position['id']
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValidationError('Invalid cursor')
 
 
 class VisitorService:
@@ -28,7 +85,8 @@ class VisitorService:
             visitor_data: Dict with {name, mobile_number, purpose_of_visit, allowed_floor, image_base64}
         
         Returns:
-            OrganizationVisitor instance
+            OrganizationVisitor instance. Its photos are committed as
+            placeholders and stored by PhotoPersistenceService in the background.
         """
         # Verify organization exists
         org = Organization.query.get(organization_id)
@@ -73,50 +131,40 @@ class VisitorService:
         db.session.add(visitor)
         db.session.flush()  # Flush to get the visitor ID without committing
         
-        # Save visitor photo (primary)
+        # Photos are stored by the background worker; only placeholders are written here
+        photos = []
         if visitor_data.get('image_base64'):
-            try:
-                ImageService.create_image(
-                    entity_type='visitor',
-                    entity_id=visitor.id,
-                    organization_id=organization_id,
-                    image_base64=visitor_data.get('image_base64'),
-                    image_type='photo',
-                    capture_device='webcam',
-                    primary=True
-                )
-            except Exception as e:
-                print(f"Warning: Failed to save visitor image: {str(e)}")
+            photos.append({
+                'image_base64': visitor_data.get('image_base64'),
+                'image_type': 'photo',
+                'capture_device': 'webcam',
+                'primary': True
+            })
 
-        # Save vehicle photos
         vehicle_photos = visitor_data.get('vehicle_photos')
-        if vehicle_photos and isinstance(vehicle_photos, list):
-            saved_vehicle_photos = []
-            for idx, photo in enumerate(vehicle_photos):
-                if photo.get('base64'):
-                   try:
-                       # Create image record
-                       img = ImageService.create_image(
-                           entity_type='visitor',
-                           entity_id=visitor.id,
-                           organization_id=organization_id,
-                           image_base64=photo.get('base64'),
-                           image_type=f"vehicle_{photo.get('type', 'generic')}",
-                           capture_device='webcam',
-                           primary=False
-                       )
-                       saved_vehicle_photos.append({
-                           'type': photo.get('type'),
-                           'image_id': img.id,
-                           'url': img.file_path # Assuming ImageService returns object with file_path or url
-                       })
-                   except Exception as e:
-                       print(f"Warning: Failed to save vehicle photo {idx}: {str(e)}")
-            
-            # Update visitor record with reference to saved photos
-            visitor.vehicle_photos = saved_vehicle_photos
+        if not isinstance(vehicle_photos, list):
+            vehicle_photos = []
+        vehicle_photos = [photo for photo in vehicle_photos if photo.get('base64')]
+        for photo in vehicle_photos:
+            photos.append({
+                'image_base64': photo.get('base64'),
+                'image_type': f"vehicle_{photo.get('type', 'generic')}",
+                'capture_device': 'webcam',
+                'primary': False
+            })
+
+        photo_jobs = PhotoPersistenceService.reserve(organization_id, 'visitor', visitor.id, photos)
+        if vehicle_photos:
+            # Reference the (pending) photos by id; signed URLs are built when serialising
+            vehicle_jobs = photo_jobs[len(photos) - len(vehicle_photos):]
+            visitor.vehicle_photos = [{
+                'type': photo.get('type'),
+                'image_id': image_id,
+            } for photo, (image_id, _) in zip(vehicle_photos, vehicle_jobs)]
 
         db.session.commit()
+        PhotoPersistenceService.submit(photo_jobs)
+        VisitorCounterService.visitor_changed(organization_id, None, VisitorCounterService.visitor_state(visitor))
         
         return visitor
 
@@ -148,31 +196,17 @@ class VisitorService:
         Returns:
             (total_count, visitors_list)
         """
-        from sqlalchemy import func
-        from datetime import datetime
-        
         query = OrganizationVisitor.query.filter_by(organization_id=organization_id)
         
-        # Apply date range filter if provided
-        if from_date:
-            try:
-                # Parse the start date
-                from_date_obj = datetime.strptime(from_date, '%Y-%m-%d').date()
-                # Filter visitors by check-in date >= from_date
-                query = query.filter(func.date(OrganizationVisitor.check_in_time) >= from_date_obj)
-            except ValueError:
-                # If date format is invalid, ignore the filter
-                pass
-        
-        if to_date:
-            try:
-                # Parse the end date
-                to_date_obj = datetime.strptime(to_date, '%Y-%m-%d').date()
-                # Filter visitors by check-in date <= to_date
-                query = query.filter(func.date(OrganizationVisitor.check_in_time) <= to_date_obj)
-            except ValueError:
-                # If date format is invalid, ignore the filter
-                pass
+        # Apply date range filter if provided (days in the organization's timezone;
+        # invalid dates are ignored)
+        from_day, to_day = parse_day(from_date), parse_day(to_date)
+        if from_day or to_day:
+            timezone_name = organization_timezone(organization_id)
+            if from_day:
+                query = query.filter(since_day(OrganizationVisitor.check_in_time, from_day, timezone_name))
+            if to_day:
+                query = query.filter(until_day(OrganizationVisitor.check_in_time, to_day, timezone_name))
         
         total = query.count()
         
@@ -185,46 +219,84 @@ class VisitorService:
         return total, visitors.items
 
     @staticmethod
-    def search_visitors(organization_id, query='', status='all', limit=50):
+    def search_visitors(organization_id, query='', status='all', limit=50, cursor=None):
         """
-        Search visitors by name, mobile number, or visitor ID.
-        If no query is provided, returns all visitors sorted by latest first.
-        
+        Search visitors by name, mobile number, or visitor ID, one keyset page at a time.
+
+        - Phone-like queries (digits and phone punctuation, at least
+          PHONE_QUERY_MIN_DIGITS digits) match ``mobile_normalized`` exactly
+          or by prefix, exact matches first.
+        - A full visitor ID matches that visitor.
+        - Anything else matches names through the pg_trgm index: substring or
+          word similarity, ranked by word similarity. Queries shorter than
+          three characters only match name prefixes.
+        - No query lists visitors latest first.
+
+        Every branch is served by an (organization_id, ...) index, and pages
+        continue after the cursor instead of using OFFSET.
+
         Args:
             organization_id: Organization UUID
             query: Search term (optional - empty string returns all)
             status: Filter by status (checked_in, checked_out, all)
             limit: Maximum number of records to return
-        
+            cursor: next_cursor of the previous page (optional)
+
         Returns:
-            List of matching visitors sorted by check_in_time desc (latest first)
+            dict with items (visitors), next_cursor and has_more
         """
-        base_query = OrganizationVisitor.query.filter_by(organization_id=organization_id)
-        
-        # Apply search filters only if query is provided
-        if query.strip():
-            search_filter = or_(
-                OrganizationVisitor.visitor_name.ilike(f'%{query}%'),
-                OrganizationVisitor.mobile_number.ilike(f'%{query}%'),
-                OrganizationVisitor.id.ilike(f'%{query}%')
-            )
-            base_query = base_query.filter(search_filter)
-        
+        ov = OrganizationVisitor
+        base_query = ov.query.filter(ov.organization_id == organization_id)
+        rank = None
+
+        term = (query or '').strip()
+        if term:
+            digits = normalize_phone(term)
+            if PHONE_QUERY_PATTERN.match(term) and len(digits or '') >= PHONE_QUERY_MIN_DIGITS:
+                base_query = base_query.filter(ov.mobile_normalized.like(f'{digits}%'))
+                rank = case((ov.mobile_normalized == digits, 1.0), else_=0.0)
+            elif validate_uuid(term):
+                base_query = base_query.filter(ov.id == term.lower())
+            else:
+                match, rank = _name_match(term)
+                base_query = base_query.filter(match)
+
         # Apply status filter
         if status == 'checked_in':
-            base_query = base_query.filter(OrganizationVisitor.is_checked_in == True)
+            base_query = base_query.filter(ov.is_checked_in == True)
         elif status == 'checked_out':
-            base_query = base_query.filter(OrganizationVisitor.is_checked_in == False)
-        
-        # Sort by latest first (most recent check_in_time)
-        visitors = base_query.order_by(OrganizationVisitor.check_in_time.desc()).limit(limit).all()
-        
-        return visitors
+            base_query = base_query.filter(ov.is_checked_in == False)
+
+        # Best match first, then latest check-in
+        sort_keys = [ov.check_in_time, ov.id]
+        if rank is not None:
+            rank = cast(rank, Float)
+            sort_keys.insert(0, rank)
+            base_query = base_query.add_columns(rank)
+        else:
+            base_query = base_query.add_columns(literal(None))
+
+        if cursor:
+            after_rank, after_time, after_id = _decode_search_cursor(cursor)
+            position = [after_time, after_id] if rank is None else [after_rank, after_time, after_id]
+            base_query = base_query.filter(tuple_(*sort_keys) < tuple_(*position))
+
+        # One extra row tells whether another page exists
+        rows = base_query.order_by(*[key.desc() for key in sort_keys]).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return {
+            'items': [visitor for visitor, _ in rows],
+            'next_cursor': _encode_search_cursor(*rows[-1]) if has_more else None,
+            'has_more': has_more,
+        }
 
     @staticmethod
     def check_in_visitor(organization_id, visitor_id, check_in_data=None):
         """Check in a visitor"""
         visitor = VisitorService.get_visitor(organization_id, visitor_id)
+        before = VisitorCounterService.visitor_state(visitor)
         
         visitor.is_checked_in = True
         visitor.check_in_time = datetime.utcnow()
@@ -234,6 +306,7 @@ class VisitorService:
             visitor.current_floor = check_in_data.get('current_floor')
         
         db.session.commit()
+        VisitorCounterService.visitor_changed(organization_id, before, VisitorCounterService.visitor_state(visitor))
         
         return visitor
 
@@ -241,11 +314,13 @@ class VisitorService:
     def check_out_visitor(organization_id, visitor_id, check_out_data=None):
         """Check out a visitor"""
         visitor = VisitorService.get_visitor(organization_id, visitor_id)
+        before = VisitorCounterService.visitor_state(visitor)
         
         visitor.is_checked_in = False
         visitor.check_out_time = datetime.utcnow()
         
         db.session.commit()
+        VisitorCounterService.visitor_changed(organization_id, before, VisitorCounterService.visitor_state(visitor))
         
         return visitor
 
@@ -294,6 +369,8 @@ class VisitorService:
         
         db.session.add(movement_log)
         db.session.commit()
+        if alert is not None:
+            VisitorCounterService.event_recorded(organization_id, 'alerts_today', alert.alert_time)
         
         return movement_log, alert
 
@@ -350,9 +427,11 @@ class VisitorService:
     def delete_visitor(organization_id, visitor_id):
         """Delete a visitor record"""
         visitor = VisitorService.get_visitor(organization_id, visitor_id)
+        before = VisitorCounterService.visitor_state(visitor)
         
         db.session.delete(visitor)
         db.session.commit()
+        VisitorCounterService.visitor_changed(organization_id, before, None)
 
     @staticmethod
     def get_active_visitors(organization_id):
@@ -384,113 +463,11 @@ class VisitorService:
 
     @staticmethod
     def get_dashboard_stats(organization_id):
-        from sqlalchemy import func, and_
-        today = datetime.now().date()
-        
-        try:
-            # Active visitors
-            active_visitors = OrganizationVisitor.query.filter_by(
-                organization_id=organization_id,
-                is_checked_in=True
-            ).count()
-            
-            # Entries today
-            entries_today = OrganizationVisitor.query.filter(
-                OrganizationVisitor.organization_id == organization_id,
-                func.date(OrganizationVisitor.check_in_time) == today
-            ).count()
-            
-            # Alerts today
-            alerts_today = VisitorAlert.query.filter(
-                VisitorAlert.organization_id == organization_id,
-                func.date(VisitorAlert.alert_time) == today
-            ).count()
-            
-            # --- NEW STATISTICS ---
-            
-            # Health Screenings Cleared Today
-            health_cleared_today = 0
-            try:
-                # Basic check for table existence if needed, or just let it fail/pass
-                health_cleared_today = VisitorHealthScreening.query.join(OrganizationVisitor).filter(
-                    OrganizationVisitor.organization_id == organization_id,
-                    func.date(VisitorHealthScreening.created_at) == today,
-                    VisitorHealthScreening.result == 'pass'
-                ).count()
-            except Exception:
-                db.session.rollback() # Rollback inner failure if any
-                health_cleared_today = 0
-                
-            # VIP Visitors Today
-            vip_visitors_today = OrganizationVisitor.query.filter(
-                OrganizationVisitor.organization_id == organization_id,
-                func.date(OrganizationVisitor.check_in_time) == today,
-                OrganizationVisitor.visitor_type == 'vip'
-            ).count()
-            
-            # Active Contractors
-            contractors_active = OrganizationVisitor.query.filter_by(
-                organization_id=organization_id,
-                visitor_type='contractor',
-                is_checked_in=True
-            ).count()
-            
-            # Deliveries Today
-            deliveries_today = 0
-            try:
-                deliveries_today = DeliveryLog.query.join(OrganizationVisitor).filter(
-                    OrganizationVisitor.organization_id == organization_id,
-                    func.date(DeliveryLog.created_at) == today
-                ).count()
-            except Exception:
-                db.session.rollback()
-                deliveries_today = 0
-                
-            # Pending Pre-Registrations
-            pending_preregistrations = 0
-            try:
-                pending_preregistrations = VisitorPreRegistration.query.filter_by(
-                    organization_id=organization_id,
-                    status='pending'
-                ).count()
-            except Exception:
-                db.session.rollback()
-                pending_preregistrations = 0
-
-            # Visitor Types Breakdown (Today)
-            visitor_types = db.session.query(
-                OrganizationVisitor.visitor_type, 
-                func.count(OrganizationVisitor.id)
-            ).filter(
-                OrganizationVisitor.organization_id == organization_id,
-                func.date(OrganizationVisitor.check_in_time) == today
-            ).group_by(OrganizationVisitor.visitor_type).all()
-            
-            type_counts = {t[0]: t[1] for t in visitor_types}
-            
-            return {
-                'active_visitors': active_visitors,
-                'entries_today': entries_today,
-                'alerts_today': alerts_today,
-                'health_cleared_today': health_cleared_today,
-                'vip_visitors_today': vip_visitors_today,
-                'contractors_active': contractors_active,
-                'deliveries_today': deliveries_today,
-                'pending_preregistrations': pending_preregistrations,
-                
-                # Type breakdowns
-                'guests_today': type_counts.get('guest', 0),
-                'contractors_today': type_counts.get('contractor', 0),
-                'vendors_today': type_counts.get('vendor', 0),
-                'interviews_today': type_counts.get('interview_candidate', 0),
-                'delivery_today': type_counts.get('delivery', 0),
-                'service_today': type_counts.get('service_provider', 0),
-                'vip_today': type_counts.get('vip', 0)
-            }
-
-        except Exception as e:
-            db.session.rollback()
-            raise e
+        """
+        Reception dashboard counters of the organization's local day, read
+        from the incremental visitor counters (see VisitorCounterService).
+        """
+        return VisitorCounterService.get_stats(organization_id)
 
     # ==================== BLACKLIST MANAGEMENT ====================
     
@@ -498,6 +475,9 @@ class VisitorService:
     def check_blacklist(organization_id, phone=None, email=None, id_proof=None):
         """
         Check if visitor is blacklisted.
+
+        The organization's probe set rules out most visitors without a
+        query; only probable matches are looked up here.
         
         Returns:
             (is_blacklisted, blacklist_entry_or_none)
@@ -525,6 +505,9 @@ class VisitorService:
         
         if not criteria:
             return False, None
+
+        if not BlacklistProbeService.might_match(organization_id, phone, email, id_proof):
+            return False, None
         
         entry = query.filter(or_(*criteria)).first()
         
@@ -549,6 +532,7 @@ class VisitorService:
         
         db.session.add(entry)
         db.session.commit()
+        BlacklistProbeService.entry_added(entry)
         
         return entry
     
@@ -563,6 +547,7 @@ class VisitorService:
         if not entry:
             raise ValueError(f"Blacklist entry {blacklist_id} not found")
         
+        # Its probe keys stay until the next probe build; checks confirm them here
         db.session.delete(entry)
         db.session.commit()
     
@@ -604,6 +589,7 @@ class VisitorService:
         
         db.session.add(prereg)
         db.session.commit()
+        VisitorCounterService.preregistration_changed(organization_id, None, prereg.status)
         
         return prereg
     
@@ -618,11 +604,13 @@ class VisitorService:
         if not prereg:
             raise ValueError(f"Pre-registration {prereg_id} not found")
         
+        old_status = prereg.status
         prereg.status = 'approved'
         prereg.approved_by = approved_by
         prereg.approved_at = datetime.utcnow()
         
         db.session.commit()
+        VisitorCounterService.preregistration_changed(organization_id, old_status, prereg.status)
         
         # TODO: Send email confirmation with QR code
         
@@ -639,10 +627,12 @@ class VisitorService:
         if not prereg:
             raise ValueError(f"Pre-registration {prereg_id} not found")
         
+        old_status = prereg.status
         prereg.status = 'rejected'
         prereg.rejection_reason = reason
         
         db.session.commit()
+        VisitorCounterService.preregistration_changed(organization_id, old_status, prereg.status)
         
         return prereg
     
@@ -774,6 +764,7 @@ class VisitorService:
         
         db.session.add(delivery)
         db.session.commit()
+        VisitorCounterService.event_recorded(organization_id, 'deliveries_today', delivery.created_at)
         
         return delivery
     
@@ -831,6 +822,8 @@ class VisitorService:
         
         db.session.add(screening)
         db.session.commit()
+        if screening.result == 'passed':
+            VisitorCounterService.event_recorded(organization_id, 'health_cleared_today', screening.screened_at)
         
         return screening
 
@@ -1000,6 +993,7 @@ class VisitorService:
         visitor.last_visit_date = datetime.utcnow()
         
         db.session.commit()
+        VisitorCounterService.visitor_changed(organization_id, None, VisitorCounterService.visitor_state(new_visitor))
         
         return new_visitor
 
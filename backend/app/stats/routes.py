@@ -18,6 +18,8 @@ from ..extensions import db
 from sqlalchemy import func
 from sqlalchemy.exc import ProgrammingError
 from ..services.attendance_service import AttendanceService
+from ..services.camera_service import CameraService
+from ..services.stats_overview_service import StatsOverviewService
 
 bp = Blueprint("stats", __name__)
 
@@ -138,6 +140,10 @@ def stats_overview():
                 total:
                   type: integer
                   example: 300
+            generated_at:
+              type: string
+              format: date-time
+              description: When the cached snapshot was computed (UTC)
       401:
         description: Unauthorized - Invalid or expired token
         schema:
@@ -161,97 +167,8 @@ def stats_overview():
             errorCode:
               type: string
     """
-    # Organizations
-    try:
-        org_total = db.session.query(func.count(Organization.id)).scalar() or 0
-        org_active = db.session.query(func.count(Organization.id)).filter(Organization.is_active.is_(True)).scalar() or 0
-        print(f"Org total: {org_total}, active: {org_active}")
-    except ProgrammingError as e:
-        print(f"[stats_overview] Organizations table missing: {e}")
-        org_total = org_active = 0
-        db.session.rollback()
-    
-    # Employees
-    try:
-        emp_total = db.session.query(func.count(Employee.id)).scalar() or 0
-        emp_active = db.session.query(func.count(Employee.id)).filter(Employee.is_active.is_(True)).scalar() or 0
-    except ProgrammingError as e:
-        print(f"[stats_overview] Employees table missing: {e}")
-        emp_total = emp_active = 0
-        db.session.rollback()
-
-    # Face embeddings
-    try:
-        face_total = db.session.query(func.count(FaceEmbedding.id)).scalar() or 0
-        face_primary = db.session.query(func.count(FaceEmbedding.id)).filter(FaceEmbedding.is_primary.is_(True)).scalar() or 0
-        face_avg_quality = db.session.query(func.avg(FaceEmbedding.quality_score)).scalar() or 0.0
-    except ProgrammingError as e:
-        print(f"[stats_overview] FaceEmbeddings table missing: {e}")
-        face_total = face_primary = 0
-        face_avg_quality = 0.0
-        db.session.rollback()
-
-    # Presence events
-    try:
-        pe_total = db.session.query(func.count(PresenceEvent.id)).scalar() or 0
-        pe_unknown = db.session.query(func.count(PresenceEvent.id)).filter(PresenceEvent.is_unknown_face.is_(True)).scalar() or 0
-        pe_anomalies = db.session.query(func.count(PresenceEvent.id)).filter(PresenceEvent.is_anomaly.is_(True)).scalar() or 0
-        pe_pending = db.session.query(func.count(PresenceEvent.id)).filter(PresenceEvent.review_status == "pending").scalar() or 0
-    except ProgrammingError as e:
-        print(f"[stats_overview] PresenceEvents table missing: {e}")
-        pe_total = pe_unknown = pe_anomalies = pe_pending = 0
-        db.session.rollback()
-
-    # Cameras
-    try:
-        cam_total = db.session.query(func.count(Camera.id)).scalar() or 0
-        cam_online = db.session.query(func.count(Camera.id)).filter(Camera.status == "online").scalar() or 0
-    except ProgrammingError as e:
-        print(f"[stats_overview] Cameras table missing: {e}")
-        cam_total = cam_online = 0
-        db.session.rollback()
-
-    # Legacy visitors (if present)
-    VisitorDetails = getattr(legacy_models, "VisitorDetails", None)
-    visitors_total = 0
-    if VisitorDetails is not None:
-        try:
-            visitors_total = db.session.query(func.count(VisitorDetails.aadhaar_id)).scalar() or 0
-        except ProgrammingError as e:
-            print(f"[stats_overview] VisitorDetails table missing: {e}")
-            visitors_total = 0
-            db.session.rollback()
-
-    payload = {
-        "organizations": {
-            "total": int(org_total),
-            "active": int(org_active),
-        },
-        "employees": {
-            "total": int(emp_total),
-            "active": int(emp_active),
-        },
-        "face_embeddings": {
-            "total": int(face_total),
-            "primary": int(face_primary),
-            "avg_quality": float(face_avg_quality) if face_avg_quality is not None else 0.0,
-        },
-        "presence_events": {
-            "total": int(pe_total),
-            "unknown_faces": int(pe_unknown),
-            "anomalies": int(pe_anomalies),
-            "pending_reviews": int(pe_pending),
-        },
-        "cameras": {
-            "total": int(cam_total),
-            "online": int(cam_online),
-        },
-        "visitors": {
-            "total": int(visitors_total),
-        },
-    }
-
-    return jsonify(payload), 200
+    # Served from a snapshot refreshed in the background (see StatsOverviewService)
+    return jsonify(StatsOverviewService.get_overview()), 200
 
 
 @bp.get("/api/analytics/attendance")
@@ -366,7 +283,6 @@ def organization_analytics():
     emp_query = db.session.query(func.count(Employee.id))
     emp_active_query = db.session.query(func.count(Employee.id)).filter(Employee.is_active.is_(True))
     cam_query = db.session.query(func.count(Camera.id))
-    cam_online_query = db.session.query(func.count(Camera.id)).filter(Camera.status == "online")
     pe_query = db.session.query(func.count(PresenceEvent.id))
     pe_unknown_query = db.session.query(func.count(PresenceEvent.id)).filter(PresenceEvent.is_unknown_face.is_(True))
     pe_anomalies_query = db.session.query(func.count(PresenceEvent.id)).filter(PresenceEvent.is_anomaly.is_(True))
@@ -399,7 +315,6 @@ def organization_analytics():
         emp_query = emp_query.filter(Employee.organization_id == organization_id)
         emp_active_query = emp_active_query.filter(Employee.organization_id == organization_id)
         cam_query = cam_query.filter(Camera.organization_id == organization_id)
-        cam_online_query = cam_online_query.filter(Camera.organization_id == organization_id)
         pe_query = pe_query.filter(PresenceEvent.organization_id == organization_id)
         pe_unknown_query = pe_unknown_query.filter(PresenceEvent.organization_id == organization_id)
         pe_anomalies_query = pe_anomalies_query.filter(PresenceEvent.organization_id == organization_id)
@@ -412,7 +327,7 @@ def organization_analytics():
         emp_total = emp_query.scalar() or 0
         emp_active = emp_active_query.scalar() or 0
         cam_total = cam_query.scalar() or 0
-        cam_online = cam_online_query.scalar() or 0
+        cam_online = CameraService.count_online(organization_id)
         pe_total = pe_query.scalar() or 0
         pe_unknown = pe_unknown_query.scalar() or 0
         pe_anomalies = pe_anomalies_query.scalar() or 0
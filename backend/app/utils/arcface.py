@@ -35,6 +35,14 @@ class FaceEmbedder:
             print(f"[ERROR] Failed to extract embedding: {e}")
             return None
 
+    def get_embeddings(self, faces_bgr):
+        """
+        Embed several face crops in one call. Returns one embedding (or None)
+        per input, in order. The pinned DeepFace version has no batched
+        ``represent``, so crops are embedded back to back on the loaded model.
+        """
+        return [self.get_embedding(face) for face in faces_bgr]
+
 
 
 # import numpy as np
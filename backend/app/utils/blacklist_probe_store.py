@@ -0,0 +1,155 @@
+# app/utils/blacklist_probe_store.py
+
+import os
+import threading
+import time
+
+from flask import current_app
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger("BlacklistProbeStore")
+
+# Probe sets are rebuilt from the database this often, dropping removed entries
+BLACKLIST_PROBE_TTL_SECONDS = int(os.environ.get("BLACKLIST_PROBE_TTL_SECONDS", 900))
+# Expiry stored for entries without an end date
+PERMANENT = 0.0
+LOADED_FIELD = "_loaded"
+
+
+def later_expiry(a, b):
+    """The later of two expiries (PERMANENT outlives everything)."""
+    if a == PERMANENT or b == PERMANENT:
+        return PERMANENT
+    return max(a, b)
+
+
+def _active(expiry, now):
+    return expiry == PERMANENT or expiry > now
+
+
+class InMemoryBlacklistProbeStore:
+    """
+    Per-organization probe set of hashed blacklist keys, kept in process.
+    Each key maps to the latest expiry (epoch seconds) of the entries it
+    belongs to.
+
+    ``lookup`` returns None while the organization's set is not loaded (a
+    set older than the TTL is dropped), else whether any key is present and
+    unexpired. ``add`` only ever extends expiries, so a build racing with an add
+    cannot hide the added entry.
+
+    Not ``shared``: entries added through another worker never reach this
+    process's sets, so a miss here proves nothing.
+    """
+
+    shared = False
+
+    def __init__(self, ttl_seconds=BLACKLIST_PROBE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._sets = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, organization_id, keys, now=None):
+        now = now or time.time()
+        with self._lock:
+            probe = self._sets.get(organization_id)
+            if probe is None or probe["loaded_at"] is None:
+                return None
+            if now - probe["loaded_at"] > self.ttl_seconds:
+                # Expired as a whole, like the Redis hash; the next build starts afresh
+                del self._sets[organization_id]
+                return None
+            return any(key in probe["keys"] and _active(probe["keys"][key], now) for key in keys)
+
+    def add(self, organization_id, expiries, loaded=False):
+        with self._lock:
+            probe = self._sets.setdefault(organization_id, {"keys": {}, "loaded_at": None})
+            for key, expiry in expiries.items():
+                probe["keys"][key] = later_expiry(probe["keys"].get(key, expiry), expiry)
+            if loaded:
+                probe["loaded_at"] = time.time()
+
+    def clear(self, organization_id):
+        with self._lock:
+            self._sets.pop(organization_id, None)
+
+
+class RedisBlacklistProbeStore:
+    """
+    Same contract as InMemoryBlacklistProbeStore, shared by every backend
+    worker: one hash per organization (field = key, value = expiry) that
+    expires after the TTL. Expiries are merged with a Lua script so they
+    only ever grow; a lookup is one HMGET.
+    """
+
+    shared = True
+
+    MERGE_SCRIPT = """
+    for i = 1, #ARGV - 2, 2 do
+        local current = redis.call('HGET', KEYS[1], ARGV[i])
+        local expiry = tonumber(ARGV[i + 1])
+        if current then
+            current = tonumber(current)
+            if current == 0 or expiry == 0 then
+                expiry = 0
+            elseif current > expiry then
+                expiry = current
+            end
+        end
+        redis.call('HSET', KEYS[1], ARGV[i], expiry)
+    end
+    if ARGV[#ARGV - 1] == '1' then
+        redis.call('HSET', KEYS[1], '_loaded', ARGV[#ARGV])
+        redis.call('EXPIRE', KEYS[1], ARGV[#ARGV])
+    end
+    """
+
+    def __init__(self, redis_client, prefix="visitor:blacklist:", ttl_seconds=BLACKLIST_PROBE_TTL_SECONDS):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self._merge = redis_client.register_script(self.MERGE_SCRIPT)
+
+    def _key(self, organization_id):
+        return f"{self.prefix}{organization_id}"
+
+    def lookup(self, organization_id, keys, now=None):
+        now = now or time.time()
+        values = self.redis.hmget(self._key(organization_id), [LOADED_FIELD, *keys])
+        if values[0] is None:
+            return None
+        return any(value is not None and _active(float(value), now) for value in values[1:])
+
+    def add(self, organization_id, expiries, loaded=False):
+        args = []
+        for key, expiry in expiries.items():
+            args.extend([key, repr(float(expiry))])
+        args.extend(["1" if loaded else "0", str(self.ttl_seconds)])
+        self._merge(keys=[self._key(organization_id)], args=args)
+
+    def clear(self, organization_id):
+        self.redis.delete(self._key(organization_id))
+
+
+def create_blacklist_probe_store(redis_url=None):
+    """Redis-backed store when ``redis_url`` is set, in-memory otherwise."""
+    if redis_url:
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url)
+            client.ping()
+            return RedisBlacklistProbeStore(client)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for blacklist probes, using in-memory store: {e}")
+    return InMemoryBlacklistProbeStore()
+
+
+def get_blacklist_probe_store():
+    """The blacklist probe store of the current app, created on first use."""
+    store = current_app.extensions.get("blacklist_probes")
+    if store is None:
+        store = current_app.extensions.setdefault(
+            "blacklist_probes", create_blacklist_probe_store(current_app.config.get("REDIS_URL"))
+        )
+    return store
@@ -0,0 +1,133 @@
+# app/utils/blob_store.py
+
+import hashlib
+import os
+import tempfile
+
+from flask import current_app
+
+
+class BlobNotFoundError(KeyError):
+    """No blob is stored under the requested digest."""
+
+
+def content_digest(data):
+    """SHA-256 hex digest addressing ``data`` in a blob store."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class LocalBlobStore:
+    """
+    Content-addressed blobs in a local directory, fanned out by digest prefix
+    (``<root>/ab/cd/abcd...``). Identical content is stored once.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def put(self, data, content_type=None):
+        """Store ``data`` and return its digest (no-op when already stored)."""
+        digest = content_digest(data)
+        path = self.path(digest)
+        if os.path.exists(path):
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write next to the target and rename so readers never see partial blobs
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest):
+        try:
+            with open(self.path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFoundError(digest)
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def delete(self, digest):
+        try:
+            os.unlink(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore:
+    """
+    Same contract as LocalBlobStore on an S3-compatible bucket (AWS S3,
+    MinIO, ...). ``client`` is a boto3 S3 client or anything exposing
+    head_object / put_object / get_object / delete_object the same way.
+    """
+
+    def __init__(self, client, bucket, prefix="blobs/"):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def key(self, digest):
+        return f"{self.prefix}{digest[:2]}/{digest}"
+
+    @staticmethod
+    def _is_missing(error):
+        code = str((getattr(error, "response", None) or {}).get("Error", {}).get("Code", ""))
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def put(self, data, content_type=None):
+        digest = content_digest(data)
+        if self.exists(digest):
+            return digest
+        extra = {"ContentType": content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=self.key(digest), Body=data, **extra)
+        return digest
+
+    def get(self, digest):
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.key(digest))
+        except Exception as e:
+            if self._is_missing(e):
+                raise BlobNotFoundError(digest)
+            raise
+        return response["Body"].read()
+
+    def exists(self, digest):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(digest))
+            return True
+        except Exception as e:
+            if self._is_missing(e):
+                return False
+            raise
+
+    def delete(self, digest):
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(digest))
+
+
+def create_blob_store(config):
+    """S3-backed store when BLOB_S3_BUCKET is configured, local directory otherwise."""
+    bucket = config.get("BLOB_S3_BUCKET")
+    if bucket:
+        import boto3
+        client = boto3.client("s3", endpoint_url=config.get("BLOB_S3_ENDPOINT_URL") or None)
+        return S3BlobStore(client, bucket, prefix=config.get("BLOB_S3_PREFIX") or "blobs/")
+    root = config.get("BLOB_STORAGE_PATH") or os.path.join(config.get("UPLOAD_FOLDER") or "./uploads", "blobs")
+    return LocalBlobStore(root)
+
+
+def get_blob_store():
+    """The blob store of the current app, created on first use."""
+    store = current_app.extensions.get("blob_store")
+    if store is None:
+        store = current_app.extensions.setdefault("blob_store", create_blob_store(current_app.config))
+    return store
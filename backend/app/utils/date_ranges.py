@@ -0,0 +1,79 @@
+"""
+Index-friendly day and date-range predicates.
+
+Timestamps are stored as naive UTC. Filtering them with ``func.date(column)``
+hides the column from its index, so day filters here are turned into
+half-open ``column >= start AND column < end`` ranges on the raw column,
+with the day boundaries taken in the organization's timezone.
+"""
+
+import logging
+from functools import lru_cache
+from datetime import datetime, date, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import and_, Date
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def zone(name):
+    """tzinfo for an IANA timezone name, falling back to UTC for unknown names."""
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown organization timezone {name!r}; using UTC")
+        return timezone.utc
+
+
+def organization_timezone(organization_id):
+    """The organization's timezone name (None if the organization does not exist)."""
+    from ..models import Organization
+    return db.session.query(Organization.timezone).filter(Organization.id == organization_id).scalar()
+
+
+def local_today(timezone_name=None):
+    """Today's date in ``timezone_name``."""
+    return datetime.now(zone(timezone_name)).date()
+
+
+def _utc_midnight(day, timezone_name):
+    local = datetime.combine(day, time.min, tzinfo=zone(timezone_name))
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _bound(column, day, timezone_name):
+    # Date columns already hold a day and are compared as is
+    return day if isinstance(column.type, Date) else _utc_midnight(day, timezone_name)
+
+
+def since_day(column, start_date, timezone_name=None):
+    """Predicate selecting rows of ``column`` from the local day ``start_date`` on."""
+    return column >= _bound(column, start_date, timezone_name)
+
+
+def until_day(column, end_date, timezone_name=None):
+    """Predicate selecting rows of ``column`` up to and including the local day ``end_date``."""
+    return column < _bound(column, end_date + timedelta(days=1), timezone_name)
+
+
+def within_days(column, start_date, end_date=None, timezone_name=None):
+    """
+    Half-open predicate selecting rows of ``column`` on the local days
+    ``start_date`` through ``end_date`` (inclusive; a single day by default).
+    """
+    return and_(
+        since_day(column, start_date, timezone_name),
+        until_day(column, end_date or start_date, timezone_name)
+    )
+
+
+def parse_day(value):
+    """``date`` from a 'YYYY-MM-DD' string (dates pass through); None when empty or invalid."""
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+    except ValueError:
+        return None
@@ -41,13 +41,44 @@ class ObjectDetector:
             
         results = self.model.predict(frame, device="cuda" if torch.cuda.is_available() else "cpu")
     
-        if not results or not hasattr(results[0], "boxes") or results[0].boxes is None:
+        if not results:
+            return []
+
+        return self._boxes_from_result(results[0], frame)
+
+    def detect_batch(self, frames):
+        """
+    Runs detection on several frames in a single model call.
+
+    Parameters:
+        frames (List[np.ndarray]): Input images (may come from different cameras).
+
+    Returns:
+        List[List[List[float]]]: One list of xywh boxes per input frame, in order.
+        """
+        if not frames:
+            return []
+
+        if self.model is None:
+            logger.warning("Model is not loaded. Cannot perform detection.")
+            return [[] for _ in frames]
+
+        results = self.model.predict(list(frames), device="cuda" if torch.cuda.is_available() else "cpu")
+        if not results:
+            return [[] for _ in frames]
+
+        return [self._boxes_from_result(result, frame) for result, frame in zip(results, frames)]
+
+    @staticmethod
+    def _boxes_from_result(result, frame):
+        """Convert one YOLO result into filtered xywh boxes for its frame."""
+        if not hasattr(result, "boxes") or result.boxes is None:
             return []
 
         boxes_xywh = []
-        for result in results[0].boxes.data:
-            x1, y1, x2, y2 = map(int, result[:4])
-            conf = float(result[4])
+        for box in result.boxes.data:
+            x1, y1, x2, y2 = map(int, box[:4])
+            conf = float(box[4])
         
             if conf < 0.4:
                 continue
@@ -0,0 +1,300 @@
+# app/utils/face_tracker.py
+
+import os
+import time
+import itertools
+import threading
+
+import numpy as np
+import cv2
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger("FaceTracker")
+
+TRACK_IOU_THRESHOLD = float(os.environ.get("TRACK_IOU_THRESHOLD", 0.3))
+TRACK_MAX_MISSES = int(os.environ.get("TRACK_MAX_MISSES", 5))
+TRACK_MIN_HITS = int(os.environ.get("TRACK_MIN_HITS", 2))
+TRACK_MAX_EMBEDDINGS = int(os.environ.get("TRACK_MAX_EMBEDDINGS", 3))
+TRACK_QUALITY_GAIN = float(os.environ.get("TRACK_QUALITY_GAIN", 1.15))
+
+_track_ids = itertools.count(1)
+
+
+# --------------------------- Box helpers ---------------------------
+
+def xywh_to_xyxy(box):
+    """Convert an ObjectDetector (x_center, y_center, w, h) box to (x1, y1, x2, y2)."""
+    xc, yc, w, h = box
+    return np.array([xc - w / 2, yc - h / 2, xc + w / 2, yc + h / 2], dtype=np.float32)
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU between two arrays of xyxy boxes."""
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+
+    a = np.asarray(boxes_a, dtype=np.float32)[:, None, :]
+    b = np.asarray(boxes_b, dtype=np.float32)[None, :, :]
+
+    ix1 = np.maximum(a[..., 0], b[..., 0])
+    iy1 = np.maximum(a[..., 1], b[..., 1])
+    ix2 = np.minimum(a[..., 2], b[..., 2])
+    iy2 = np.minimum(a[..., 3], b[..., 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def face_quality(face_bgr):
+    """
+    Score a face crop for embedding: sharpness (Laplacian variance) weighted by
+    crop size, so large, in-focus faces close to the camera are preferred.
+    """
+    if face_bgr is None or face_bgr.size == 0:
+        return 0.0
+    gray = cv2.cvtColor(face_bgr, cv2.COLOR_BGR2GRAY) if face_bgr.ndim == 3 else face_bgr
+    sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    return sharpness * float(np.sqrt(gray.shape[0] * gray.shape[1]))
+
+
+def crop_box(frame, box_xyxy):
+    """Crop an xyxy box out of a frame, clamped to the frame bounds."""
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = box_xyxy
+    x1, y1 = max(0, int(x1)), max(0, int(y1))
+    x2, y2 = min(w, int(x2)), min(h, int(y2))
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return frame[y1:y2, x1:x2]
+
+
+def l2_normalize(x, eps=1e-12):
+    n = np.linalg.norm(x)
+    return x / max(n, eps)
+
+
+# --------------------------- Tracking ---------------------------
+
+class Track:
+    """A single face followed across consecutive frames of one camera."""
+
+    def __init__(self, box_xyxy, now):
+        self.track_id = next(_track_ids)
+        self.box = np.asarray(box_xyxy, dtype=np.float32)
+        self.velocity = np.zeros(4, dtype=np.float32)
+        self.hits = 1
+        self.misses = 0
+        self.first_seen = now
+        self.last_seen = now
+
+        self.best_quality = 0.0
+        self.embeddings = []  # list of (embedding, quality)
+        self.emitted = False
+
+    def predict(self):
+        """Constant-velocity prediction of where the face is in the next frame."""
+        return self.box + self.velocity
+
+    def update(self, box_xyxy, now):
+        box_xyxy = np.asarray(box_xyxy, dtype=np.float32)
+        # Exponentially smoothed velocity keeps matching stable on jittery boxes
+        self.velocity = 0.5 * self.velocity + 0.5 * (box_xyxy - self.box)
+        self.box = box_xyxy
+        self.hits += 1
+        self.misses = 0
+        self.last_seen = now
+
+    def prototype(self):
+        """Quality-weighted mean of the embeddings collected for this track."""
+        if not self.embeddings:
+            return None
+        embs = np.vstack([e for e, _ in self.embeddings])
+        q = np.array([max(q, 1e-6) for _, q in self.embeddings], dtype=np.float32)
+        return l2_normalize(np.sum(embs * (q / q.sum())[:, None], axis=0))
+
+
+class FaceTracker:
+    """
+    IoU + velocity multi-object tracker for one camera.
+
+    ``update`` matches detector boxes to existing tracks greedily by IoU against
+    each track's predicted position, spawns tracks for unmatched boxes and
+    retires tracks that have been missing for more than ``max_misses`` frames.
+    """
+
+    def __init__(self, iou_threshold=TRACK_IOU_THRESHOLD, max_misses=TRACK_MAX_MISSES):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.tracks = []
+
+    def update(self, boxes_xywh, now=None):
+        """
+        Advance the tracker by one frame.
+
+        Parameters:
+            boxes_xywh (List[List[float]]): Boxes as returned by ObjectDetector.detect.
+
+        Returns:
+            Tuple[List[Tuple[Track, np.ndarray]], List[Track]]:
+                (matched or new tracks with their current xyxy box, retired tracks)
+        """
+        now = now if now is not None else time.time()
+        boxes = [xywh_to_xyxy(b) for b in boxes_xywh or []]
+
+        predicted = [t.predict() for t in self.tracks]
+        ious = iou_matrix(predicted, boxes)
+
+        matched_tracks, matched_boxes, active = set(), set(), []
+        if ious.size:
+            # Greedy assignment, best overlaps first
+            order = np.dstack(np.unravel_index(np.argsort(-ious, axis=None), ious.shape))[0]
+            for ti, bi in order:
+                if ious[ti, bi] < self.iou_threshold:
+                    break
+                if ti in matched_tracks or bi in matched_boxes:
+                    continue
+                self.tracks[ti].update(boxes[bi], now)
+                matched_tracks.add(ti)
+                matched_boxes.add(bi)
+                active.append((self.tracks[ti], boxes[bi]))
+
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track.misses += 1
+
+        for bi, box in enumerate(boxes):
+            if bi not in matched_boxes:
+                track = Track(box, now)
+                self.tracks.append(track)
+                active.append((track, box))
+
+        retired = [t for t in self.tracks if t.misses > self.max_misses]
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        return active, retired
+
+
+class TrackedRecognizer:
+    """
+    Per-camera tracking front-end for the embed + search stage.
+
+    Each track is embedded at most ``max_embeddings`` times: once it is
+    confirmed (``min_hits`` frames) and afterwards only when a crop beats the
+    best quality seen so far by ``quality_gain``. Exactly one recognition is
+    emitted per track, either as soon as the embedding budget is spent or when
+    the track disappears, using the quality-weighted prototype of its embeddings.
+
+    Parameters:
+        embedder: Object with ``get_embedding(face_bgr)`` (e.g. FaceEmbedder).
+        search_fn: Callable ``search_fn(embedding) -> match`` (e.g. a Qdrant lookup).
+    """
+
+    def __init__(self, embedder, search_fn,
+                 min_hits=TRACK_MIN_HITS,
+                 max_embeddings=TRACK_MAX_EMBEDDINGS,
+                 quality_gain=TRACK_QUALITY_GAIN,
+                 **tracker_kwargs):
+        self.embedder = embedder
+        self.search_fn = search_fn
+        self.min_hits = min_hits
+        self.max_embeddings = max_embeddings
+        self.quality_gain = quality_gain
+        self.tracker_kwargs = tracker_kwargs
+
+        self._trackers = {}
+        self._lock = threading.Lock()
+
+        self.embedding_calls = 0
+        self.recognitions_emitted = 0
+
+    def get_tracker(self, camera_id):
+        tracker = self._trackers.get(camera_id)
+        if tracker is None:
+            with self._lock:
+                tracker = self._trackers.setdefault(camera_id, FaceTracker(**self.tracker_kwargs))
+        return tracker
+
+    def _maybe_embed(self, track, frame, box):
+        if track.emitted or track.hits < self.min_hits:
+            return
+        if len(track.embeddings) >= self.max_embeddings:
+            return
+
+        crop = crop_box(frame, box)
+        quality = face_quality(crop)
+        if quality <= 0:
+            return
+        if track.embeddings and quality < track.best_quality * self.quality_gain:
+            return
+
+        emb = self.embedder.get_embedding(crop)
+        self.embedding_calls += 1
+        if emb is None:
+            return
+
+        track.best_quality = max(track.best_quality, quality)
+        track.embeddings.append((l2_normalize(np.asarray(emb, dtype=np.float32).reshape(-1)), quality))
+
+    def _emit(self, camera_id, track):
+        embedding = track.prototype()
+        track.emitted = True
+        if embedding is None:
+            return None
+
+        self.recognitions_emitted += 1
+        return {
+            "camera_id": camera_id,
+            "track_id": track.track_id,
+            "face_bbox": [float(v) for v in track.box],
+            "face_quality_score": track.best_quality,
+            "embedding": embedding,
+            "match": self.search_fn(embedding),
+            "first_seen": track.first_seen,
+            "last_seen": track.last_seen,
+            "frames": track.hits,
+            "embeddings_used": len(track.embeddings),
+        }
+
+    def process(self, camera_id, frame, boxes_xywh, now=None):
+        """
+        Feed one frame's detections for a camera.
+
+        Returns:
+            List[dict]: Recognitions completed on this frame (usually empty).
+        """
+        active, retired = self.get_tracker(camera_id).update(boxes_xywh, now)
+
+        recognitions = []
+        for track, box in active:
+            self._maybe_embed(track, frame, box)
+            if not track.emitted and len(track.embeddings) >= self.max_embeddings:
+                result = self._emit(camera_id, track)
+                if result:
+                    recognitions.append(result)
+
+        for track in retired:
+            if not track.emitted:
+                result = self._emit(camera_id, track)
+                if result:
+                    recognitions.append(result)
+
+        return recognitions
+
+    def flush(self, camera_id):
+        """Emit pending recognitions for a camera (e.g. when its stream stops)."""
+        tracker = self._trackers.pop(camera_id, None)
+        if tracker is None:
+            return []
+        results = [self._emit(camera_id, t) for t in tracker.tracks if not t.emitted]
+        return [r for r in results if r]
+
+    def get_stats(self):
+        return {
+            "cameras": len(self._trackers),
+            "active_tracks": sum(len(t.tracks) for t in list(self._trackers.values())),
+            "embedding_calls": self.embedding_calls,
+            "recognitions_emitted": self.recognitions_emitted,
+        }
@@ -0,0 +1,177 @@
+# app/utils/heartbeat_store.py
+
+import os
+import threading
+from datetime import datetime
+
+from flask import current_app
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger("HeartbeatStore")
+
+CAMERA_HEARTBEAT_FLUSH_SECONDS = float(os.environ.get("CAMERA_HEARTBEAT_FLUSH_SECONDS", 10))
+CAMERA_HEARTBEAT_TIMEOUT_SECONDS = float(os.environ.get("CAMERA_HEARTBEAT_TIMEOUT_SECONDS", 90))
+
+
+def is_stale(entry, cutoff):
+    return entry["last_heartbeat"] < cutoff
+
+
+class InMemoryHeartbeatStore:
+    """
+    Latest heartbeat per camera, kept in process.
+
+    ``record`` marks the camera dirty; ``take_dirty`` hands the changed
+    entries to the writer that persists them in one batch.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def record(self, camera_id, status, error_message=None, at=None):
+        entry = {
+            "status": status,
+            "error_message": error_message,
+            "last_heartbeat": at or datetime.utcnow(),
+        }
+        with self._lock:
+            self._entries[camera_id] = entry
+            self._dirty.add(camera_id)
+        return entry
+
+    def get_many(self, camera_ids):
+        with self._lock:
+            return {cid: dict(self._entries[cid]) for cid in camera_ids if cid in self._entries}
+
+    def take_dirty(self):
+        with self._lock:
+            dirty = {cid: dict(self._entries[cid]) for cid in self._dirty if cid in self._entries}
+            self._dirty.clear()
+        return dirty
+
+    def mark_dirty(self, camera_ids):
+        """Re-queue entries whose flush failed."""
+        with self._lock:
+            self._dirty.update(cid for cid in camera_ids if cid in self._entries)
+
+    def mark_stale(self, cutoff):
+        """Flip cameras silent since ``cutoff`` to offline. Returns their ids."""
+        with self._lock:
+            stale = [
+                cid for cid, entry in self._entries.items()
+                if entry["status"] != "offline" and is_stale(entry, cutoff)
+            ]
+            for cid in stale:
+                self._entries[cid]["status"] = "offline"
+                self._dirty.add(cid)
+        return stale
+
+
+class RedisHeartbeatStore:
+    """
+    Same contract as InMemoryHeartbeatStore, shared by every backend worker:
+    one hash per camera, a set of dirty ids and a sorted set of last-seen times.
+    """
+
+    def __init__(self, redis_client, prefix="camera:heartbeat:", ttl_seconds=7 * 24 * 3600):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.dirty_key = f"{prefix}dirty"
+        self.seen_key = f"{prefix}seen"
+        self.ttl = ttl_seconds
+
+    def _decode(self, raw):
+        if not raw:
+            return None
+        fields = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in raw.items()
+        }
+        return {
+            "status": fields["status"],
+            "error_message": fields.get("error_message") or None,
+            "last_heartbeat": datetime.fromisoformat(fields["last_heartbeat"]),
+        }
+
+    def _read(self, camera_ids):
+        camera_ids = list(camera_ids)
+        pipe = self.redis.pipeline(transaction=False)
+        for cid in camera_ids:
+            pipe.hgetall(self.prefix + cid)
+        entries = {}
+        for cid, raw in zip(camera_ids, pipe.execute()):
+            entry = self._decode(raw)
+            if entry is not None:
+                entries[cid] = entry
+        return entries
+
+    def record(self, camera_id, status, error_message=None, at=None):
+        at = at or datetime.utcnow()
+        key = self.prefix + camera_id
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping={
+            "status": status,
+            "error_message": error_message or "",
+            "last_heartbeat": at.isoformat(),
+        })
+        pipe.expire(key, self.ttl)
+        pipe.sadd(self.dirty_key, camera_id)
+        pipe.zadd(self.seen_key, {camera_id: at.timestamp()})
+        pipe.execute()
+        return {"status": status, "error_message": error_message, "last_heartbeat": at}
+
+    def get_many(self, camera_ids):
+        return self._read(camera_ids)
+
+    def take_dirty(self):
+        pipe = self.redis.pipeline()
+        pipe.smembers(self.dirty_key)
+        pipe.delete(self.dirty_key)
+        members, _ = pipe.execute()
+        return self._read(m.decode() if isinstance(m, bytes) else m for m in members)
+
+    def mark_dirty(self, camera_ids):
+        if camera_ids:
+            self.redis.sadd(self.dirty_key, *camera_ids)
+
+    def mark_stale(self, cutoff):
+        members = self.redis.zrangebyscore(self.seen_key, "-inf", cutoff.timestamp())
+        camera_ids = [m.decode() if isinstance(m, bytes) else m for m in members]
+        stale = [
+            cid for cid, entry in self._read(camera_ids).items()
+            if entry["status"] != "offline" and is_stale(entry, cutoff)
+        ]
+        if stale:
+            pipe = self.redis.pipeline()
+            for cid in stale:
+                pipe.hset(self.prefix + cid, "status", "offline")
+            pipe.sadd(self.dirty_key, *stale)
+            pipe.zrem(self.seen_key, *stale)
+            pipe.execute()
+        return stale
+
+
+def create_heartbeat_store(redis_url=None):
+    """Redis-backed store when ``redis_url`` is set, in-memory otherwise."""
+    if redis_url:
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url)
+            client.ping()
+            return RedisHeartbeatStore(client)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for camera heartbeats, using in-memory store: {e}")
+    return InMemoryHeartbeatStore()
+
+
+def get_heartbeat_store():
+    """The heartbeat store of the current app, created on first use."""
+    store = current_app.extensions.get("camera_heartbeats")
+    if store is None:
+        store = current_app.extensions.setdefault(
+            "camera_heartbeats", create_heartbeat_store(current_app.config.get("REDIS_URL"))
+        )
+    return store
@@ -8,7 +8,7 @@ from marshmallow import ValidationError as MarshmallowValidationError
 from .exceptions import ValidationError
 
 
-def success_response(data=None, message='Success', status_code=200):
+def success_response(data=None, message='Success', status_code=200, pagination=None):
     """Create a success response"""
     response = {
         'success': True,
@@ -16,6 +16,8 @@ def success_response(data=None, message='Success', status_code=200):
     }
     if data is not None:
         response['data'] = data
+    if pagination:
+        response['pagination'] = pagination
     return jsonify(response), status_code
 
 
@@ -0,0 +1,176 @@
+# app/utils/image_variants.py
+
+import hashlib
+import hmac
+import io
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+from flask import current_app
+from PIL import Image as PILImage, ImageOps
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger("ImageVariants")
+
+# Longest side in pixels of each resized variant; "original" is served as stored
+IMAGE_VARIANTS = {"thumb": 160, "medium": 640, "original": None}
+VARIANT_MIME_TYPE = "image/jpeg"
+VARIANT_JPEG_QUALITY = 82
+# Signed variant URLs stay valid for one to two windows of this length; the
+# expiry is rounded to the window so a URL stays the same, and cacheable,
+# within one window
+VARIANT_URL_TTL_SECONDS = int(os.environ.get("IMAGE_VARIANT_URL_TTL_SECONDS", 3600))
+
+
+def _variant_signature(image_id, variant, expires):
+    message = f"{image_id}:{variant}:{expires}".encode()
+    return hmac.new(current_app.config["SECRET_KEY"].encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_variant(image_id, variant, now=None):
+    """``expires`` and ``signature`` query parameters granting access to one variant."""
+    window = int(now or time.time()) // VARIANT_URL_TTL_SECONDS
+    expires = (window + 2) * VARIANT_URL_TTL_SECONDS
+    return {"expires": expires, "signature": _variant_signature(image_id, variant, expires)}
+
+
+def variant_url(image_id, variant="thumb"):
+    """Signed API path serving the image resized (thumb, medium) or as original."""
+    return f"/api/v2/images/{image_id}/variants/{variant}?{urlencode(sign_variant(image_id, variant))}"
+
+
+def verify_variant_signature(image_id, variant, expires, signature, now=None):
+    """Whether ``signature`` was issued by ``sign_variant`` for this variant and has not expired."""
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    if expires < (now or time.time()):
+        return False
+    return hmac.compare_digest(_variant_signature(image_id, variant, expires), signature or "")
+
+
+def render_variant(data, max_side, quality=VARIANT_JPEG_QUALITY):
+    """
+    JPEG bytes of the image in ``data`` scaled down to fit ``max_side``,
+    upright according to its EXIF orientation and without its metadata.
+
+    Raises:
+        ValueError: if ``data`` is not an image Pillow can read, or is
+            large enough to trip Pillow's decompression bomb check
+    """
+    try:
+        with PILImage.open(io.BytesIO(data)) as source:
+            # Let the JPEG decoder downscale while decoding (much faster for large photos)
+            source.draft("RGB", (max_side, max_side))
+            image = ImageOps.exif_transpose(source)
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.thumbnail((max_side, max_side), PILImage.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, "JPEG", quality=quality, optimize=True)
+    except (PILImage.UnidentifiedImageError, PILImage.DecompressionBombError, OSError) as e:
+        raise ValueError(f"Unreadable image: {e}")
+    return out.getvalue()
+
+
+class VariantCache:
+    """
+    Size-bounded disk cache of generated variants, keyed by content digest
+    and variant so identical images share their renditions.
+
+    Recency is the file mtime, refreshed on every hit. When the tracked size
+    goes over ``max_bytes`` the least recently used files are removed until
+    the cache is back under 90% of the limit. Several processes may share
+    the directory: each tracks its own estimate and corrects it from disk
+    when it evicts.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def path(self, digest, variant):
+        return os.path.join(self.root, digest[:2], f"{digest}.{variant}")
+
+    def get(self, digest, variant):
+        """Path of the cached variant, or None when it is not cached."""
+        path = self.path(digest, variant)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, digest, variant, data):
+        """Cache ``data`` for the variant and return its path."""
+        path = self.path(digest, variant)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write next to the target and rename so readers never see partial files
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+
+    def _scan(self):
+        """(path, size, mtime) of every cached file."""
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.startswith(".tmp-"):
+                    continue
+                file_path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                yield file_path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for file_path, file_size, _ in entries:
+            if size <= target:
+                break
+            try:
+                os.unlink(file_path)
+            except FileNotFoundError:
+                pass
+            size -= file_size
+            removed += 1
+        self._size = size
+        logger.info(f"Evicted {removed} image variants, cache now {size} bytes")
+
+
+def get_variant_cache():
+    """The variant cache of the current app, created on first use."""
+    cache = current_app.extensions.get("image_variant_cache")
+    if cache is None:
+        config = current_app.config
+        root = config.get("IMAGE_VARIANT_CACHE_PATH") or os.path.join(
+            config.get("UPLOAD_FOLDER") or "./uploads", "variants"
+        )
+        max_bytes = int(config.get("IMAGE_VARIANT_CACHE_MAX_MB") or 512) * 1024 * 1024
+        cache = current_app.extensions.setdefault("image_variant_cache", VariantCache(root, max_bytes))
+    return cache
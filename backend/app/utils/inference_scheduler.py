@@ -0,0 +1,215 @@
+# app/utils/inference_scheduler.py
+
+import os
+import time
+import queue
+import bisect
+import threading
+from concurrent.futures import Future
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger("InferenceScheduler")
+
+INFERENCE_MAX_BATCH_SIZE = int(os.environ.get("INFERENCE_MAX_BATCH_SIZE", 16))
+INFERENCE_MAX_WAIT_MS = float(os.environ.get("INFERENCE_MAX_WAIT_MS", 30))
+
+
+class Histogram:
+    """Minimal thread-safe fixed-bucket histogram for scheduler metrics."""
+
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last bucket is +Inf
+        self.total = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+            return {
+                "buckets": dict(zip(labels, self.counts)),
+                "count": self.total,
+                "mean": (self.sum / self.total) if self.total else 0.0,
+            }
+
+
+class _WorkItem:
+    __slots__ = ("camera_id", "payload", "future", "enqueued_at")
+
+    def __init__(self, camera_id, payload):
+        self.camera_id = camera_id
+        self.payload = payload
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class _BatchWorker:
+    """
+    Collects work items from a queue into micro-batches bounded by
+    ``max_batch_size`` and by ``max_wait_ms`` measured from the first item.
+    """
+
+    def __init__(self, name, batch_fn, max_batch_size, max_wait_ms):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.queue = queue.Queue()
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64])
+        self.queue_delay_ms = Histogram([1, 5, 10, 20, 30, 50, 100, 250])
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"inference-{self.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def submit(self, camera_id, payload):
+        if not self.running:
+            # Nothing would ever resolve the future
+            raise RuntimeError(f"{self.name} worker is not running")
+        item = _WorkItem(camera_id, payload)
+        self.queue.put(item)
+        return item.future
+
+    def _collect(self):
+        try:
+            first = self.queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch(self, batch):
+        started = time.monotonic()
+        self.batch_sizes.observe(len(batch))
+        for item in batch:
+            self.queue_delay_ms.observe((started - item.enqueued_at) * 1000.0)
+
+        try:
+            results = self.batch_fn([item.payload for item in batch])
+        except Exception as e:
+            logger.exception(f"{self.name} batch of {len(batch)} failed")
+            for item in batch:
+                item.future.set_exception(e)
+            return
+
+        results = list(results)
+        for item, result in zip(batch, results):
+            item.future.set_result(result)
+        if len(results) != len(batch):
+            logger.error(f"{self.name} batch of {len(batch)} returned {len(results)} results")
+            error = RuntimeError(f"{self.name} returned {len(results)} results for {len(batch)} inputs")
+            for item in batch[len(results):]:
+                item.future.set_exception(error)
+
+    def _run(self):
+        while not self._stop.is_set() or not self.queue.empty():
+            batch = self._collect()
+            if batch:
+                self._dispatch(batch)
+
+    def get_stats(self):
+        return {
+            "queue_depth": self.queue.qsize(),
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_delay_ms": self.queue_delay_ms.snapshot(),
+        }
+
+
+class InferenceScheduler:
+    """
+    Central scheduler that merges detection and embedding work from all
+    cameras into micro-batches for ``ObjectDetector.detect_batch`` and
+    ``FaceEmbedder.get_embeddings``.
+
+    Callers get a ``concurrent.futures.Future`` per request, so each camera
+    worker receives exactly its own result regardless of how the work was
+    batched:
+
+        scheduler = InferenceScheduler(detector, embedder)
+        scheduler.start()
+        boxes = scheduler.submit_detection(camera_id, frame).result()
+    """
+
+    def __init__(self, detector=None, embedder=None,
+                 max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+                 max_wait_ms=INFERENCE_MAX_WAIT_MS):
+        self.detector = detector
+        self.embedder = embedder
+        self._detection = _BatchWorker("detection", self._run_detection, max_batch_size, max_wait_ms)
+        self._embedding = _BatchWorker("embedding", self._run_embedding, max_batch_size, max_wait_ms)
+
+    def _run_detection(self, frames):
+        return self.detector.detect_batch(frames)
+
+    def _run_embedding(self, faces):
+        return self.embedder.get_embeddings(faces)
+
+    def start(self):
+        if self.detector is not None:
+            self._detection.start()
+        if self.embedder is not None:
+            self._embedding.start()
+        logger.info("Inference scheduler started")
+
+    def stop(self, timeout=5):
+        """Stop workers after draining already queued work."""
+        self._detection.stop(timeout)
+        self._embedding.stop(timeout)
+
+    def submit_detection(self, camera_id, frame):
+        """
+        Queue a frame for detection. Resolves to a list of xywh boxes.
+
+        Raises:
+            RuntimeError: if the scheduler has no running detection stage
+        """
+        return self._detection.submit(camera_id, frame)
+
+    def submit_embedding(self, camera_id, face_bgr):
+        """
+        Queue a face crop for embedding. Resolves to an embedding or None.
+
+        Raises:
+            RuntimeError: if the scheduler has no running embedding stage
+        """
+        return self._embedding.submit(camera_id, face_bgr)
+
+    def get_stats(self):
+        """Batch-size and queue-delay histograms for both stages."""
+        return {
+            "detection": self._detection.get_stats(),
+            "embedding": self._embedding.get_stats(),
+        }
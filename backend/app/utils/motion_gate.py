@@ -0,0 +1,180 @@
+# app/utils/motion_gate.py
+
+import os
+import time
+import threading
+
+import numpy as np
+import cv2
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger("MotionGate")
+
+# Defaults (overridable per deployment through the environment)
+MOTION_DOWNSCALE_WIDTH = int(os.environ.get("MOTION_DOWNSCALE_WIDTH", 160))
+MOTION_PIXEL_DELTA = int(os.environ.get("MOTION_PIXEL_DELTA", 25))
+MOTION_AREA_THRESHOLD = float(os.environ.get("MOTION_AREA_THRESHOLD", 0.01))
+MOTION_BG_ALPHA = float(os.environ.get("MOTION_BG_ALPHA", 0.05))
+MOTION_COOLDOWN_FRAMES = int(os.environ.get("MOTION_COOLDOWN_FRAMES", 10))
+MOTION_MAX_IDLE_INTERVAL = int(os.environ.get("MOTION_MAX_IDLE_INTERVAL", 30))
+
+
+class MotionGate:
+    """
+    Cheap per-camera motion detector used to decide whether a frame is worth
+    sending to the (expensive) ObjectDetector.
+
+    Frames are downscaled, converted to grayscale, blurred and compared to a
+    running-average background. Detection is triggered when the fraction of
+    changed pixels exceeds ``area_threshold``. After motion stops the gate stays
+    open for ``cooldown_frames`` frames, then falls back to an idle sampling
+    interval that doubles on every quiet check up to ``max_idle_interval``,
+    so the effective inference rate follows the activity in front of the camera.
+    """
+
+    def __init__(self,
+                 downscale_width=MOTION_DOWNSCALE_WIDTH,
+                 pixel_delta=MOTION_PIXEL_DELTA,
+                 area_threshold=MOTION_AREA_THRESHOLD,
+                 bg_alpha=MOTION_BG_ALPHA,
+                 cooldown_frames=MOTION_COOLDOWN_FRAMES,
+                 max_idle_interval=MOTION_MAX_IDLE_INTERVAL):
+        self.downscale_width = downscale_width
+        self.pixel_delta = pixel_delta
+        self.area_threshold = area_threshold
+        self.bg_alpha = bg_alpha
+        self.cooldown_frames = cooldown_frames
+        self.max_idle_interval = max(1, max_idle_interval)
+
+        self._background = None
+        self._cooldown_left = 0
+        self._idle_interval = 1
+        self._frames_since_inference = 0
+
+        # Counters for monitoring
+        self.frames_seen = 0
+        self.frames_passed = 0
+        self.last_motion_ratio = 0.0
+        self.last_motion_at = None
+
+    def _preprocess(self, frame):
+        """Downscale + grayscale + blur a frame for differencing."""
+        h, w = frame.shape[:2]
+        if w > self.downscale_width:
+            scale = self.downscale_width / float(w)
+            frame = cv2.resize(frame, (self.downscale_width, max(1, int(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(frame, (5, 5), 0).astype(np.float32)
+
+    def motion_ratio(self, frame):
+        """
+        Update the background model with ``frame`` and return the fraction of
+        pixels that differ from it by more than ``pixel_delta``.
+        """
+        small = self._preprocess(frame)
+
+        if self._background is None or self._background.shape != small.shape:
+            self._background = small.copy()
+            # Treat the first frame as motion so a freshly started camera is inspected once
+            return 1.0
+
+        diff = cv2.absdiff(small, self._background)
+        ratio = float(np.count_nonzero(diff > self.pixel_delta)) / diff.size
+        cv2.accumulateWeighted(small, self._background, self.bg_alpha)
+        return ratio
+
+    def should_detect(self, frame):
+        """
+        Decide whether detection should run on this frame.
+
+        Returns:
+            bool: True if the frame should be passed to the detector.
+        """
+        self.frames_seen += 1
+        self._frames_since_inference += 1
+
+        ratio = self.motion_ratio(frame)
+        self.last_motion_ratio = ratio
+
+        if ratio >= self.area_threshold:
+            self.last_motion_at = time.time()
+            self._cooldown_left = self.cooldown_frames
+            self._idle_interval = 1
+            run = True
+        elif self._cooldown_left > 0:
+            self._cooldown_left -= 1
+            run = True
+        elif self._frames_since_inference >= self._idle_interval:
+            # Periodic idle check; back off further while the scene stays quiet
+            self._idle_interval = min(self._idle_interval * 2, self.max_idle_interval)
+            run = True
+        else:
+            run = False
+
+        if run:
+            self._frames_since_inference = 0
+            self.frames_passed += 1
+        return run
+
+    def reset(self):
+        """Forget the background model (e.g. after a camera reconnects)."""
+        self._background = None
+        self._cooldown_left = 0
+        self._idle_interval = 1
+        self._frames_since_inference = 0
+
+    def get_stats(self):
+        """Return gate counters for monitoring."""
+        return {
+            "frames_seen": self.frames_seen,
+            "frames_passed": self.frames_passed,
+            "pass_rate": (self.frames_passed / self.frames_seen) if self.frames_seen else 0.0,
+            "idle_interval": self._idle_interval,
+            "last_motion_ratio": self.last_motion_ratio,
+            "last_motion_at": self.last_motion_at,
+        }
+
+
+class MotionGatedDetector:
+    """
+    Wraps an ObjectDetector with one MotionGate per camera.
+
+    ``detect(camera_id, frame)`` returns ``None`` when the frame was skipped
+    (no motion) and the detector's list of boxes otherwise, so callers can tell
+    "skipped" apart from "ran and found nothing".
+    """
+
+    def __init__(self, detector, **gate_kwargs):
+        self.detector = detector
+        self.gate_kwargs = gate_kwargs
+        self._gates = {}
+        self._lock = threading.Lock()
+
+    def get_gate(self, camera_id):
+        """Get (or lazily create) the gate for a camera."""
+        gate = self._gates.get(camera_id)
+        if gate is None:
+            with self._lock:
+                gate = self._gates.get(camera_id)
+                if gate is None:
+                    gate = MotionGate(**self.gate_kwargs)
+                    self._gates[camera_id] = gate
+        return gate
+
+    def detect(self, camera_id, frame):
+        """Run detection for a camera frame if its gate lets it through."""
+        if not self.get_gate(camera_id).should_detect(frame):
+            return None
+        return self.detector.detect(frame)
+
+    def remove_camera(self, camera_id):
+        """Drop the gate for a camera that has been removed or stopped."""
+        with self._lock:
+            self._gates.pop(camera_id, None)
+
+    def get_stats(self):
+        """Return per-camera gate counters."""
+        return {camera_id: gate.get_stats() for camera_id, gate in list(self._gates.items())}
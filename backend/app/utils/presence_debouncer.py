@@ -0,0 +1,216 @@
+# app/utils/presence_debouncer.py
+
+import os
+import json
+import time
+import threading
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger("PresenceDebouncer")
+
+PRESENCE_DEBOUNCE_SECONDS = float(os.environ.get("PRESENCE_DEBOUNCE_SECONDS", 30))
+PRESENCE_DEBOUNCE_MAX_SECONDS = float(os.environ.get("PRESENCE_DEBOUNCE_MAX_SECONDS", 300))
+
+
+def _score(value):
+    return float(value) if value is not None else -1.0
+
+
+def merge_burst(burst, event):
+    """
+    Merge a recognition into an open burst (both plain dicts).
+
+    The event with the best confidence supplies bbox/image details; the
+    best face quality is kept separately; CHECK_IN keeps the first sighting
+    and CHECK_OUT the last one.
+    """
+    best = burst["event"]
+    if _score(event.get("confidence_score")) > _score(best.get("confidence_score")):
+        burst["event"] = dict(event)
+    burst["best_quality"] = max(burst["best_quality"], _score(event.get("face_quality_score")))
+    burst["first_timestamp"] = min(burst["first_timestamp"], event["timestamp"])
+    burst["last_timestamp"] = max(burst["last_timestamp"], event["timestamp"])
+    burst["count"] += 1
+    return burst
+
+
+def new_burst(event):
+    return {
+        "event": dict(event),
+        "best_quality": _score(event.get("face_quality_score")),
+        "first_timestamp": event["timestamp"],
+        "last_timestamp": event["timestamp"],
+        "count": 1,
+    }
+
+
+def finalize_burst(burst):
+    """Turn a closed burst into the single event that gets persisted."""
+    event = dict(burst["event"])
+    if burst["best_quality"] >= 0:
+        event["face_quality_score"] = burst["best_quality"]
+    event_type = event.get("event_type")
+    event["timestamp"] = burst["last_timestamp"] if event_type == "CHECK_OUT" else burst["first_timestamp"]
+    event["burst_size"] = burst["count"]
+    return event
+
+
+class InMemoryPresenceDebouncer:
+    """
+    Single-process debounce of recognitions keyed by (employee_id, camera_id).
+
+    A burst stays open while recognitions keep arriving within ``window_seconds``
+    of each other (capped at ``max_burst_seconds`` from its start). Once it
+    closes, ``drain()`` returns one merged event for it.
+
+    Events are dicts shaped like the bulk ingestion payload; ``timestamp`` must
+    be an ISO 8601 string so bursts sort correctly. Unknown faces (no
+    employee_id) are not debounced and come straight back from ``add``.
+    """
+
+    def __init__(self, window_seconds=PRESENCE_DEBOUNCE_SECONDS,
+                 max_burst_seconds=PRESENCE_DEBOUNCE_MAX_SECONDS):
+        self.window = window_seconds
+        self.max_burst = max(max_burst_seconds, window_seconds)
+        self._bursts = {}  # key -> (burst, opened_at, deadline)
+        self._lock = threading.Lock()
+
+    def add(self, event, now=None):
+        """Add a recognition. Returns the event itself if it bypasses debouncing."""
+        if not event.get("employee_id"):
+            return event
+        now = now if now is not None else time.time()
+        key = (event["employee_id"], event["camera_id"])
+        with self._lock:
+            entry = self._bursts.get(key)
+            if entry is None:
+                self._bursts[key] = (new_burst(event), now, now + self.window)
+            else:
+                burst, opened_at, _ = entry
+                deadline = min(now + self.window, opened_at + self.max_burst)
+                self._bursts[key] = (merge_burst(burst, event), opened_at, deadline)
+        return None
+
+    def drain(self, now=None, force=False):
+        """Return merged events for every burst whose window has closed."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            closed = [k for k, (_, _, deadline) in self._bursts.items() if force or deadline <= now]
+            bursts = [self._bursts.pop(k)[0] for k in closed]
+        return [finalize_burst(b) for b in bursts]
+
+    def pending(self):
+        return len(self._bursts)
+
+
+# KEYS[1] = burst key, KEYS[2] = deadline zset
+# ARGV = member, now, window, max_burst, event json, confidence, quality, timestamp
+_REDIS_ADD = """
+local opened = redis.call('HGET', KEYS[1], 'opened_at')
+if not opened then
+    redis.call('HSET', KEYS[1], 'event', ARGV[5], 'confidence', ARGV[6], 'best_quality', ARGV[7],
+               'first_timestamp', ARGV[8], 'last_timestamp', ARGV[8], 'count', 1, 'opened_at', ARGV[2])
+    redis.call('ZADD', KEYS[2], tonumber(ARGV[2]) + tonumber(ARGV[3]), ARGV[1])
+    return 1
+end
+redis.call('HINCRBY', KEYS[1], 'count', 1)
+if tonumber(ARGV[6]) > tonumber(redis.call('HGET', KEYS[1], 'confidence')) then
+    redis.call('HSET', KEYS[1], 'event', ARGV[5], 'confidence', ARGV[6])
+end
+if tonumber(ARGV[7]) > tonumber(redis.call('HGET', KEYS[1], 'best_quality')) then
+    redis.call('HSET', KEYS[1], 'best_quality', ARGV[7])
+end
+if ARGV[8] < redis.call('HGET', KEYS[1], 'first_timestamp') then
+    redis.call('HSET', KEYS[1], 'first_timestamp', ARGV[8])
+end
+if ARGV[8] > redis.call('HGET', KEYS[1], 'last_timestamp') then
+    redis.call('HSET', KEYS[1], 'last_timestamp', ARGV[8])
+end
+local deadline = math.min(tonumber(ARGV[2]) + tonumber(ARGV[3]), tonumber(opened) + tonumber(ARGV[4]))
+redis.call('ZADD', KEYS[2], deadline, ARGV[1])
+return 0
+"""
+
+# KEYS[1] = deadline zset; ARGV = now, limit, key prefix
+_REDIS_DRAIN = """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local out = {}
+for _, member in ipairs(members) do
+    if redis.call('ZREM', KEYS[1], member) == 1 then
+        local key = ARGV[3] .. member
+        table.insert(out, redis.call('HGETALL', key))
+        redis.call('DEL', key)
+    end
+end
+return out
+"""
+
+
+class RedisPresenceDebouncer:
+    """
+    Same contract as InMemoryPresenceDebouncer, with bursts kept in Redis so
+    several camera workers / backend nodes share one debounce window. Merging
+    and draining run as Lua scripts, so each burst is emitted by exactly one node.
+    """
+
+    def __init__(self, redis_client, window_seconds=PRESENCE_DEBOUNCE_SECONDS,
+                 max_burst_seconds=PRESENCE_DEBOUNCE_MAX_SECONDS, prefix="presence:debounce:"):
+        self.redis = redis_client
+        self.window = window_seconds
+        self.max_burst = max(max_burst_seconds, window_seconds)
+        self.prefix = prefix
+        self.deadlines_key = f"{prefix}deadlines"
+        self._add = redis_client.register_script(_REDIS_ADD)
+        self._drain = redis_client.register_script(_REDIS_DRAIN)
+
+    def add(self, event, now=None):
+        if not event.get("employee_id"):
+            return event
+        now = now if now is not None else time.time()
+        member = f"{event['employee_id']}:{event['camera_id']}"
+        self._add(
+            keys=[self.prefix + member, self.deadlines_key],
+            args=[member, now, self.window, self.max_burst, json.dumps(event),
+                  _score(event.get("confidence_score")), _score(event.get("face_quality_score")),
+                  event["timestamp"]],
+        )
+        return None
+
+    def drain(self, now=None, force=False, limit=1000):
+        now = now if now is not None else time.time()
+        raw = self._drain(keys=[self.deadlines_key], args=["+inf" if force else now, limit, self.prefix])
+
+        events = []
+        for flat in raw:
+            fields = {flat[i].decode() if isinstance(flat[i], bytes) else flat[i]:
+                      flat[i + 1].decode() if isinstance(flat[i + 1], bytes) else flat[i + 1]
+                      for i in range(0, len(flat), 2)}
+            events.append(finalize_burst({
+                "event": json.loads(fields["event"]),
+                "best_quality": float(fields["best_quality"]),
+                "first_timestamp": fields["first_timestamp"],
+                "last_timestamp": fields["last_timestamp"],
+                "count": int(fields["count"]),
+            }))
+        return events
+
+    def pending(self):
+        return self.redis.zcard(self.deadlines_key)
+
+
+def create_presence_debouncer(redis_url=None, **kwargs):
+    """
+    Build a debouncer: Redis-backed when ``redis_url`` (or REDIS_URL) is set,
+    in-memory otherwise.
+    """
+    redis_url = redis_url or os.environ.get("REDIS_URL")
+    if redis_url:
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url)
+            client.ping()
+            return RedisPresenceDebouncer(client, **kwargs)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for presence debouncing, using in-memory store: {e}")
+    return InMemoryPresenceDebouncer(**kwargs)
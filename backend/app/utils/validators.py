@@ -24,6 +24,12 @@ def validate_phone(phone):
     return cleaned.isdigit() and 10 <= len(cleaned) <= 15
 
 
+def normalize_phone(phone):
+    """Digits of a phone number, for matching regardless of formatting (None when there are none)"""
+    digits = re.sub(r'\D', '', phone or '')
+    return digits or None
+
+
 def validate_date(date_string, format='%Y-%m-%d'):
     """Validate date string format"""
     try:
@@ -0,0 +1,187 @@
+# app/utils/visitor_counter_store.py
+
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from flask import current_app
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger("VisitorCounterStore")
+
+# Set by ``replace``; counters without it were never reconciled and are not served
+RECONCILED_FIELD = "_reconciled_at"
+# Bumped by every ``apply``; ``replace`` is refused once it moved past the version
+# read before the counters were computed
+VERSION_FIELD = "_version"
+# Day counters are only read on their own day; keep a little slack for timezones
+DAY_TTL_SECONDS = 3 * 24 * 3600
+# Each process has its own in-memory counters, which only see that process's
+# writes and cannot be corrected by a reconcile run elsewhere (e.g. the CLI);
+# they are recomputed from the database once their baseline is this old
+MEMORY_BASELINE_MAX_AGE_SECONDS = int(os.environ.get("VISITOR_COUNTER_MEMORY_MAX_AGE_SECONDS", 60))
+
+
+class InMemoryVisitorCounterStore:
+    """
+    Visitor dashboard counters per organization, kept in process: gauges
+    (currently checked in, pending pre-registrations) and counters of one
+    local day (entries, alerts, ...).
+
+    ``apply`` adds deltas and bumps the organization's version, ``load``
+    returns both sets merged (None until ``replace`` has stored a reconciled
+    baseline for that day, and again once it is older than
+    ``max_age_seconds``). ``replace`` with the ``version`` read before
+    computing the baseline stores nothing if an ``apply`` came in meanwhile,
+    since the baseline may predate that change.
+    """
+
+    def __init__(self, max_age_seconds=MEMORY_BASELINE_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._gauges = {}
+        self._days = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def version(self, organization_id):
+        with self._lock:
+            return self._versions.get(organization_id, 0)
+
+    def apply(self, organization_id, day, gauge_deltas=None, day_deltas=None):
+        with self._lock:
+            self._versions[organization_id] = self._versions.get(organization_id, 0) + 1
+            gauges = self._gauges.setdefault(organization_id, {})
+            for field, delta in (gauge_deltas or {}).items():
+                gauges[field] = gauges.get(field, 0) + delta
+            if day_deltas:
+                counters = self._days.setdefault((organization_id, day), {})
+                for field, delta in day_deltas.items():
+                    counters[field] = counters.get(field, 0) + delta
+
+    def load(self, organization_id, day):
+        with self._lock:
+            gauges = self._gauges.get(organization_id, {})
+            counters = self._days.get((organization_id, day), {})
+            if RECONCILED_FIELD not in gauges or RECONCILED_FIELD not in counters:
+                return None
+            if time.time() - min(gauges[RECONCILED_FIELD], counters[RECONCILED_FIELD]) > self.max_age_seconds:
+                return None
+            merged = {**gauges, **counters}
+        merged.pop(RECONCILED_FIELD)
+        return merged
+
+    def replace(self, organization_id, day, gauges, day_counters, version=None):
+        reconciled_at = time.time()
+        with self._lock:
+            if version is not None and self._versions.get(organization_id, 0) != version:
+                return False
+            self._gauges[organization_id] = {**gauges, RECONCILED_FIELD: reconciled_at}
+            self._days[(organization_id, day)] = {**day_counters, RECONCILED_FIELD: reconciled_at}
+            # Earlier days of the organization are never read again
+            oldest = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+            for key in [k for k in self._days if k[0] == organization_id and k[1] < oldest]:
+                del self._days[key]
+        return True
+
+
+class RedisVisitorCounterStore:
+    """
+    Same contract as InMemoryVisitorCounterStore, shared by every backend
+    worker: one hash of gauges per organization (holding the version too)
+    and one hash per (organization, day) with HINCRBY updates. ``replace``
+    checks the version and swaps both hashes in one Lua script.
+    """
+
+    REPLACE_SCRIPT = """
+    local version = redis.call('HGET', KEYS[1], ARGV[1]) or '0'
+    if ARGV[2] ~= '' and version ~= ARGV[2] then
+        return 0
+    end
+    redis.call('DEL', KEYS[1], KEYS[2])
+    local n = tonumber(ARGV[4])
+    redis.call('HSET', KEYS[1], ARGV[1], version, unpack(ARGV, 5, 4 + n))
+    redis.call('HSET', KEYS[2], unpack(ARGV, 5 + n))
+    redis.call('EXPIRE', KEYS[2], ARGV[3])
+    return 1
+    """
+
+    def __init__(self, redis_client, prefix="visitor:counters:"):
+        self.redis = redis_client
+        self.prefix = prefix
+        self._replace = redis_client.register_script(self.REPLACE_SCRIPT)
+
+    def _keys(self, organization_id, day):
+        return f"{self.prefix}{organization_id}", f"{self.prefix}{organization_id}:{day}"
+
+    def version(self, organization_id):
+        version = self.redis.hget(self._keys(organization_id, None)[0], VERSION_FIELD)
+        return int(version or 0)
+
+    def apply(self, organization_id, day, gauge_deltas=None, day_deltas=None):
+        gauge_key, day_key = self._keys(organization_id, day)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hincrby(gauge_key, VERSION_FIELD, 1)
+        for field, delta in (gauge_deltas or {}).items():
+            pipe.hincrby(gauge_key, field, delta)
+        for field, delta in (day_deltas or {}).items():
+            pipe.hincrby(day_key, field, delta)
+        if day_deltas:
+            pipe.expire(day_key, DAY_TTL_SECONDS)
+        pipe.execute()
+
+    def load(self, organization_id, day):
+        pipe = self.redis.pipeline(transaction=False)
+        for key in self._keys(organization_id, day):
+            pipe.hgetall(key)
+        gauges, counters = pipe.execute()
+        merged = {}
+        for raw in (gauges, counters):
+            fields = {
+                (k.decode() if isinstance(k, bytes) else k): v
+                for k, v in raw.items()
+            }
+            if RECONCILED_FIELD not in fields:
+                return None
+            fields.pop(RECONCILED_FIELD)
+            fields.pop(VERSION_FIELD, None)
+            merged.update({k: int(v) for k, v in fields.items()})
+        return merged
+
+    def replace(self, organization_id, day, gauges, day_counters, version=None):
+        reconciled_at = str(time.time())
+        gauge_args, day_args = [], []
+        for field, value in {**gauges, RECONCILED_FIELD: reconciled_at}.items():
+            gauge_args.extend([field, value])
+        for field, value in {**day_counters, RECONCILED_FIELD: reconciled_at}.items():
+            day_args.extend([field, value])
+        replaced = self._replace(
+            keys=list(self._keys(organization_id, day)),
+            args=[VERSION_FIELD, "" if version is None else str(version), DAY_TTL_SECONDS,
+                  len(gauge_args), *gauge_args, *day_args],
+        )
+        return bool(replaced)
+
+
+def create_visitor_counter_store(redis_url=None):
+    """Redis-backed store when ``redis_url`` is set, in-memory otherwise."""
+    if redis_url:
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url)
+            client.ping()
+            return RedisVisitorCounterStore(client)
+        except Exception as e:
+            logger.warning(f"Redis unavailable for visitor counters, using in-memory store: {e}")
+    return InMemoryVisitorCounterStore()
+
+
+def get_visitor_counter_store():
+    """The visitor counter store of the current app, created on first use."""
+    store = current_app.extensions.get("visitor_counters")
+    if store is None:
+        store = current_app.extensions.setdefault(
+            "visitor_counters", create_visitor_counter_store(current_app.config.get("REDIS_URL"))
+        )
+    return store
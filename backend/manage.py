@@ -105,6 +105,129 @@ def create_superadmin(email, username, password):
     click.echo(f"   Username: {username}")
 
 
+@cli.command()
+@click.option('--loop', is_flag=True, help='Keep polling for new presence events')
+@click.option('--interval', default=5, show_default=True, help='Polling interval in seconds')
+@click.option('--batch-size', default=5000, show_default=True, help='Events per batch')
+def aggregate_attendance(loop, interval, batch_size):
+    """Fold new presence events into attendance records"""
+    from app.services.attendance_aggregator import AttendanceAggregator
+    aggregator = AttendanceAggregator(batch_size=batch_size)
+    if loop:
+        aggregator.run_forever(interval)
+        return
+    total_events = total_records = 0
+    while True:
+        result = aggregator.run_once()
+        total_events += result['events']
+        total_records += result['records']
+        if result['events'] < batch_size:
+            break
+    click.echo(f"✅ Processed {total_events} presence events, wrote {total_records} attendance records")
+
+
+@cli.command()
+def auto_check_out():
+    """Check out attendance records left open past the camera's auto_check_out_hours"""
+    from app.services.auto_checkout_service import AutoCheckOutSweeper
+    result = AutoCheckOutSweeper().run()
+    click.echo(f"✅ Auto checked out {result['closed']} attendance records across {result['organizations']} organizations")
+    for organization_id, closed in result['per_organization'].items():
+        click.echo(f"   {organization_id}: {closed}")
+
+
+@cli.command()
+@click.option('--batch-size', default=1000, show_default=True, help='Records per batch')
+@click.option('--recompute', is_flag=True, help='Re-evaluate every record, e.g. after shift times changed')
+def backfill_lateness(batch_size, recompute):
+    """Evaluate is_late / minutes_late for attendance records against their shift"""
+    from app.services.lateness_service import LatenessService
+    result = LatenessService.backfill(batch_size=batch_size, recompute=recompute)
+    click.echo(f"✅ Evaluated {result['updated']} attendance records, {result['late']} late")
+
+
+@cli.command()
+@click.option('--start', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='First day to recompute (default: yesterday)')
+@click.option('--end', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Last day to recompute (default: today)')
+def reconcile_attendance_stats(start, end):
+    """Recompute the attendance_daily_stats rollup from attendance records"""
+    from app.services.attendance_stats_service import AttendanceStatsService
+    result = AttendanceStatsService.reconcile(
+        start_date=start.date() if start else None,
+        end_date=end.date() if end else None,
+    )
+    click.echo(f"✅ Wrote {result['rows']} daily stats rows for {result['organizations']} organizations")
+
+
+@cli.command()
+@click.option('--loop', is_flag=True, help='Keep building queued reports and re-queueing stale current months')
+@click.option('--interval', default=10, show_default=True, help='Polling interval in seconds')
+@click.option('--schedule', is_flag=True, help='Queue stale month-to-date reports of every organization first')
+def generate_team_reports(loop, interval, schedule):
+    """Build queued team performance report snapshots"""
+    from app.services.team_report_service import TeamReportService
+    if loop:
+        TeamReportService.run_forever(interval)
+        return
+    queued = TeamReportService.schedule_current_periods() if schedule else 0
+    built = failed = 0
+    while True:
+        result = TeamReportService.run_pending()
+        built += result['built']
+        failed += result['failed']
+        if not result['built'] and not result['failed']:
+            break
+    click.echo(f"✅ Queued {queued} and built {built} team report snapshots ({failed} failed)")
+
+
+@cli.command()
+def reconcile_visitor_counters():
+    """Rebuild the visitor dashboard counters from the database (Redis store only)"""
+    from app.services.visitor_counter_service import VisitorCounterService
+    from app.utils.visitor_counter_store import get_visitor_counter_store, InMemoryVisitorCounterStore
+    if isinstance(get_visitor_counter_store(), InMemoryVisitorCounterStore):
+        click.echo("⚠️  No Redis store: each server process keeps its own counters and rebuilds them on its own")
+        return
+    count = VisitorCounterService.reconcile_all()
+    click.echo(f"✅ Reconciled visitor counters for {count} organizations")
+
+
+@cli.command()
+@click.option('--months-ahead', default=3, show_default=True, help='Future monthly partitions to keep ready')
+@click.option('--retain-months', default=13, show_default=True, help='Months of presence events kept online')
+@click.option('--archive-dir', default='./archives/presence_events', show_default=True,
+              help='Where detached partitions are written as .csv.gz')
+def maintain_presence_partitions(months_ahead, retain_months, archive_dir):
+    """Create upcoming presence_events partitions and archive expired ones"""
+    from app.services.presence_partition_service import PresencePartitionService
+    created = PresencePartitionService.ensure_partitions(months_ahead=months_ahead)
+    archived = PresencePartitionService.apply_retention(retain_months, archive_dir)
+    click.echo(f"✅ Created {len(created)} partitions, archived {len(archived)} partitions")
+    for path in archived:
+        click.echo(f"   {path}")
+
+
+@cli.command()
+@click.option('--batch-size', default=100, show_default=True, help='Images moved per transaction')
+def migrate_image_blobs(batch_size):
+    """Move inline Base64 images out of the database into the blob store"""
+    from app.services.image_service import ImageService
+    result = ImageService.migrate_legacy_images(batch_size=batch_size)
+    click.echo(f"✅ Moved {result['migrated']} images ({result['bytes']} bytes) to blob storage "
+               f"({result['failed']} failed)")
+
+
+@cli.command()
+@click.option('--max-age-minutes', default=30, show_default=True, help='Age after which empty placeholders are dropped')
+def sweep_photo_placeholders(max_age_minutes):
+    """Soft delete photo placeholders whose queued photo was lost"""
+    from app.services.photo_persistence_service import PhotoPersistenceService
+    swept = PhotoPersistenceService.sweep_stale_placeholders(max_age_minutes)
+    click.echo(f"✅ Soft deleted {swept} stale photo placeholders")
+
+
 @cli.command()
 def reset_db():
     """Drop all tables and recreate them (USE WITH CAUTION!)"""
@@ -1,4 +1,5 @@
 import logging
+import re
 from logging.config import fileConfig
 
 from flask import current_app
@@ -51,6 +52,18 @@ def get_metadata():
     return target_db.metadata
 
 
+# Monthly presence_events partitions are managed by PresencePartitionService,
+# not by the models; keep autogenerate from dropping them
+PRESENCE_PARTITION = re.compile(r'^presence_events_(p\d{4}_\d{2}|default)$')
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    table_name = name if type_ == 'table' else getattr(getattr(object, 'table', None), 'name', None)
+    if reflected and table_name and PRESENCE_PARTITION.match(table_name):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -93,6 +106,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
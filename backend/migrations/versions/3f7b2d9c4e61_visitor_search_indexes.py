@@ -0,0 +1,54 @@
+"""visitor_search_indexes
+
+Revision ID: 3f7b2d9c4e61
+Revises: 8c4a2f6d9e13
+Create Date: 2026-10-19 21:04:37.118262
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7b2d9c4e61'
+down_revision = '8c4a2f6d9e13'
+branch_labels = None
+depends_on = None
+
+# Characters stripped from mobile numbers where regexp_replace is unavailable
+PHONE_PUNCTUATION = (' ', '-', '+', '(', ')', '.', '/')
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    with op.batch_alter_table('visitors', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('mobile_normalized', sa.String(length=20), nullable=True))
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("UPDATE visitors SET mobile_normalized = NULLIF(regexp_replace(mobile_number, '[^0-9]', '', 'g'), '')")
+    else:
+        normalized = 'mobile_number'
+        for char in PHONE_PUNCTUATION:
+            normalized = f"replace({normalized}, '{char}', '')"
+        op.execute(f"UPDATE visitors SET mobile_normalized = NULLIF({normalized}, '')")
+
+    if bind.dialect.name == 'postgresql':
+        # Trigram name search scoped to the organization in one GIN index
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+        op.create_index('idx_visitor_org_mobile', 'visitors', ['organization_id', 'mobile_normalized'],
+                        unique=False, postgresql_ops={'mobile_normalized': 'text_pattern_ops'})
+        op.create_index('idx_visitor_org_name_trgm', 'visitors', ['organization_id', 'visitor_name'],
+                        unique=False, postgresql_using='gin', postgresql_ops={'visitor_name': 'gin_trgm_ops'})
+    else:
+        with op.batch_alter_table('visitors', schema=None) as batch_op:
+            batch_op.create_index('idx_visitor_org_mobile', ['organization_id', 'mobile_normalized'], unique=False)
+            batch_op.create_index('idx_visitor_org_name_trgm', ['organization_id', 'visitor_name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('visitors', schema=None) as batch_op:
+        batch_op.drop_index('idx_visitor_org_name_trgm')
+        batch_op.drop_index('idx_visitor_org_mobile')
+        batch_op.drop_column('mobile_normalized')
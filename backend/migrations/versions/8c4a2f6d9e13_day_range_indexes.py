@@ -0,0 +1,39 @@
+"""day_range_indexes
+
+Revision ID: 8c4a2f6d9e13
+Revises: 6b1d4e8c2a97
+Create Date: 2026-10-19 19:22:08.640517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4a2f6d9e13'
+down_revision = '6b1d4e8c2a97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-organization day windows (timestamp >= start AND timestamp < end) as index range scans
+    with op.batch_alter_table('lpr_logs', schema=None) as batch_op:
+        batch_op.create_index('idx_lpr_org_timestamp', ['organization_id', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('visitors', schema=None) as batch_op:
+        batch_op.create_index('idx_visitor_org_check_in', ['organization_id', 'check_in_time'], unique=False)
+
+    with op.batch_alter_table('visitor_alerts', schema=None) as batch_op:
+        batch_op.create_index('idx_visitor_alert_org_time', ['organization_id', 'alert_time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('visitor_alerts', schema=None) as batch_op:
+        batch_op.drop_index('idx_visitor_alert_org_time')
+
+    with op.batch_alter_table('visitors', schema=None) as batch_op:
+        batch_op.drop_index('idx_visitor_org_check_in')
+
+    with op.batch_alter_table('lpr_logs', schema=None) as batch_op:
+        batch_op.drop_index('idx_lpr_org_timestamp')
@@ -0,0 +1,33 @@
+"""image_blob_storage
+
+Revision ID: b6e1d4a8f273
+Revises: 3f7b2d9c4e61
+Create Date: 2026-10-19 22:17:52.409316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1d4a8f273'
+down_revision = '3f7b2d9c4e61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Image bytes move to the content-addressed blob store; existing rows keep
+    # their inline data until `python manage.py migrate-image-blobs` moves them
+    with op.batch_alter_table('images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_sha256', sa.String(length=64), nullable=True))
+        batch_op.alter_column('image_base64', existing_type=sa.Text(), nullable=True)
+        batch_op.create_index(batch_op.f('ix_images_content_sha256'), ['content_sha256'], unique=False)
+
+
+def downgrade():
+    # Run only before migrating images: blob-backed rows have no inline data
+    with op.batch_alter_table('images', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_images_content_sha256'))
+        batch_op.alter_column('image_base64', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('content_sha256')
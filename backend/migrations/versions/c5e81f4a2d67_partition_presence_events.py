@@ -0,0 +1,171 @@
+"""partition_presence_events
+
+Revision ID: c5e81f4a2d67
+Revises: 7b1e5a90c3d2
+Create Date: 2026-10-19 11:20:05.381927
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e81f4a2d67'
+down_revision = '7b1e5a90c3d2'
+branch_labels = None
+depends_on = None
+
+# Months created ahead of the current one; the maintenance job keeps extending this
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    'id, organization_id, employee_id, camera_id, location_id, event_type, timestamp, '
+    'confidence_score, liveness_verified, liveness_score, face_bbox, face_quality_score, '
+    'image_url, review_status, reviewed_by, reviewed_at, review_notes, attendance_record_id, '
+    'device_info, processing_time_ms, idempotency_key, is_unknown_face, is_anomaly, '
+    'anomaly_reason, created_at'
+)
+
+INDEXES = (
+    ('idx_camera_timestamp', ['camera_id', 'timestamp']),
+    ('idx_emp_timestamp', ['employee_id', 'timestamp']),
+    ('idx_org_timestamp', ['organization_id', 'timestamp']),
+    ('idx_review_status', ['review_status', 'organization_id']),
+    ('idx_presence_created_at', ['created_at', 'id']),
+    ('ix_presence_events_camera_id', ['camera_id']),
+    ('ix_presence_events_employee_id', ['employee_id']),
+    ('ix_presence_events_location_id', ['location_id']),
+    ('ix_presence_events_organization_id', ['organization_id']),
+    ('ix_presence_events_timestamp', ['timestamp']),
+)
+
+FOREIGN_KEY_COLUMNS = (
+    'attendance_record_id', 'camera_id', 'employee_id', 'location_id', 'organization_id', 'reviewed_by',
+)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _create_table(name, partitioned):
+    op.create_table(name,
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('organization_id', sa.String(length=36), nullable=False),
+    sa.Column('employee_id', sa.String(length=36), nullable=True),
+    sa.Column('camera_id', sa.String(length=36), nullable=False),
+    sa.Column('location_id', sa.String(length=36), nullable=False),
+    sa.Column('event_type', sa.String(length=20), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('confidence_score', sa.Float(), nullable=True),
+    sa.Column('liveness_verified', sa.Boolean(), nullable=True),
+    sa.Column('liveness_score', sa.Float(), nullable=True),
+    sa.Column('face_bbox', sa.JSON(), nullable=True),
+    sa.Column('face_quality_score', sa.Float(), nullable=True),
+    sa.Column('image_url', sa.String(length=512), nullable=True),
+    sa.Column('review_status', sa.String(length=20), nullable=False),
+    sa.Column('reviewed_by', sa.String(length=36), nullable=True),
+    sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('review_notes', sa.Text(), nullable=True),
+    sa.Column('attendance_record_id', sa.String(length=36), nullable=True),
+    sa.Column('device_info', sa.JSON(), nullable=True),
+    sa.Column('processing_time_ms', sa.Integer(), nullable=True),
+    sa.Column('idempotency_key', sa.String(length=64), nullable=True),
+    sa.Column('is_unknown_face', sa.Boolean(), nullable=True),
+    sa.Column('is_anomaly', sa.Boolean(), nullable=True),
+    sa.Column('anomaly_reason', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['attendance_record_id'], ['attendance_records.id'], ),
+    sa.ForeignKeyConstraint(['camera_id'], ['cameras.id'], ),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.ForeignKeyConstraint(['reviewed_by'], ['users.id'], ),
+    # Unique keys on a partitioned table must include the partition key
+    sa.PrimaryKeyConstraint('id', 'timestamp') if partitioned else sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint(
+        'organization_id', 'idempotency_key', *(['timestamp'] if partitioned else []),
+        name='uq_presence_org_idempotency_key'
+    ),
+    **({'postgresql_partition_by': 'RANGE (timestamp)'} if partitioned else {})
+    )
+    for index_name, columns in INDEXES:
+        op.create_index(index_name, name, columns, unique=False)
+
+
+def _free_names(table):
+    """Index and key names share the schema namespace; release them before recreating."""
+    op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS presence_events_pkey')
+    op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS uq_presence_org_idempotency_key')
+    for column in FOREIGN_KEY_COLUMNS:
+        op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS presence_events_{column}_fkey')
+    for index_name, _ in INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name != 'postgresql':
+        # Declarative partitioning is PostgreSQL-only; keep the keys aligned with the model,
+        # whose primary key is (id, timestamp) on every database. The table is rebuilt
+        # because SQLite cannot alter a primary key in place.
+        with op.batch_alter_table('presence_events', schema=None, recreate='always') as batch_op:
+            batch_op.create_primary_key('presence_events_pkey', ['id', 'timestamp'])
+            batch_op.drop_constraint('uq_presence_org_idempotency_key', type_='unique')
+            batch_op.create_unique_constraint(
+                'uq_presence_org_idempotency_key', ['organization_id', 'idempotency_key', 'timestamp']
+            )
+            batch_op.create_index('idx_presence_created_at', ['created_at', 'id'], unique=False)
+        return
+
+    op.rename_table('presence_events', 'presence_events_unpartitioned')
+    _free_names('presence_events_unpartitioned')
+
+    _create_table('presence_events', partitioned=True)
+    # Catches rows outside the monthly ranges; maintenance moves them into real partitions
+    op.execute('CREATE TABLE presence_events_default PARTITION OF presence_events DEFAULT')
+
+    oldest = bind.execute(sa.text(
+        "SELECT date_trunc('month', min(timestamp)) FROM presence_events_unpartitioned"
+    )).scalar()
+    current = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month = min(oldest, current) if oldest else current
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE presence_events_p{month:%Y_%m} PARTITION OF presence_events "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+        )
+        month = upper
+
+    op.execute(f'INSERT INTO presence_events ({COLUMNS}) SELECT {COLUMNS} FROM presence_events_unpartitioned')
+    op.drop_table('presence_events_unpartitioned')
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name != 'postgresql':
+        with op.batch_alter_table('presence_events', schema=None, recreate='always') as batch_op:
+            batch_op.drop_constraint('presence_events_pkey', type_='primary')
+            batch_op.create_primary_key('presence_events_pkey', ['id'])
+            batch_op.drop_index('idx_presence_created_at')
+            batch_op.drop_constraint('uq_presence_org_idempotency_key', type_='unique')
+            batch_op.create_unique_constraint(
+                'uq_presence_org_idempotency_key', ['organization_id', 'idempotency_key']
+            )
+        return
+
+    # Partitions already detached and archived by the retention job are not restored
+    op.rename_table('presence_events', 'presence_events_partitioned')
+    _free_names('presence_events_partitioned')
+
+    _create_table('presence_events', partitioned=False)
+    op.drop_index('idx_presence_created_at', table_name='presence_events')
+    op.execute(f'INSERT INTO presence_events ({COLUMNS}) SELECT {COLUMNS} FROM presence_events_partitioned')
+    op.drop_table('presence_events_partitioned')
@@ -0,0 +1,29 @@
+"""presence_review_queue_index
+
+Revision ID: e2a7c9b13f58
+Revises: c5e81f4a2d67
+Create Date: 2026-10-19 12:41:36.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c9b13f58'
+down_revision = 'c5e81f4a2d67'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Extend the review index so keyset pages on (timestamp, id) are index range scans
+    with op.batch_alter_table('presence_events', schema=None) as batch_op:
+        batch_op.drop_index('idx_review_status')
+        batch_op.create_index('idx_review_status', ['review_status', 'organization_id', 'timestamp', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('presence_events', schema=None) as batch_op:
+        batch_op.drop_index('idx_review_status')
+        batch_op.create_index('idx_review_status', ['review_status', 'organization_id'], unique=False)
@@ -2,6 +2,8 @@ import os
 import sys
 import pytest
 import json
+from contextlib import contextmanager
+from sqlalchemy import event
 from sqlalchemy.types import TypeDecorator, String
 import sqlalchemy.dialects.postgresql
 
@@ -33,11 +35,13 @@ from app.services.auth_service import AuthService
 
 
 @pytest.fixture(scope='function')
-def app():
+def app(tmp_path):
     app = create_app()
     app.config['TESTING'] = True
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+    app.config['BLOB_STORAGE_PATH'] = str(tmp_path / 'blobs')
+    app.config['IMAGE_VARIANT_CACHE_PATH'] = str(tmp_path / 'variants')
     
     with app.app_context():
         db.create_all()
@@ -56,6 +60,50 @@ def runner(app):
     return app.test_cli_runner()
 
 
+@pytest.fixture(scope='function')
+def count_statements(app):
+    """
+    Context manager collecting the SQL statements run inside it:
+
+        with count_statements() as statements:
+            ...
+        assert len(statements) == 1
+    """
+    @contextmanager
+    def counting():
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+    return counting
+
+
+@pytest.fixture(scope='function')
+def attend(site_data):
+    """
+    Adds a 09:00 attendance record for a site_data employee (not committed):
+
+        attend(employee, date(2026, 10, 1), is_late=True)
+    """
+    from datetime import datetime
+    from app.models import AttendanceRecord
+
+    def add(employee, day, is_late=False):
+        db.session.add(AttendanceRecord(
+            employee_id=employee.id, organization_id=site_data['org'].id, date=day,
+            check_in_time=datetime.combine(day, datetime.min.time()).replace(hour=9), is_late=is_late
+        ))
+
+    return add
+
+
 @pytest.fixture(scope='function')
 def setup_test_data(app):
     with app.app_context():
@@ -136,3 +184,54 @@ def setup_test_data(app):
                 'dept4': dept4
             }
         }
+
+
+@pytest.fixture(scope='function')
+def site_data(app):
+    """Organization with a location, check-in/out cameras, a shift and two employees"""
+    from datetime import time
+    from app.models import Location, Camera, Shift, Employee
+
+    # The app fixture already holds an application context
+    role = Role(name='employee', description='Employee role')
+    db.session.add(role)
+    db.session.flush()
+
+    org = Organization(name='Site Organization', code='SITE01', organization_type='office')
+    db.session.add(org)
+    db.session.flush()
+
+    dept = Department(organization_id=org.id, name='Operations', code='OPS')
+    location = Location(organization_id=org.id, name='Main Gate')
+    shift = Shift(organization_id=org.id, name='General', start_time=time(9, 0),
+                  end_time=time(18, 0), grace_period_minutes=15)
+    db.session.add_all([dept, location, shift])
+    db.session.flush()
+
+    cam_in = Camera(organization_id=org.id, location_id=location.id, name='Gate In',
+                    camera_type='CHECK_IN', source_type='RTSP_STREAM')
+    cam_out = Camera(organization_id=org.id, location_id=location.id, name='Gate Out',
+                     camera_type='CHECK_OUT', source_type='RTSP_STREAM')
+    db.session.add_all([cam_in, cam_out])
+
+    employees = []
+    for i in range(2):
+        user = User(username=f'emp{i}', email=f'emp{i}@example.com',
+                    password_hash='hashed_password', role_id=role.id, organization_id=org.id)
+        db.session.add(user)
+        db.session.flush()
+        employees.append(Employee(user_id=user.id, organization_id=org.id, department_id=dept.id,
+                                  employee_code=f'E{i:03d}', full_name=f'Employee {i}',
+                                  employment_type='full_time', shift_id=shift.id))
+    db.session.add_all(employees)
+    db.session.commit()
+
+    return {
+        'org': org,
+        'department': dept,
+        'location': location,
+        'shift': shift,
+        'camera_in': cam_in,
+        'camera_out': cam_out,
+        'employees': employees,
+    }
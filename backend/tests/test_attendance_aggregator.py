@@ -0,0 +1,62 @@
+from datetime import datetime
+from app.extensions import db
+from app.models import AttendanceRecord, PresenceEvent
+from app.services.attendance_aggregator import AttendanceAggregator
+from app.services.presence_event_service import PresenceEventService
+
+
+def _ingest(site_data, employee, camera, timestamps):
+    events = [{
+        'camera_id': camera.id,
+        'employee_id': employee.id,
+        'timestamp': ts.isoformat(),
+    } for ts in timestamps]
+    PresenceEventService.bulk_ingest(events, site_data['org'].id)
+
+
+class TestAttendanceAggregator:
+
+    def test_first_in_last_out(self, app, site_data):
+        """Test that a day's events collapse into one record with work hours"""
+        emp = site_data['employees'][0]
+        day = datetime(2026, 10, 19)
+        _ingest(site_data, emp, site_data['camera_in'], [day.replace(hour=9, minute=5), day.replace(hour=9, minute=1)])
+        _ingest(site_data, emp, site_data['camera_out'], [day.replace(hour=17), day.replace(hour=18)])
+
+        result = AttendanceAggregator(safety_lag_seconds=0).run_once()
+
+        assert result['events'] == 4
+        record = AttendanceRecord.query.filter_by(employee_id=emp.id).one()
+        assert record.check_in_time == day.replace(hour=9, minute=1)
+        assert record.check_out_time == day.replace(hour=18)
+        assert record.work_hours == round((8 * 60 + 59) / 60, 2)
+        assert PresenceEvent.query.filter_by(attendance_record_id=record.id).count() == 4
+
+    def test_late_event_and_restart(self, app, site_data):
+        """Test that a new aggregator resumes from the checkpoint and merges late events"""
+        emp = site_data['employees'][1]
+        day = datetime(2026, 10, 19)
+        _ingest(site_data, emp, site_data['camera_in'], [day.replace(hour=10)])
+        AttendanceAggregator(safety_lag_seconds=0).run_once()
+
+        # Late, out-of-order event arrives after a restart
+        _ingest(site_data, emp, site_data['camera_in'], [day.replace(hour=8, minute=30)])
+        result = AttendanceAggregator(safety_lag_seconds=0).run_once()
+
+        assert result['events'] == 1
+        record = AttendanceRecord.query.filter_by(employee_id=emp.id).one()
+        assert record.check_in_time == day.replace(hour=8, minute=30)
+
+    def test_manual_corrections_preserved(self, app, site_data):
+        """Test that records changed through a change request are not overwritten"""
+        emp = site_data['employees'][0]
+        day = datetime(2026, 10, 20)
+        record = AttendanceRecord(employee_id=emp.id, organization_id=site_data['org'].id,
+                                  date=day.date(), check_in_time=day.replace(hour=9), is_modified=True)
+        db.session.add(record)
+        db.session.commit()
+
+        _ingest(site_data, emp, site_data['camera_in'], [day.replace(hour=7)])
+        AttendanceAggregator(safety_lag_seconds=0).run_once()
+
+        assert db.session.get(AttendanceRecord, record.id).check_in_time == day.replace(hour=9)
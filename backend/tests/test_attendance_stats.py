@@ -0,0 +1,62 @@
+from datetime import date, datetime
+from app.extensions import db
+from app.models import AttendanceRecord, AttendanceDailyStat
+from app.services.attendance_service import AttendanceService
+from app.services.attendance_stats_service import AttendanceStatsService
+from app.services.lateness_service import LatenessService
+
+
+def _record(site_data, employee, check_in, check_out=None):
+    db.session.add(AttendanceRecord(
+        employee_id=employee.id,
+        organization_id=site_data['org'].id,
+        date=check_in.date(),
+        check_in_time=check_in,
+        check_out_time=check_out,
+        work_hours=round((check_out - check_in).total_seconds() / 3600, 2) if check_out else 0.0,
+        status='present',
+    ))
+    db.session.commit()
+
+
+class TestAttendanceDailyStats:
+
+    def test_reconcile_and_summary_read_rollup(self, app, site_data):
+        """Test that reconcile computes present/late/absent/hours and the summary reads them"""
+        org_id = site_data['org'].id
+        emp_a, emp_b = site_data['employees']
+        # Shift starts 09:00 with 15 minutes grace
+        _record(site_data, emp_a, datetime(2026, 10, 5, 9, 10), datetime(2026, 10, 5, 17, 10))
+        _record(site_data, emp_b, datetime(2026, 10, 5, 9, 40), datetime(2026, 10, 5, 15, 40))
+        _record(site_data, emp_a, datetime(2026, 10, 6, 8, 55))
+        LatenessService.backfill()
+
+        result = AttendanceStatsService.reconcile(date(2026, 10, 1), date(2026, 10, 31))
+
+        assert result == {'organizations': 1, 'rows': 31}
+        row = db.session.get(AttendanceDailyStat, (org_id, date(2026, 10, 5), site_data['department'].id, 'full_time'))
+        assert (row.present_count, row.late_count, row.absent_count) == (2, 1, 0)
+        assert row.avg_work_hours == 7.0
+
+        summary = AttendanceService.get_organization_attendance_summary(org_id, '2026-10-05', '2026-10-07')
+        assert [(d['present'], d['late'], d['absent']) for d in summary['series']] == [(2, 1, 0), (1, 0, 1), (0, 0, 2)]
+        assert summary['series'][0]['avg_work_hours'] == 7.0
+
+        filtered = AttendanceService.get_organization_attendance_summary(
+            org_id, '2026-10-05', '2026-10-05', {'employment_type': 'contract'}
+        )
+        assert filtered['series'][0]['present'] == 0
+
+    def test_check_in_and_out_refresh_rollup(self, app, site_data):
+        """Test that service check-in and check-out keep today's rollup row current"""
+        employee = site_data['employees'][0]
+        key = (site_data['org'].id, date.today(), site_data['department'].id, 'full_time')
+
+        AttendanceService.check_in({'employee_id': employee.id}, {})
+        row = db.session.get(AttendanceDailyStat, key)
+        assert (row.present_count, row.absent_count, row.work_hours_count) == (1, 1, 0)
+
+        AttendanceService.check_out({'employee_id': employee.id}, {})
+        db.session.expire_all()
+        row = db.session.get(AttendanceDailyStat, key)
+        assert (row.present_count, row.work_hours_count) == (1, 1)
@@ -0,0 +1,61 @@
+from datetime import datetime
+from app.extensions import db
+from app.models import AttendanceRecord, ProcessingCheckpoint
+from app.services.auto_checkout_service import AutoCheckOutSweeper
+
+
+def _open_record(site_data, employee, check_in, camera=None, **overrides):
+    record = AttendanceRecord(
+        employee_id=employee.id,
+        organization_id=site_data['org'].id,
+        camera_id=camera.id if camera else None,
+        date=check_in.date(),
+        check_in_time=check_in,
+        status='present',
+        **overrides
+    )
+    db.session.add(record)
+    db.session.commit()
+    return record.id
+
+
+class TestAutoCheckOut:
+
+    def test_closes_overdue_records_in_sql(self, app, site_data):
+        """Test that overdue records are closed using the camera threshold and others are untouched"""
+        emp_a, emp_b = site_data['employees']
+        site_data['camera_in'].auto_check_out_hours = 8
+        db.session.commit()
+
+        overdue = _open_record(site_data, emp_a, datetime(2026, 10, 18, 9, 0), camera=site_data['camera_in'])
+        no_camera = _open_record(site_data, emp_b, datetime(2026, 10, 18, 6, 0))
+        recent = _open_record(site_data, emp_a, datetime(2026, 10, 19, 9, 0), camera=site_data['camera_in'])
+        corrected = _open_record(site_data, emp_b, datetime(2026, 10, 17, 9, 0), is_modified=True)
+
+        result = AutoCheckOutSweeper().run(now=datetime(2026, 10, 19, 12, 0))
+
+        assert result['closed'] == 2
+        assert result['per_organization'] == {site_data['org'].id: 2}
+        db.session.expire_all()
+        record = db.session.get(AttendanceRecord, overdue)
+        assert record.check_out_time == datetime(2026, 10, 18, 17, 0)
+        assert record.work_hours == 8.0
+        assert record.notes == 'Auto check-out'
+        assert db.session.get(AttendanceRecord, no_camera).check_out_time == datetime(2026, 10, 18, 18, 0)
+        assert db.session.get(AttendanceRecord, recent).check_out_time is None
+        assert db.session.get(AttendanceRecord, corrected).check_out_time is None
+
+        assert AutoCheckOutSweeper().run(now=datetime(2026, 10, 19, 12, 0))['closed'] == 0
+
+    def test_resumes_after_checkpointed_organization(self, app, site_data):
+        """Test that a run resumes after the last organization it committed"""
+        _open_record(site_data, site_data['employees'][0], datetime(2026, 10, 1, 9, 0))
+        ProcessingCheckpoint.save('auto_check_out', {'organization_id': site_data['org'].id})
+        db.session.commit()
+
+        resumed = AutoCheckOutSweeper().run(now=datetime(2026, 10, 19, 12, 0))
+        next_pass = AutoCheckOutSweeper().run(now=datetime(2026, 10, 19, 12, 0))
+
+        assert resumed['closed'] == 0
+        assert next_pass['closed'] == 1
+        assert ProcessingCheckpoint.load('auto_check_out') == {}
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import VisitorBlacklist
+from app.services.visitor_service import VisitorService
+from app.utils.blacklist_probe_store import InMemoryBlacklistProbeStore
+
+
+class _SharedProbeStore(InMemoryBlacklistProbeStore):
+    """In-process stand-in for the Redis store, which every worker shares"""
+    shared = True
+
+
+def _blacklisted(org_id, **identifiers):
+    return VisitorService.check_blacklist(org_id, **identifiers)[0]
+
+
+class TestBlacklistProbe:
+
+    def test_negative_checks_skip_database(self, app, site_data, count_statements, monkeypatch):
+        """Test that visitors absent from a shared probe set are cleared without a query"""
+        monkeypatch.setitem(app.extensions, 'blacklist_probes', _SharedProbeStore())
+        org_id = site_data['org'].id
+        VisitorService.add_to_blacklist(org_id, {'phone_number': '555-0100', 'reason': 'other'})
+        assert _blacklisted(org_id, phone='555-0100')
+
+        with count_statements() as statements:
+            assert not _blacklisted(org_id, phone='5550199', email='guest@example.com')
+        assert not any('visitor_blacklist' in s for s in statements)
+
+        # A probable hit is confirmed with the exact criteria, as before
+        with count_statements() as statements:
+            assert not _blacklisted(org_id, phone='5550100')
+        assert any('visitor_blacklist' in s for s in statements)
+
+    def test_process_local_store_always_confirms(self, app, site_data, count_statements):
+        """Test that without a shared store a miss is still checked in the database"""
+        org_id = site_data['org'].id
+        # Added by another worker: this process's probe set never hears of it
+        db.session.add(VisitorBlacklist(organization_id=org_id, phone_number='5550100', reason='other'))
+        db.session.commit()
+        assert _blacklisted(org_id, phone='5550100')
+
+        with count_statements() as statements:
+            assert not _blacklisted(org_id, phone='5550199')
+        assert any('visitor_blacklist' in s for s in statements)
+
+    def test_entries_added_removed_and_expired(self, app, site_data, monkeypatch):
+        """Test that the probe set follows blacklist changes after it is built"""
+        monkeypatch.setitem(app.extensions, 'blacklist_probes', _SharedProbeStore())
+        org_id = site_data['org'].id
+        expired = VisitorBlacklist(organization_id=org_id, email='old@example.com', reason='other',
+                                   end_date=datetime.utcnow() - timedelta(days=1))
+        db.session.add(expired)
+        db.session.commit()
+        assert not _blacklisted(org_id, email='old@example.com')
+
+        entry = VisitorService.add_to_blacklist(org_id, {
+            'id_proof_number': 'AB-1234', 'reason': 'security_threat',
+            'end_date': datetime.utcnow() + timedelta(days=1)
+        })
+        assert _blacklisted(org_id, id_proof='AB-1234')
+        assert not _blacklisted(org_id, id_proof='ZZ-0000')
+
+        VisitorService.remove_from_blacklist(org_id, entry.id)
+        assert not _blacklisted(org_id, id_proof='AB-1234')
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Camera
+from app.services.camera_service import CameraService
+
+
+class TestCameraHeartbeats:
+
+    def test_heartbeat_is_written_behind(self, app, site_data):
+        """Test that heartbeats reach the cameras table only when flushed"""
+        camera_id = site_data['camera_in'].id
+
+        CameraService.update_heartbeat(camera_id, {'status': 'online'})
+        db.session.expire_all()
+        assert db.session.get(Camera, camera_id).last_heartbeat is None
+
+        live = CameraService.apply_live_status([{'id': camera_id, 'status': 'offline'}])[0]
+        assert live['status'] == 'online'
+        assert CameraService.count_online() == 1
+
+        assert CameraService.flush_heartbeats() == 1
+        assert CameraService.flush_heartbeats() == 0
+        db.session.expire_all()
+        camera = db.session.get(Camera, camera_id)
+        assert camera.status == 'online'
+        assert camera.last_heartbeat is not None
+
+    def test_sweep_marks_silent_cameras_offline(self, app, site_data):
+        """Test that cameras silent past the timeout are marked offline in the store and the table"""
+        cam_in, cam_out = site_data['camera_in'], site_data['camera_out']
+        cam_out.status = 'online'
+        cam_out.last_heartbeat = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+
+        CameraService.update_heartbeat(cam_in.id, {'status': 'online'})
+        later = datetime.utcnow() + timedelta(minutes=5)
+        assert CameraService.count_online(now=later) == 0
+
+        result = CameraService.sweep_stale_heartbeats(timeout_seconds=60, now=later)
+
+        assert result == {'flushed': 1, 'offline': 2}
+        db.session.expire_all()
+        assert db.session.get(Camera, cam_in.id).status == 'offline'
+        assert db.session.get(Camera, cam_out.id).status == 'offline'
@@ -0,0 +1,51 @@
+from datetime import date, datetime
+from sqlalchemy import func
+from app.extensions import db
+from app.models import LPRLog, OrganizationVisitor, VisitorAlert, AttendanceRecord
+from app.utils.date_ranges import within_days, since_day, until_day
+
+
+def _plan(query):
+    """SQLite EXPLAIN QUERY PLAN details of an ORM query"""
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    rows = db.session.connection().exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {compiled}", tuple(params[name] for name in compiled.positiontup)
+    ).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+class TestDateRanges:
+
+    def test_local_day_bounds(self, app):
+        """Test that local days become half-open UTC ranges and Date columns are compared as is"""
+        window = within_days(LPRLog.timestamp, date(2026, 10, 19), timezone_name='Asia/Kolkata')
+        start, end = (clause.right.value for clause in window.clauses)
+        assert (start, end) == (datetime(2026, 10, 18, 18, 30), datetime(2026, 10, 19, 18, 30))
+
+        assert since_day(LPRLog.timestamp, date(2026, 10, 19), 'Nowhere/Unknown').right.value == datetime(2026, 10, 19)
+        assert until_day(AttendanceRecord.date, date(2026, 10, 19)).right.value == date(2026, 10, 20)
+
+    def test_day_filters_use_range_indexes(self, app):
+        """Test that day filters are index range scans where func.date() was not"""
+        day = date(2026, 10, 19)
+
+        lpr = _plan(LPRLog.query.filter(LPRLog.organization_id == 'org', within_days(LPRLog.timestamp, day)))
+        assert 'idx_lpr_org_timestamp (organization_id=? AND timestamp>? AND timestamp<?)' in lpr
+        legacy = _plan(LPRLog.query.filter(LPRLog.organization_id == 'org', func.date(LPRLog.timestamp) == day))
+        assert 'timestamp>?' not in legacy
+
+        visitors = _plan(OrganizationVisitor.query.filter(
+            OrganizationVisitor.organization_id == 'org', within_days(OrganizationVisitor.check_in_time, day)
+        ))
+        assert 'idx_visitor_org_check_in (organization_id=? AND check_in_time>? AND check_in_time<?)' in visitors
+
+        alerts = _plan(VisitorAlert.query.filter(
+            VisitorAlert.organization_id == 'org', within_days(VisitorAlert.alert_time, day)
+        ))
+        assert 'idx_visitor_alert_org_time (organization_id=? AND alert_time>? AND alert_time<?)' in alerts
+
+        history = _plan(AttendanceRecord.query.filter(
+            AttendanceRecord.employee_id == 'emp', within_days(AttendanceRecord.date, date(2026, 9, 19), day)
+        ))
+        assert '(employee_id=? AND date>? AND date<?)' in history
@@ -0,0 +1,65 @@
+from datetime import date, datetime
+from app.extensions import db
+from app.models import AttendanceRecord, LeaveRequest, Employee, User
+from app.services.attendance_service import AttendanceService
+
+
+def _add_employees(site_data, count):
+    for i in range(count):
+        user = User(username=f'extra{i}', email=f'extra{i}@example.com', password_hash='x',
+                    role_id=site_data['employees'][0].user.role_id, organization_id=site_data['org'].id)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Employee(user_id=user.id, organization_id=site_data['org'].id,
+                                department_id=site_data['department'].id, employee_code=f'X{i:03d}',
+                                full_name=f'Extra {i:03d}'))
+    db.session.commit()
+
+
+class TestEmployeesAttendanceSummary:
+
+    def test_totals_and_leave_count(self, app, site_data):
+        """Test that present days, hours and approved leaves are aggregated per employee"""
+        emp_a, emp_b = site_data['employees']
+        for day in (1, 2):
+            db.session.add(AttendanceRecord(
+                employee_id=emp_a.id, organization_id=site_data['org'].id, date=date(2026, 10, day),
+                check_in_time=datetime(2026, 10, day, 9, 0), work_hours=8.0 if day == 1 else 6.0
+            ))
+        for status in ('approved', 'rejected'):
+            db.session.add(LeaveRequest(
+                employee_id=emp_b.id, organization_id=site_data['org'].id, leave_type='sick',
+                start_date=date(2026, 9, 30), end_date=date(2026, 10, 1), total_days=2,
+                reason='Flu', status=status
+            ))
+        db.session.commit()
+
+        result = AttendanceService.get_employees_attendance_summary(
+            site_data['org'].id, date(2026, 10, 1), date(2026, 10, 10)
+        )
+
+        assert result['pagination']['total'] == 2
+        by_code = {item['employee_code']: item for item in result['items']}
+        assert by_code['E000']['present_days'] == 2
+        assert by_code['E000']['absent_days'] == 8
+        assert by_code['E000']['avg_hours_per_day'] == 7.0
+        assert by_code['E000']['department'] == 'Operations'
+        assert by_code['E001']['leave_count'] == 1
+
+    def test_single_statement_per_page(self, app, site_data, count_statements):
+        """Test that a page costs one statement regardless of per_page"""
+        _add_employees(site_data, 30)
+        org_id = site_data['org'].id
+        with count_statements() as statements:
+            small = AttendanceService.get_employees_attendance_summary(org_id, date(2026, 10, 1), date(2026, 10, 31),
+                                                                       page=1, per_page=5)
+            large = AttendanceService.get_employees_attendance_summary(org_id, date(2026, 10, 1), date(2026, 10, 31),
+                                                                       page=1, per_page=500)
+
+        assert len(statements) == 2
+        assert len(small['items']) == 5 and len(large['items']) == 32
+        assert small['pagination'] == {'page': 1, 'per_page': 5, 'total': 32, 'pages': 7}
+
+        past_end = AttendanceService.get_employees_attendance_summary(org_id, date(2026, 10, 1), date(2026, 10, 31),
+                                                                      page=9, per_page=5)
+        assert past_end['items'] == [] and past_end['pagination']['total'] == 32
@@ -0,0 +1,59 @@
+import numpy as np
+from app.utils.face_tracker import FaceTracker, TrackedRecognizer, iou_matrix, xywh_to_xyxy
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def get_embedding(self, face_bgr):
+        self.calls += 1
+        emb = np.zeros(512, dtype=np.float32)
+        emb[0] = 1.0
+        return emb
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
+
+
+class TestFaceTracker:
+
+    def test_iou_matrix(self):
+        """Test IoU of identical and disjoint boxes"""
+        a = [xywh_to_xyxy([50, 50, 20, 20])]
+        b = [xywh_to_xyxy([50, 50, 20, 20]), xywh_to_xyxy([200, 200, 20, 20])]
+        ious = iou_matrix(a, b)
+
+        assert ious.shape == (1, 2)
+        assert abs(ious[0, 0] - 1.0) < 1e-6
+        assert ious[0, 1] == 0.0
+
+    def test_moving_face_keeps_track_id(self):
+        """Test that a face moving a few pixels per frame stays on one track"""
+        tracker = FaceTracker(iou_threshold=0.3, max_misses=2)
+        ids = set()
+        for i in range(30):
+            active, _ = tracker.update([[100 + 4 * i, 200, 80, 80]], now=i)
+            ids.update(t.track_id for t, _ in active)
+
+        assert len(ids) == 1
+        assert len(tracker.tracks) == 1
+
+    def test_one_recognition_per_track(self):
+        """Test that a track is embedded a few times and recognized exactly once"""
+        embedder = FakeEmbedder()
+        recognizer = TrackedRecognizer(embedder, lambda emb: {'employee_id': 'emp-1'},
+                                       min_hits=2, max_embeddings=3, max_misses=2)
+        frame = _frame()
+        results = []
+        for i in range(40):
+            results += recognizer.process('cam-1', frame, [[100 + 3 * i, 200, 80, 80]], now=i)
+        # Person leaves the frame
+        for i in range(40, 45):
+            results += recognizer.process('cam-1', frame, [], now=i)
+
+        assert len(results) == 1
+        assert results[0]['match'] == {'employee_id': 'emp-1'}
+        assert embedder.calls <= 3
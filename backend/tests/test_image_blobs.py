@@ -0,0 +1,143 @@
+import base64
+import pytest
+from app.extensions import db
+from app.models.image import Image
+from app.services.image_service import ImageService, decode_image_base64
+from app.utils.blob_store import S3BlobStore, BlobNotFoundError, content_digest, get_blob_store
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 32
+
+
+class _ClientError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}}
+
+
+class _FakeS3Body:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+class _FakeS3Client:
+    """Dict-backed stand-in for the boto3 S3 client calls the store makes"""
+
+    def __init__(self):
+        self.objects = {}
+        self.puts = 0
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise _ClientError('404')
+        return {}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.puts += 1
+        self.objects[(Bucket, Key)] = Body
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise _ClientError('NoSuchKey')
+        return {'Body': _FakeS3Body(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+def _data_url(data, mime_type='image/png'):
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode()}"
+
+
+def _create(org_id, entity_id, image_base64):
+    return ImageService.create_image(
+        entity_type='employee', entity_id=entity_id, organization_id=org_id,
+        image_base64=image_base64, primary=False
+    )
+
+
+class TestImageBlobs:
+
+    def test_identical_images_stored_once(self, app, site_data):
+        """Test that images are stored by digest and served back as data URLs"""
+        org_id = site_data['org'].id
+        first = _create(org_id, 'emp-1', _data_url(PNG))
+        second = _create(org_id, 'emp-2', base64.b64encode(PNG).decode())
+
+        assert first.content_sha256 == second.content_sha256 == content_digest(PNG)
+        assert first.mime_type == 'image/png'
+        assert first.file_size == len(PNG)
+        assert get_blob_store().get(first.content_sha256) == PNG
+
+        image = db.session.get(Image, first.id)
+        assert image.legacy_base64 is None
+        assert image.image_base64 == _data_url(PNG)
+
+        with pytest.raises(ValueError):
+            _create(org_id, 'emp-3', 'data:image/png;base64,not base64!')
+
+    def test_inline_data_is_opt_in(self, app, site_data, monkeypatch):
+        """Test that listed images are referenced by URL and only read from the store on request"""
+        image = _create(site_data['org'].id, 'emp-1', _data_url(PNG))
+        reads = []
+        monkeypatch.setattr(Image, 'read_bytes', lambda self: reads.append(self.id) or PNG)
+
+        listed = image.to_dict()
+        assert 'image_base64' not in listed
+        assert listed['thumbnail_url'].startswith(f'/api/v2/images/{image.id}/variants/thumb?')
+        assert reads == []
+        assert image.to_dict(include_data=True)['image_base64'] == _data_url(PNG)
+        assert reads == [image.id]
+
+    def test_legacy_rows_migrated_in_batches(self, app, site_data):
+        """Test that inline Base64 rows move to the blob store and keep serving the same image"""
+        org_id = site_data['org'].id
+        payloads = [PNG + bytes([i]) for i in range(5)]
+        legacy = [
+            Image(entity_type='employee', entity_id=f'emp-{i}', organization_id=org_id,
+                  legacy_base64=_data_url(data), mime_type='image/jpeg')
+            for i, data in enumerate(payloads)
+        ]
+        broken = Image(entity_type='employee', entity_id='emp-x', organization_id=org_id,
+                       legacy_base64='%%%')
+        db.session.add_all(legacy + [broken])
+        db.session.commit()
+        ids = [image.id for image in legacy]
+
+        result = ImageService.migrate_legacy_images(batch_size=2)
+        assert result == {'migrated': 5, 'failed': 1, 'bytes': sum(len(d) for d in payloads)}
+
+        for image_id, data in zip(ids, payloads):
+            image = db.session.get(Image, image_id)
+            assert image.content_sha256 == content_digest(data)
+            assert image.legacy_base64 is None
+            assert image.mime_type == 'image/png'
+            assert image.image_base64 == _data_url(data)
+        assert db.session.get(Image, broken.id).content_sha256 is None
+
+        # Rerunning only retries the rows still inline
+        assert ImageService.migrate_legacy_images(batch_size=2) == {'migrated': 0, 'failed': 1, 'bytes': 0}
+
+    def test_s3_store(self):
+        """Test that the S3 store skips uploads of content it already holds"""
+        client = _FakeS3Client()
+        store = S3BlobStore(client, 'bucket', prefix='images/')
+        digest = store.put(PNG, content_type='image/png')
+        assert store.put(PNG) == digest
+        assert client.puts == 1
+        assert ('bucket', f'images/{digest[:2]}/{digest}') in client.objects
+        assert store.get(digest) == PNG
+
+        store.delete(digest)
+        assert not store.exists(digest)
+        with pytest.raises(BlobNotFoundError):
+            store.get(digest)
+
+    def test_decode_image_base64(self):
+        """Test decoding bare Base64 and data URLs"""
+        assert decode_image_base64(_data_url(PNG, 'image/webp')) == (PNG, 'image/webp')
+        assert decode_image_base64(base64.b64encode(PNG).decode()) == (PNG, None)
+        with pytest.raises(ValueError):
+            decode_image_base64('')
@@ -0,0 +1,80 @@
+import base64
+import io
+import os
+import time
+from PIL import Image as PILImage
+from flask_jwt_extended import create_access_token
+from app.services.image_service import ImageService
+from app.utils.image_variants import VariantCache, sign_variant, VARIANT_URL_TTL_SECONDS
+
+
+def _jpeg(width, height):
+    out = io.BytesIO()
+    PILImage.new('RGB', (width, height), (200, 40, 40)).save(out, 'JPEG')
+    return out.getvalue()
+
+
+def _create(org_id, data):
+    return ImageService.create_image(
+        entity_type='employee', entity_id='emp-1', organization_id=org_id,
+        image_base64=base64.b64encode(data).decode(), mime_type='image/jpeg'
+    )
+
+
+class TestImageVariants:
+
+    def test_variant_served_with_conditional_get(self, app, client, site_data):
+        """Test that thumbnails are resized once, cached and revalidated with ETags"""
+        original = _jpeg(1200, 800)
+        image = _create(site_data['org'].id, original)
+        token = create_access_token(identity='user-1', additional_claims={'organization_id': site_data['org'].id})
+        headers = {'Authorization': f'Bearer {token}'}
+        url = f'/api/v2/images/{image.id}/variants/thumb'
+
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'image/jpeg'
+        assert PILImage.open(io.BytesIO(response.data)).size == (160, 107)
+        assert response.headers['ETag'] == f'"{image.content_sha256}-thumb"'
+        assert 'private' in response.headers['Cache-Control']
+        assert 'public' not in response.headers['Cache-Control']
+        assert 'immutable' not in response.headers['Cache-Control']
+        assert response.cache_control.max_age == VARIANT_URL_TTL_SECONDS
+
+        cached = client.get(url, headers={**headers, 'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+
+        assert client.get(url).status_code == 401
+        assert client.get(f'/api/v2/images/{image.id}/variants/original', headers=headers).data == original
+        assert client.get(f'/api/v2/images/{image.id}/variants/huge', headers=headers).status_code == 404
+
+    def test_variant_access(self, app, client, site_data):
+        """Test that variants are served to their own tenant or through an unexpired signed URL"""
+        image = _create(site_data['org'].id, _jpeg(320, 200))
+        url = f'/api/v2/images/{image.id}/variants/thumb'
+        other = create_access_token(identity='user-2', additional_claims={'organization_id': 'other-org'})
+        admin = create_access_token(identity='user-3', additional_claims={'role': 'super_admin'})
+        assert client.get(url, headers={'Authorization': f'Bearer {other}'}).status_code == 404
+        assert client.get(url, headers={'Authorization': f'Bearer {admin}'}).status_code == 200
+
+        # Signed URLs work as <img> sources without a token, for one variant only
+        signed = image.variant_url('thumb')
+        assert client.get(signed).status_code == 200
+        assert client.get(signed.replace('/thumb?', '/original?')).status_code == 403
+        expired = sign_variant(image.id, 'thumb', now=time.time() - 3 * VARIANT_URL_TTL_SECONDS)
+        assert client.get(url, query_string=expired).status_code == 403
+        assert client.get(f'{url}?jwt={other}').status_code == 401
+
+    def test_cache_evicts_least_recently_used(self, tmp_path):
+        """Test that the cache stays under its size bound by dropping the stalest files"""
+        cache = VariantCache(str(tmp_path), max_bytes=250)
+        oldest = cache.put('aa11', 'thumb', b'x' * 100)
+        recent = cache.put('bb22', 'thumb', b'x' * 100)
+        os.utime(oldest, (1, 1))
+        os.utime(recent, (2, 2))
+        assert cache.get('aa11', 'thumb') == oldest  # hit refreshes recency
+
+        cache.put('cc33', 'thumb', b'x' * 100)
+        assert cache.get('bb22', 'thumb') is None
+        assert cache.get('aa11', 'thumb') == oldest
+        assert cache.get('cc33', 'thumb') is not None
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from app.utils.inference_scheduler import InferenceScheduler
+
+
+class FakeDetector:
+    def __init__(self):
+        self.batches = []
+
+    def detect_batch(self, frames):
+        self.batches.append(len(frames))
+        # Echo the frame marker back so routing can be checked
+        return [[[float(f[0, 0, 0]), 0, 1, 1]] for f in frames]
+
+
+class TestInferenceScheduler:
+
+    def test_batches_and_routes_results(self):
+        """Test that work from many cameras is batched and routed back per camera"""
+        detector = FakeDetector()
+        scheduler = InferenceScheduler(detector=detector, max_batch_size=8, max_wait_ms=50)
+        scheduler.start()
+        try:
+            futures = {}
+            for i in range(20):
+                frame = np.full((4, 4, 3), i, dtype=np.uint8)
+                futures[f'cam-{i}'] = (i, scheduler.submit_detection(f'cam-{i}', frame))
+
+            for camera_id, (marker, future) in futures.items():
+                assert future.result(timeout=5) == [[float(marker), 0, 1, 1]]
+        finally:
+            scheduler.stop()
+
+        assert sum(detector.batches) == 20
+        assert max(detector.batches) <= 8
+        assert len(detector.batches) < 20
+
+        stats = scheduler.get_stats()['detection']
+        assert stats['batch_size']['count'] == len(detector.batches)
+        assert stats['queue_delay_ms']['count'] == 20
+
+    def test_unavailable_stage_and_short_results_fail_fast(self):
+        """Test that futures never hang on a missing stage or a short batch result"""
+        class ShortDetector(FakeDetector):
+            def detect_batch(self, frames):
+                return super().detect_batch(frames)[:1]
+
+        scheduler = InferenceScheduler(detector=ShortDetector(), max_batch_size=4, max_wait_ms=200)
+        scheduler.start()
+        try:
+            with pytest.raises(RuntimeError):
+                scheduler.submit_embedding('cam-1', np.zeros((4, 4, 3), dtype=np.uint8))
+
+            futures = [scheduler.submit_detection('cam-1', np.full((4, 4, 3), i, dtype=np.uint8)) for i in range(3)]
+            assert futures[0].result(timeout=5) == [[0.0, 0, 1, 1]]
+            for future in futures[1:]:
+                with pytest.raises(RuntimeError):
+                    future.result(timeout=5)
+        finally:
+            scheduler.stop()
+
+        with pytest.raises(RuntimeError):
+            scheduler.submit_detection('cam-1', np.zeros((4, 4, 3), dtype=np.uint8))
@@ -0,0 +1,45 @@
+from datetime import date, datetime, time
+from app.extensions import db
+from app.models import AttendanceRecord, AttendanceDailyStat
+from app.services.lateness_service import LatenessService, compute_lateness
+
+
+class TestComputeLateness:
+
+    def test_grace_period_and_minutes(self):
+        """Test that lateness starts after the grace period and counts from the shift start"""
+        assert compute_lateness(datetime(2026, 10, 5, 9, 15, 59), time(9, 0), 15) == (False, 0)
+        assert compute_lateness(datetime(2026, 10, 5, 9, 16), time(9, 0), 15) == (True, 16)
+        assert compute_lateness(datetime(2026, 10, 5, 8, 30), time(9, 0), 15) == (False, 0)
+        assert compute_lateness(datetime(2026, 10, 5, 9, 30), None, 15) == (False, 0)
+
+    def test_uses_organization_timezone_and_wraps_midnight(self):
+        """Test that UTC check-ins are compared in local time, including night shifts"""
+        # 04:10 UTC is 09:40 in Kolkata
+        assert compute_lateness(datetime(2026, 10, 5, 4, 10), time(9, 30), 0, 'Asia/Kolkata') == (True, 10)
+        assert compute_lateness(datetime(2026, 10, 5, 4, 10), time(9, 30), 0, 'Not/AZone') == (False, 0)
+        # 00:20 against a 23:50 shift start is 30 minutes late, not 23 hours early
+        assert compute_lateness(datetime(2026, 10, 6, 0, 20), time(23, 50), 15) == (True, 30)
+
+
+class TestLatenessBackfill:
+
+    def test_backfill_sets_columns_and_rollup(self, app, site_data):
+        """Test that backfill evaluates unevaluated records and updates the daily late count"""
+        emp_a, emp_b = site_data['employees']
+        for employee, check_in in ((emp_a, datetime(2026, 10, 5, 9, 40)), (emp_b, datetime(2026, 10, 5, 9, 5))):
+            db.session.add(AttendanceRecord(employee_id=employee.id, organization_id=site_data['org'].id,
+                                            date=check_in.date(), check_in_time=check_in, status='present'))
+        db.session.commit()
+
+        assert LatenessService.backfill(batch_size=1) == {'updated': 2, 'late': 1}
+        assert LatenessService.backfill() == {'updated': 0, 'late': 0}
+
+        late = AttendanceRecord.query.filter_by(employee_id=emp_a.id).one()
+        assert (late.is_late, late.minutes_late) == (True, 40)
+        on_time = AttendanceRecord.query.filter_by(employee_id=emp_b.id).one()
+        assert (on_time.is_late, on_time.minutes_late) == (False, 0)
+
+        row = db.session.get(AttendanceDailyStat, (site_data['org'].id, date(2026, 10, 5),
+                                                   site_data['department'].id, 'full_time'))
+        assert row.late_count == 1
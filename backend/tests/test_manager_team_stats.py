@@ -0,0 +1,46 @@
+from datetime import date
+from app.extensions import db
+from app.models import LeaveRequest
+from app.services.team_stats_service import TeamStatsService
+
+
+class TestTeamStats:
+
+    def test_stats_in_one_statement(self, app, site_data, count_statements, attend):
+        """Test that every dashboard counter comes from a single statement"""
+        emp_a, emp_b = site_data['employees']
+        for day in range(1, 5):
+            attend(emp_a, date(2026, 10, day))
+        attend(emp_b, date(2026, 10, 4), is_late=True)
+        attend(emp_b, date(2026, 9, 30))
+        db.session.add(LeaveRequest(employee_id=emp_b.id, organization_id=site_data['org'].id,
+                                    leave_type='sick', start_date=date(2026, 10, 8), end_date=date(2026, 10, 8),
+                                    total_days=1, reason='Flu', status='pending'))
+        db.session.commit()
+        org_id, department_id = site_data['org'].id, site_data['department'].id
+        with count_statements() as statements:
+            stats = TeamStatsService._compute(org_id, department_id, date(2026, 10, 4))
+
+        assert len(statements) == 1
+        assert stats == {
+            'total_members': 2,
+            'total_organization_members': 2,
+            'organization_name': 'Site Organization',
+            'department_name': 'Operations',
+            'present_today': 2,
+            'pending_leaves': 1,
+            'late_arrivals': 1,
+            'attendance_percentage': 62.5,
+        }
+        assert TeamStatsService._compute(org_id, None, date(2026, 10, 4))['department_name'] == 'All Departments'
+
+    def test_cached_per_scope(self, app, site_data, attend):
+        """Test that stats are served from the cache until it expires"""
+        org_id = site_data['org'].id
+        first = TeamStatsService.get_team_stats(org_id, today=date(2026, 10, 4))
+        assert first['present_today'] == 0
+
+        attend(site_data['employees'][0], date(2026, 10, 4))
+        db.session.commit()
+        assert TeamStatsService.get_team_stats(org_id, today=date(2026, 10, 4)) == first
+        assert TeamStatsService.get_team_stats(org_id, today=date(2026, 10, 5))['present_today'] == 0
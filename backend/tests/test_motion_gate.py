@@ -0,0 +1,54 @@
+import numpy as np
+from app.utils.motion_gate import MotionGate, MotionGatedDetector
+
+
+class FakeDetector:
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, frame):
+        self.calls += 1
+        return []
+
+
+def _blank(h=240, w=320):
+    return np.zeros((h, w, 3), dtype=np.uint8)
+
+
+def _with_block(h=240, w=320):
+    frame = _blank(h, w)
+    frame[60:180, 80:240] = 255
+    return frame
+
+
+class TestMotionGate:
+
+    def test_static_scene_backs_off(self):
+        """Test that a static scene is only sampled at the idle interval"""
+        gate = MotionGate(cooldown_frames=0, max_idle_interval=8)
+        passed = sum(gate.should_detect(_blank()) for _ in range(100))
+
+        assert passed < 20
+        assert gate.get_stats()['idle_interval'] == 8
+
+    def test_motion_opens_gate(self):
+        """Test that motion triggers detection and resets the idle interval"""
+        gate = MotionGate(cooldown_frames=2, max_idle_interval=8)
+        for _ in range(50):
+            gate.should_detect(_blank())
+
+        assert gate.should_detect(_with_block()) is True
+        assert gate.get_stats()['idle_interval'] == 1
+        # Cooldown keeps the gate open for a couple of frames after motion
+        assert gate.should_detect(_with_block()) is True
+
+    def test_gated_detector_skips_idle_frames(self):
+        """Test that the wrapper only calls the detector for gated frames"""
+        detector = FakeDetector()
+        gated = MotionGatedDetector(detector, cooldown_frames=0, max_idle_interval=16)
+
+        results = [gated.detect('cam-1', _blank()) for _ in range(60)]
+
+        assert detector.calls == sum(r is not None for r in results)
+        assert detector.calls < 15
+        assert 'cam-1' in gated.get_stats()
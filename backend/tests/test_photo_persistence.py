@@ -0,0 +1,103 @@
+import base64
+import io
+import queue
+from datetime import datetime, timedelta
+from PIL import Image as PILImage
+from app.extensions import db
+from app.models.image import Image
+from app.schemas.visitor import VisitorResponseSchema
+from app.services.photo_persistence_service import PhotoPersistenceService
+from app.services.visitor_service import VisitorService
+from app.utils.blob_store import get_blob_store
+
+
+def _png_base64(width, height):
+    out = io.BytesIO()
+    PILImage.new('RGBA', (width, height), (10, 120, 200, 255)).save(out, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(out.getvalue()).decode()
+
+
+class TestPhotoPersistence:
+
+    def test_visitor_committed_before_photos_stored(self, app, site_data):
+        """Test that registration returns placeholders and the worker fills them in one batch"""
+        org_id = site_data['org'].id
+        visitor = VisitorService.create_visitor(org_id, {
+            'name': 'Guest', 'mobile_number': '5550100', 'purpose_of_visit': 'Meeting', 'allowed_floor': '1',
+            'image_base64': _png_base64(40, 30),
+            'vehicle_photos': [
+                {'type': 'front', 'base64': _png_base64(3000, 1500)},
+                {'type': 'plate', 'base64': 'not an image'},
+            ]
+        })
+
+        primary = visitor.get_primary_image()
+        assert primary is not None and primary.content_sha256 is None
+        assert primary.image_base64 is None
+        front, plate = visitor.vehicle_photos
+        assert front['type'] == 'front'
+        assert set(front) == {'type', 'image_id'}
+        # Signed URLs are built per response, usable as an <img> source without a token
+        served = VisitorResponseSchema().dump(visitor)['vehicle_photos'][0]
+        assert served['url'].startswith(f"/api/v2/images/{front['image_id']}/variants/original?expires=")
+
+        assert PhotoPersistenceService.drain() == {'stored': 2, 'failed': 1}
+        db.session.expire_all()
+
+        primary = db.session.get(Image, primary.id)
+        assert primary.mime_type == 'image/jpeg'
+        assert primary.image_base64.startswith('data:image/jpeg;base64,')
+        stored = get_blob_store().get(db.session.get(Image, front['image_id']).content_sha256)
+        assert PILImage.open(io.BytesIO(stored)).size == (1920, 960)
+        assert db.session.get(Image, plate['image_id']).deleted is True
+
+    def test_queue_overflow_persists_in_request(self, app, site_data, monkeypatch):
+        """Test that a full queue falls back to storing photos synchronously"""
+        monkeypatch.setitem(app.extensions, 'photo_persistence_queue', queue.Queue(maxsize=1))
+        org_id = site_data['org'].id
+        photos = [{'image_base64': _png_base64(10, 10)} for _ in range(3)]
+        jobs = PhotoPersistenceService.reserve(org_id, 'visitor', 'visitor-1', photos)
+        db.session.commit()
+
+        PhotoPersistenceService.submit(jobs)
+        stored = Image.query.filter(Image.content_sha256.isnot(None)).count()
+        assert stored == 2
+        assert PhotoPersistenceService.drain() == {'stored': 1, 'failed': 0}
+
+    def test_store_failure_spares_rest_of_batch(self, app, site_data, monkeypatch):
+        """Test that a photo the blob store rejects fails alone instead of the whole batch"""
+        store = get_blob_store()
+        put = store.put
+        calls = []
+
+        def flaky_put(data, content_type=None):
+            calls.append(data)
+            if len(calls) == 1:
+                raise ConnectionError('store unavailable')
+            return put(data, content_type=content_type)
+
+        monkeypatch.setattr(store, 'put', flaky_put)
+        photos = [{'image_base64': _png_base64(10 + i, 10)} for i in range(3)]
+        jobs = PhotoPersistenceService.reserve(site_data['org'].id, 'visitor', 'visitor-1', photos)
+        db.session.commit()
+
+        assert PhotoPersistenceService.persist(jobs) == {'stored': 2, 'failed': 1}
+        db.session.expire_all()
+        assert db.session.get(Image, jobs[0][0]).deleted is True
+        assert all(db.session.get(Image, image_id).content_sha256 for image_id, _ in jobs[1:])
+
+    def test_lost_placeholders_swept(self, app, site_data):
+        """Test that placeholders left empty past the age limit are soft deleted, pending ones kept"""
+        org_id = site_data['org'].id
+        (lost, _), = PhotoPersistenceService.reserve(org_id, 'visitor', 'visitor-1', [{'image_base64': 'x'}])
+        db.session.commit()
+        jobs = PhotoPersistenceService.reserve(org_id, 'visitor', 'visitor-2', [{'image_base64': _png_base64(8, 8)}])
+        db.session.commit()
+        PhotoPersistenceService.persist(jobs)
+
+        assert PhotoPersistenceService.sweep_stale_placeholders(max_age_minutes=30) == 0
+        later = datetime.utcnow() + timedelta(minutes=31)
+        assert PhotoPersistenceService.sweep_stale_placeholders(max_age_minutes=30, now=later) == 1
+        db.session.expire_all()
+        assert db.session.get(Image, lost).deleted is True
+        assert db.session.get(Image, jobs[0][0]).deleted is False
@@ -0,0 +1,56 @@
+from app.utils.presence_debouncer import InMemoryPresenceDebouncer
+
+
+def _event(second, confidence, quality=0.5, event_type='CHECK_IN', employee_id='emp-1'):
+    return {
+        'employee_id': employee_id,
+        'camera_id': 'cam-1',
+        'event_type': event_type,
+        'timestamp': f'2026-10-19T09:00:{second:02d}',
+        'confidence_score': confidence,
+        'face_quality_score': quality,
+    }
+
+
+class TestPresenceDebouncer:
+
+    def test_burst_collapses_to_one_event(self):
+        """Test that repeated recognitions inside the window become one event"""
+        debouncer = InMemoryPresenceDebouncer(window_seconds=10, max_burst_seconds=60)
+        for i, conf in enumerate([0.70, 0.95, 0.80, 0.60]):
+            debouncer.add(_event(i, conf, quality=0.1 * (i + 1)), now=100 + i)
+
+        assert debouncer.drain(now=105) == []
+        events = debouncer.drain(now=114)
+
+        assert len(events) == 1
+        assert events[0]['confidence_score'] == 0.95
+        assert events[0]['face_quality_score'] == 0.4
+        assert events[0]['timestamp'] == '2026-10-19T09:00:00'
+        assert events[0]['burst_size'] == 4
+
+    def test_check_out_keeps_last_sighting(self):
+        """Test that CHECK_OUT bursts use the last timestamp"""
+        debouncer = InMemoryPresenceDebouncer(window_seconds=10)
+        debouncer.add(_event(1, 0.9, event_type='CHECK_OUT'), now=0)
+        debouncer.add(_event(7, 0.8, event_type='CHECK_OUT'), now=6)
+
+        events = debouncer.drain(force=True)
+        assert events[0]['timestamp'] == '2026-10-19T09:00:07'
+
+    def test_long_linger_is_capped(self):
+        """Test that a person lingering still produces events every max_burst_seconds"""
+        debouncer = InMemoryPresenceDebouncer(window_seconds=10, max_burst_seconds=30)
+        emitted = []
+        for t in range(0, 95, 5):
+            debouncer.add(_event(t % 60, 0.9), now=t)
+            emitted += debouncer.drain(now=t)
+
+        assert 2 <= len(emitted) <= 4
+
+    def test_unknown_faces_bypass(self):
+        """Test that events without an employee are returned immediately"""
+        debouncer = InMemoryPresenceDebouncer(window_seconds=10)
+        event = _event(0, 0.3, employee_id=None)
+        assert debouncer.add(event) is event
+        assert debouncer.pending() == 0
@@ -0,0 +1,83 @@
+import pytest
+from app.models import PresenceEvent
+from app.services import presence_event_service
+from app.services.presence_event_service import PresenceEventService
+from app.utils.exceptions import APIException, BadRequestError
+
+
+def _event(site_data, i, **overrides):
+    event = {
+        'camera_id': site_data['camera_in'].id,
+        'employee_id': site_data['employees'][i % 2].id,
+        'timestamp': f'2026-10-19T08:{i // 60:02d}:{i % 60:02d}Z',
+        'confidence_score': 0.91,
+    }
+    event.update(overrides)
+    return event
+
+
+class TestPresenceBulkIngest:
+
+    def test_bulk_insert(self, app, site_data):
+        """Test that a valid batch is inserted in one call with camera defaults applied"""
+        org_id = site_data['org'].id
+        events = [_event(site_data, i) for i in range(250)]
+
+        result = PresenceEventService.bulk_ingest(events, org_id)
+
+        assert result['inserted'] == 250
+        assert result['rejected'] == 0
+        assert PresenceEvent.query.count() == 250
+        stored = PresenceEvent.query.first()
+        assert stored.event_type == 'CHECK_IN'
+        assert stored.location_id == site_data['location'].id
+
+    def test_retry_drops_duplicates(self, app, site_data):
+        """Test that retried events (same idempotency key) are not inserted twice"""
+        org_id = site_data['org'].id
+        events = [_event(site_data, i, idempotency_key=f'key-{i}') for i in range(20)]
+
+        PresenceEventService.bulk_ingest(events, org_id)
+        result = PresenceEventService.bulk_ingest(events + [events[0]], org_id)
+
+        assert result['inserted'] == 0
+        assert result['duplicates'] == 21
+        assert PresenceEvent.query.count() == 20
+
+    def test_invalid_events_are_rejected_individually(self, app, site_data):
+        """Test that bad rows are reported by index without failing the batch"""
+        org_id = site_data['org'].id
+        events = [
+            _event(site_data, 0),
+            _event(site_data, 1, camera_id='missing'),
+            _event(site_data, 2, timestamp='yesterday'),
+            _event(site_data, 3, confidence_score=1.5),
+            _event(site_data, 4, location_id='other-organization-location'),
+            _event(site_data, 5, processing_time_ms='slow'),
+            _event(site_data, 6, liveness_score=True),
+            _event(site_data, 7, image_url='x' * 600),
+            _event(site_data, 8, location_id=site_data['location'].id, processing_time_ms=120),
+            _event(site_data, 9, camera_id=['x']),
+            _event(site_data, 10, employee_id={'id': 1}),
+        ]
+
+        result = PresenceEventService.bulk_ingest(events, org_id)
+
+        assert result['inserted'] == 2
+        assert [e['index'] for e in result['errors']] == [1, 2, 3, 4, 5, 6, 7, 9, 10]
+        assert result['errors'][-2]['message'] == 'camera_id must be a string'
+
+    def test_empty_batch(self, app, site_data):
+        """Test that an empty batch is a bad request"""
+        with pytest.raises(BadRequestError):
+            PresenceEventService.bulk_ingest([], site_data['org'].id)
+
+    def test_slow_batch_rolled_back(self, app, site_data, monkeypatch):
+        """Test that a batch committing past the aggregator's bound is refused"""
+        monkeypatch.setattr(presence_event_service, 'INGEST_MAX_TRANSACTION_SECONDS', -1)
+
+        with pytest.raises(APIException) as error:
+            PresenceEventService.bulk_ingest([_event(site_data, 0)], site_data['org'].id)
+
+        assert error.value.status_code == 503
+        assert PresenceEvent.query.count() == 0
@@ -0,0 +1,87 @@
+import importlib.util
+import io
+import os
+import warnings
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.services.presence_partition_service import (
+    PresencePartitionService,
+    add_months,
+    month_start,
+    partition_name,
+)
+
+MIGRATION_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'migrations', 'versions', 'c5e81f4a2d67_partition_presence_events.py'
+)
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location('partition_presence_events', MIGRATION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestPresencePartitions:
+
+    def test_month_helpers(self):
+        """Test month arithmetic and partition naming across year boundaries"""
+        month = month_start(datetime(2026, 11, 19, 8, 30))
+
+        assert month == datetime(2026, 11, 1)
+        assert add_months(month, 2) == datetime(2027, 1, 1)
+        assert add_months(month, -11) == datetime(2025, 12, 1)
+        assert partition_name(month) == 'presence_events_p2026_11'
+
+    def test_maintenance_skipped_without_partitioning(self, app):
+        """Test that maintenance is a no-op on databases without partitioning"""
+        assert PresencePartitionService.is_partitioned() is False
+        assert PresencePartitionService.ensure_partitions() == []
+        assert PresencePartitionService.apply_retention(13, '/tmp/unused') == []
+
+    def test_partitioned_table_ddl(self):
+        """Test the PostgreSQL DDL renders a range-partitioned table keyed on (id, timestamp)"""
+        migration = _load_migration()
+        buffer = io.StringIO()
+        context = MigrationContext.configure(
+            dialect_name='postgresql', opts={'as_sql': True, 'output_buffer': buffer}
+        )
+
+        with Operations.context(context):
+            migration._create_table('presence_events', partitioned=True)
+
+        ddl = buffer.getvalue()
+        assert 'PARTITION BY RANGE (timestamp)' in ddl
+        assert 'PRIMARY KEY (id, timestamp)' in ddl
+        assert 'UNIQUE (organization_id, idempotency_key, timestamp)' in ddl
+
+    def test_sqlite_upgrade_matches_model_keys(self):
+        """Test the non-PostgreSQL branch moves the primary key to (id, timestamp) and back"""
+        migration = _load_migration()
+        engine = sa.create_engine('sqlite://')
+
+        with engine.begin() as connection:
+            referenced = sa.MetaData()
+            for table in ('attendance_records', 'cameras', 'employees', 'locations', 'organizations', 'users'):
+                sa.Table(table, referenced, sa.Column('id', sa.String(36), primary_key=True))
+            referenced.create_all(connection)
+
+            with Operations.context(MigrationContext.configure(connection)), warnings.catch_warnings():
+                # Batch mode warns while it swaps the reflected primary key for the new one
+                warnings.simplefilter('ignore', sa.exc.SAWarning)
+                # Previous revision's table: primary key on id only, no created_at index
+                migration._create_table('presence_events', partitioned=False)
+                migration.op.drop_index('idx_presence_created_at', table_name='presence_events')
+
+                migration.upgrade()
+                inspector = sa.inspect(connection)
+                assert inspector.get_pk_constraint('presence_events')['constrained_columns'] == ['id', 'timestamp']
+
+                migration.downgrade()
+                inspector = sa.inspect(connection)
+                assert inspector.get_pk_constraint('presence_events')['constrained_columns'] == ['id']
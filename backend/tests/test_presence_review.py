@@ -0,0 +1,73 @@
+import pytest
+from app.extensions import db
+from app.models import PresenceEvent
+from app.services.presence_event_service import PresenceEventService
+from app.utils.exceptions import BadRequestError
+
+
+def _ingest(site_data, count):
+    events = [{
+        'camera_id': site_data['camera_in'].id,
+        'employee_id': site_data['employees'][i % 2].id,
+        # Pairs share a timestamp so the id tie-breaker is exercised
+        'timestamp': f'2026-10-19T08:00:{i // 2:02d}Z',
+        'idempotency_key': f'review-{i}',
+    } for i in range(count)]
+    PresenceEventService.bulk_ingest(events, site_data['org'].id)
+
+
+class TestPresenceReviewQueue:
+
+    def test_keyset_pages_cover_queue_once(self, app, site_data):
+        """Test that following next_cursor visits every pending event exactly once, in order"""
+        _ingest(site_data, 25)
+        org_id = site_data['org'].id
+
+        seen, cursor = [], None
+        while True:
+            page = PresenceEventService.review_queue(org_id, {'limit': 10, 'cursor': cursor})
+            seen.extend(page['items'])
+            if not page['has_more']:
+                break
+            cursor = page['next_cursor']
+
+        assert len(seen) == 25
+        assert len({item['id'] for item in seen}) == 25
+        assert [(i['timestamp'], i['id']) for i in seen] == sorted((i['timestamp'], i['id']) for i in seen)
+        assert seen[0]['employee']['employee_code']
+
+    def test_page_uses_constant_queries(self, app, site_data, count_statements):
+        """Test that related rows are eager-loaded instead of lazily per event"""
+        _ingest(site_data, 20)
+        org_id = site_data['org'].id
+        db.session.expire_all()
+        with count_statements() as statements:
+            page = PresenceEventService.review_queue(org_id, {'limit': 20})
+
+        assert len(page['items']) == 20
+        assert len(statements) == 1
+
+    def test_bulk_review_updates_in_one_statement(self, app, site_data):
+        """Test that bulk review touches only this organization's events not yet in that status"""
+        _ingest(site_data, 6)
+        events = PresenceEvent.query.order_by(PresenceEvent.timestamp).all()
+        ids = [e.id for e in events]
+        start, end = events[0].timestamp, events[3].timestamp
+
+        result = PresenceEventService.bulk_review(
+            site_data['org'].id, ids[:4] + ['missing'], start, end, 'approved', reviewer_id=None, notes='ok'
+        )
+        again = PresenceEventService.bulk_review(site_data['org'].id, ids[:4], start, end, 'approved', reviewer_id=None)
+        # Events outside the given range are not matched
+        outside = PresenceEventService.bulk_review(site_data['org'].id, ids[4:], start, end, 'approved', reviewer_id=None)
+
+        assert result == {'requested': 5, 'updated': 4}
+        assert again['updated'] == 0
+        assert outside['updated'] == 0
+        remaining = PresenceEventService.review_queue(site_data['org'].id, {'limit': 50})
+        assert len(remaining['items']) == 2
+
+    def test_invalid_cursor(self, app, site_data):
+        """Test that a malformed cursor is a bad request"""
+        with pytest.raises(BadRequestError):
+            PresenceEventService.review_queue(site_data['org'].id, {'cursor': 'not-a-cursor'})
@@ -0,0 +1,62 @@
+from flask_jwt_extended import create_access_token
+from app.extensions import socketio
+from app.services.camera_service import CameraService
+from app.services.lpr_service import LPRService
+from app.services.realtime_service import NAMESPACE
+from app.services.visitor_service import VisitorService
+
+
+def _dashboard(app, organization_id, role='org_admin'):
+    token = create_access_token(identity='user-1', additional_claims={
+        'role': role, 'organization_id': organization_id
+    })
+    return socketio.test_client(app, namespace=NAMESPACE, auth={'token': token})
+
+
+def _events(client):
+    """Payloads received so far, grouped by event name (get_received drains the queue)"""
+    events = {}
+    for message in client.get_received(NAMESPACE):
+        events.setdefault(message['name'], []).append(message['args'][0])
+    return events
+
+
+class TestRealtimePush:
+
+    def test_connect_requires_token(self, app, site_data):
+        """Test that dashboards without a valid access token are refused"""
+        assert not socketio.test_client(app, namespace=NAMESPACE).is_connected(NAMESPACE)
+        assert not socketio.test_client(app, namespace=NAMESPACE, auth={'token': 'bogus'}).is_connected(NAMESPACE)
+        assert not _dashboard(app, None).is_connected(NAMESPACE)
+
+    def test_changes_pushed_to_organization_room(self, app, site_data):
+        """Test that visitor and LPR changes reach only the organization's dashboards as deltas"""
+        org_id = site_data['org'].id
+        dashboard = _dashboard(app, org_id)
+        other = _dashboard(app, 'another-organization')
+        assert dashboard.is_connected(NAMESPACE)
+
+        VisitorService.create_visitor(org_id, {
+            'name': 'Guest', 'mobile_number': '5550100', 'purpose_of_visit': 'Meeting', 'allowed_floor': '1'
+        })
+        LPRService.create_manual_entry(org_id, {'vehicle_number': 'ka01ab1234'})
+
+        events = _events(dashboard)
+        lpr = events['lpr']
+        assert events['visitor_stats'] == [{'delta': {'active_visitors': 1, 'entries_today': 1, 'guests_today': 1}}]
+        assert lpr[0]['action'] == 'entry'
+        assert lpr[0]['log']['vehicle_number'] == 'KA01AB1234'
+        assert lpr[0]['delta'] == {'entries_today': 1}
+        assert _events(other) == {}
+
+    def test_camera_status_pushed_on_change_only(self, app, site_data):
+        """Test that repeated heartbeats with the same status push nothing"""
+        camera = site_data['camera_in']
+        dashboard = _dashboard(app, site_data['org'].id)
+        previous = CameraService.apply_live_status([camera.to_dict()])[0]['status']
+        new_status = 'error' if previous == 'online' else 'online'
+
+        CameraService.update_heartbeat(camera.id, {'status': new_status})
+        CameraService.update_heartbeat(camera.id, {'status': new_status})
+
+        assert _events(dashboard).get('camera_status') == [{'cameras': [{'id': camera.id, 'status': new_status}]}]
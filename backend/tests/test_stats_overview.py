@@ -0,0 +1,47 @@
+import time
+from datetime import datetime, timedelta
+from app.extensions import db, cache
+from app.models import PresenceEvent
+from app.services import stats_overview_service
+from app.services.stats_overview_service import StatsOverviewService, SNAPSHOT_KEY
+
+
+class TestStatsOverview:
+
+    def test_counts_in_one_statement(self, app, site_data, count_statements):
+        """Test that every overview counter, online cameras included, comes from one statement"""
+        employee = site_data['employees'][0]
+        site_data['camera_in'].status = 'online'
+        site_data['camera_in'].last_heartbeat = datetime.utcnow()
+        site_data['camera_out'].status = 'online'
+        site_data['camera_out'].last_heartbeat = datetime.utcnow() - timedelta(hours=1)
+        db.session.add(PresenceEvent(organization_id=site_data['org'].id, employee_id=employee.id,
+                                     camera_id=site_data['camera_in'].id, location_id=site_data['location'].id, event_type='CHECK_IN',
+                                     timestamp=datetime(2026, 10, 19, 9, 0), is_anomaly=True))
+        db.session.commit()
+        with count_statements() as statements:
+            data = StatsOverviewService._compute()
+
+        assert len(statements) == 1
+        assert 'FILTER (WHERE' in statements[0]
+        assert data['organizations'] == {'total': 1, 'active': 1}
+        assert data['employees'] == {'total': 2, 'active': 2}
+        assert data['presence_events'] == {'total': 1, 'unknown_faces': 0, 'anomalies': 1, 'pending_reviews': 1}
+        assert data['cameras'] == {'total': 2, 'online': 1}
+        assert data['visitors'] == {'total': 0}
+
+    def test_stale_snapshot_served_while_refreshing(self, app, site_data, monkeypatch):
+        """Test that a stale snapshot is returned immediately and rebuilt once in the background"""
+        first = StatsOverviewService.get_overview()
+        assert cache.get(SNAPSHOT_KEY)['data'] == first
+
+        refreshed = []
+        monkeypatch.setattr(StatsOverviewService, '_refresh_in_background', staticmethod(refreshed.append))
+        assert StatsOverviewService.get_overview() == first
+        assert refreshed == []
+
+        monkeypatch.setattr(stats_overview_service, 'FRESH_SECONDS', -1)
+        assert StatsOverviewService.get_overview() == first
+        assert StatsOverviewService.get_overview() == first
+        time.sleep(0.1)
+        assert refreshed == [app]
@@ -0,0 +1,75 @@
+from datetime import date
+from app.extensions import db
+from app.models import LeaveRequest, Department, ReportSnapshot
+from app.services.team_report_service import TeamReportService
+
+
+class TestTeamReports:
+
+    def test_report_query_count_independent_of_departments(self, app, site_data, count_statements, attend):
+        """Test that the report is built from a fixed number of grouped queries"""
+        emp_a, emp_b = site_data['employees']
+        for day in range(1, 5):
+            attend(emp_a, date(2026, 10, day))
+        attend(emp_b, date(2026, 10, 2), is_late=True)
+        db.session.add(LeaveRequest(employee_id=emp_b.id, organization_id=site_data['org'].id,
+                                    leave_type='sick', start_date=date(2026, 10, 3), end_date=date(2026, 10, 3),
+                                    total_days=1, reason='Flu', status='approved'))
+        for i in range(5):
+            db.session.add(Department(organization_id=site_data['org'].id, name=f'Empty {i}', code=f'E{i}'))
+        db.session.commit()
+        org_id = site_data['org'].id
+        with count_statements() as statements:
+            report = TeamReportService.build_report(org_id, None, date(2026, 10, 1), date(2026, 10, 4))
+
+        assert len(statements) == 6
+        assert report['attendance_summary'] == {
+            'total_attendance_records': 5,
+            'expected_attendance': 8,
+            'average_attendance_rate': 62.5,
+            'late_arrivals': 1,
+            'late_arrival_rate': 20.0,
+        }
+        assert report['leave_summary'] == {'pending': 0, 'approved': 1, 'rejected': 0, 'total_leave_days': 1.0}
+        assert report['demographics']['employment_type_breakdown'] == {'full_time': 2}
+        assert [(p['employee_code'], p['attendance_days']) for p in report['top_performers']] == [('E000', 4), ('E001', 1)]
+        operations = next(d for d in report['department_breakdown'] if d['name'] == 'Operations')
+        assert (operations['employee_count'], operations['attendance_rate']) == (2, 62.5)
+        assert len(report['department_breakdown']) == 6
+
+    def test_snapshots_are_versioned_and_served_when_ready(self, app, site_data, attend):
+        """Test that refresh queues a new version and readers keep the previous one until it is built"""
+        scope = (site_data['org'].id, site_data['department'].id, date(2026, 10, 1), date(2026, 10, 4))
+        assert TeamReportService.latest(*scope) is None
+
+        first = TeamReportService.request_snapshot(*scope)
+        assert TeamReportService.request_snapshot(*scope).id == first.id
+        assert TeamReportService.run_pending() == {'built': 1, 'failed': 0}
+        assert TeamReportService.latest(*scope).data['report_scope']['department'] == 'Operations'
+
+        attend(site_data['employees'][0], date(2026, 10, 2))
+        db.session.commit()
+        second = TeamReportService.request_snapshot(*scope)
+        assert second.version == 2
+        assert TeamReportService.latest(*scope).version == 1
+
+        TeamReportService.run_pending()
+        latest = TeamReportService.latest(*scope)
+        assert latest.version == 2
+        assert latest.data['attendance_summary']['total_attendance_records'] == 1
+        assert ReportSnapshot.query.count() == 2
+
+    def test_schedule_queues_stale_current_months(self, app, site_data):
+        """Test that the scheduler queues every scope once and skips fresh ones"""
+        assert TeamReportService.schedule_current_periods(today=date(2026, 10, 4)) == 2
+        assert TeamReportService.schedule_current_periods(today=date(2026, 10, 20)) == 0
+        # Still queued: the month's snapshots are not queued or counted again
+        assert TeamReportService.schedule_current_periods(today=date(2026, 10, 4), stale_after_minutes=0) == 0
+        periods = {(s.period_start, s.period_end) for s in ReportSnapshot.query}
+        assert periods == {(date(2026, 10, 1), date(2026, 10, 31))}
+
+    def test_period_is_bounded(self, app):
+        """Test that reversed and over-long periods are refused"""
+        assert TeamReportService.period_error(date(2026, 1, 1), date(2026, 12, 31)) is None
+        assert TeamReportService.period_error(date(2026, 10, 2), date(2026, 10, 1)) is not None
+        assert TeamReportService.period_error(date(2025, 1, 1), date(2026, 10, 1)) is not None
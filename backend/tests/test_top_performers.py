@@ -0,0 +1,56 @@
+from datetime import date
+from app.extensions import db
+from app.models import AttendanceRecord, LeaveRequest
+from app.services.attendance_service import AttendanceService
+from app.services.attendance_stats_service import AttendanceStatsService
+from app.services.top_performers_service import TopPerformersService
+
+
+class TestTopPerformers:
+
+    def test_ranks_in_one_statement(self, app, site_data, count_statements, attend):
+        """Test that punctual and low-leave rankings come from a single statement"""
+        emp_a, emp_b = site_data['employees']
+        for day in range(1, 6):
+            attend(emp_a, date(2026, 9, day))
+            attend(emp_b, date(2026, 9, day), is_late=(day == 3))
+        db.session.add(LeaveRequest(employee_id=emp_b.id, organization_id=site_data['org'].id,
+                                    leave_type='sick', start_date=date(2026, 9, 4), end_date=date(2026, 9, 4),
+                                    total_days=1, reason='Flu', status='approved'))
+        db.session.commit()
+        org_id = site_data['org'].id
+        with count_statements() as statements:
+            # Evaluated up to the 5th so five present days count as punctual
+            result = TopPerformersService._rank(org_id, date(2026, 9, 1), date(2026, 9, 5))
+
+        assert len(statements) == 1
+        assert result['total_employees'] == 2
+        assert [(e['employee_code'], e['rank'], e['present_days']) for e in result['punctual_employees']] == [('E000', 1, 5)]
+        low_leave = [(e['employee_code'], e['rank'], e['leave_days']) for e in result['low_leave_employees']]
+        assert low_leave == [('E000', 1, 0.0), ('E001', 2, 1.0)]
+        assert result['low_leave_employees'][1]['leave_types'] == {'sick': 1.0}
+
+    def test_month_cache_and_invalidation(self, app, site_data, attend):
+        """Test that rankings are cached per month and dropped when that month's attendance changes"""
+        org_id = site_data['org'].id
+        emp_a = site_data['employees'][0]
+
+        first = TopPerformersService.get_top_performers(org_id, date(2026, 9, 1), today=date(2026, 10, 19))
+        assert first['punctual_employees'] == []
+
+        attend(emp_a, date(2026, 9, 1))
+        attend(emp_a, date(2026, 9, 2))
+        db.session.commit()
+        cached = TopPerformersService.get_top_performers(org_id, date(2026, 9, 1), today=date(2026, 10, 19))
+        assert cached['low_leave_employees'] == first['low_leave_employees']
+
+        # Refreshing the rollup leaves the cache alone until the writer has committed
+        AttendanceStatsService.refresh(org_id, date(2026, 9, 1))
+        uncommitted = TopPerformersService.get_top_performers(org_id, date(2026, 9, 1), today=date(2026, 10, 19))
+        assert uncommitted['low_leave_employees'] == first['low_leave_employees']
+        db.session.rollback()
+
+        record = AttendanceRecord.query.filter_by(employee_id=emp_a.id, date=date(2026, 9, 2)).one()
+        AttendanceService.delete_attendance(record.id)
+        refreshed = TopPerformersService.get_top_performers(org_id, date(2026, 9, 1), limit=1, today=date(2026, 10, 19))
+        assert [e['employee_code'] for e in refreshed['low_leave_employees']] == ['E000']
@@ -0,0 +1,90 @@
+from datetime import datetime
+from app.services.visitor_service import VisitorService
+from app.services.visitor_counter_service import VisitorCounterService
+from app.utils.date_ranges import local_today
+from app.utils.visitor_counter_store import get_visitor_counter_store
+
+
+def _visitor_data(name, visitor_type='guest'):
+    return {
+        'name': name,
+        'mobile_number': '5550100',
+        'purpose_of_visit': 'Meeting',
+        'allowed_floor': '1',
+        'visitor_type': visitor_type,
+    }
+
+
+class TestVisitorCounters:
+
+    def test_writes_update_counters_without_counting(self, app, site_data, count_statements):
+        """Test that check-in, check-out and delete keep the dashboard counters in step"""
+        org_id = site_data['org'].id
+        VisitorService.get_dashboard_stats(org_id)
+
+        guest = VisitorService.create_visitor(org_id, _visitor_data('Guest'))
+        contractor = VisitorService.create_visitor(org_id, _visitor_data('Builder', 'contractor'))
+        VisitorService.check_out_visitor(org_id, guest.id)
+        VisitorService.check_in_visitor(org_id, guest.id)
+        VisitorService.check_out_visitor(org_id, contractor.id)
+        removed = VisitorService.create_visitor(org_id, _visitor_data('Courier', 'delivery'))
+        VisitorService.delete_visitor(org_id, removed.id)
+
+        with count_statements() as statements:
+            stats = VisitorService.get_dashboard_stats(org_id)
+
+        # Only the organization's timezone is read
+        assert len(statements) == 1
+        assert stats['active_visitors'] == 1
+        assert stats['contractors_active'] == 0
+        assert stats['entries_today'] == 2
+        assert stats['guests_today'] == 1
+        assert stats['contractors_today'] == 1
+        assert stats['delivery_today'] == 0
+
+        VisitorCounterService.reconcile(org_id)
+        assert VisitorService.get_dashboard_stats(org_id) == stats
+
+    def test_cold_store_is_rebuilt(self, app, site_data):
+        """Test that counters missing from the store are rebuilt from the database"""
+        org_id = site_data['org'].id
+        VisitorService.create_visitor(org_id, _visitor_data('VIP', 'vip'))
+        VisitorService.create_pre_registration(org_id, {
+            'visitor_name': 'Expected', 'mobile_number': '5550101',
+            'purpose_of_visit': 'Interview', 'scheduled_arrival_time': datetime.utcnow()
+        })
+        assert get_visitor_counter_store().load(org_id, local_today().isoformat()) is None
+
+        stats = VisitorService.get_dashboard_stats(org_id)
+        assert stats['active_visitors'] == 1
+        assert stats['vip_visitors_today'] == 1
+        assert stats['vip_today'] == 1
+        assert stats['pending_preregistrations'] == 1
+        assert get_visitor_counter_store().load(org_id, local_today().isoformat()) is not None
+
+    def test_reconcile_does_not_overwrite_concurrent_change(self, app, site_data, monkeypatch):
+        """Test that a baseline computed while a change was applied is not stored"""
+        org_id = site_data['org'].id
+        VisitorService.get_dashboard_stats(org_id)
+        store = get_visitor_counter_store()
+        compute = VisitorCounterService.compute
+
+        def compute_then_check_in(*args):
+            counted = compute(*args)
+            # Committed and applied after the counts were read
+            VisitorService.create_visitor(org_id, _visitor_data('Late'))
+            return counted
+
+        monkeypatch.setattr(VisitorCounterService, 'compute', staticmethod(compute_then_check_in))
+        VisitorCounterService.reconcile(org_id)
+        assert store.load(org_id, local_today().isoformat())['active_visitors'] == 1
+
+    def test_memory_baseline_expires(self, app, site_data, monkeypatch):
+        """Test that in-process counters are recounted once their baseline is too old"""
+        org_id = site_data['org'].id
+        VisitorService.get_dashboard_stats(org_id)
+        store = get_visitor_counter_store()
+        assert store.load(org_id, local_today().isoformat()) is not None
+
+        monkeypatch.setattr(store, 'max_age_seconds', -1)
+        assert store.load(org_id, local_today().isoformat()) is None
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+import pytest
+from app.extensions import db
+from app.models import OrganizationVisitor
+from app.services.visitor_service import VisitorService
+from app.utils.exceptions import ValidationError
+
+
+def _add_visitor(org_id, name, mobile, minutes_ago=0):
+    visitor = OrganizationVisitor(
+        organization_id=org_id, visitor_name=name, mobile_number=mobile,
+        purpose_of_visit='Meeting', allowed_floor='1',
+        check_in_time=datetime(2026, 10, 19, 9, 0) - timedelta(minutes=minutes_ago)
+    )
+    db.session.add(visitor)
+    return visitor
+
+
+class TestVisitorSearch:
+
+    def test_phone_exact_and_prefix(self, app, site_data):
+        """Test that phone searches ignore formatting and rank the exact number first"""
+        org_id = site_data['org'].id
+        longer = _add_visitor(org_id, 'Ann', '+1 (555) 010-01239', minutes_ago=0)
+        exact = _add_visitor(org_id, 'Bob', '555-010-0123', minutes_ago=30)
+        _add_visitor(org_id, 'Cy', '5559990000')
+        db.session.commit()
+        assert exact.mobile_normalized == '5550100123'
+
+        result = VisitorService.search_visitors(org_id, '555 010 0123')
+        assert [v.id for v in result['items']] == [exact.id]
+
+        result = VisitorService.search_visitors(org_id, '1555010')
+        assert [v.id for v in result['items']] == [longer.id]
+
+        result = VisitorService.search_visitors(org_id, '555-010')
+        assert [v.id for v in result['items']] == [exact.id]
+
+    def test_name_ranking_and_keyset_pages(self, app, site_data):
+        """Test that name matches are ranked and paged without gaps or repeats"""
+        org_id = site_data['org'].id
+        substring = _add_visitor(org_id, 'Mary Johnson', '5550000001', minutes_ago=0)
+        prefix = _add_visitor(org_id, 'John Smith', '5550000002', minutes_ago=10)
+        exact = _add_visitor(org_id, 'John', '5550000003', minutes_ago=20)
+        older_prefix = _add_visitor(org_id, 'Johnny Cash', '5550000004', minutes_ago=40)
+        _add_visitor(org_id, 'Alice', '5550000005')
+        db.session.commit()
+
+        result = VisitorService.search_visitors(org_id, 'john')
+        assert [v.id for v in result['items']] == [exact.id, prefix.id, older_prefix.id, substring.id]
+
+        pages, cursor = [], None
+        while True:
+            page = VisitorService.search_visitors(org_id, 'john', limit=1, cursor=cursor)
+            pages.extend(v.id for v in page['items'])
+            cursor = page['next_cursor']
+            if not page['has_more']:
+                break
+        assert pages == [v.id for v in result['items']]
+
+        # Two-letter queries only match name prefixes
+        assert {v.id for v in VisitorService.search_visitors(org_id, 'jo')['items']} == {
+            exact.id, prefix.id, older_prefix.id
+        }
+
+    def test_unfiltered_listing_and_bad_cursor(self, app, site_data):
+        """Test that an empty query pages through all visitors latest first"""
+        org_id = site_data['org'].id
+        visitors = [_add_visitor(org_id, f'Visitor {i}', f'55500000{i:02d}', minutes_ago=i) for i in range(5)]
+        db.session.commit()
+
+        first = VisitorService.search_visitors(org_id, '', limit=3)
+        second = VisitorService.search_visitors(org_id, '', limit=3, cursor=first['next_cursor'])
+        assert [v.id for v in first['items'] + second['items']] == [v.id for v in visitors]
+        assert second['has_more'] is False
+
+        assert VisitorService.search_visitors(org_id, visitors[2].id)['items'] == [visitors[2]]
+        with pytest.raises(ValidationError):
+            VisitorService.search_visitors(org_id, '', cursor='not-a-cursor')
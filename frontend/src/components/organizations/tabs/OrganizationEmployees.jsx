@@ -94,7 +94,14 @@ const OrganizationEmployees = ({ organizationId, organization }) => {
     setShowModal(true);
   };
 
-  const handleEditEmployee = (employee) => {
+  const handleEditEmployee = async (employee) => {
+    // List items carry only photo_thumbnail_url; the photo data comes with the single employee
+    try {
+      const response = await employeesService.getById(employee.id);
+      employee = response.data || employee;
+    } catch (error) {
+      message.error(error.response?.data?.message || 'Failed to load employee photo');
+    }
     setEditingEmployee(employee);
     setEmployeePhoto(employee.photo_base64 || null);
     setShowWebcam(false);
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { message } from 'antd';
 import { visitorService } from '../../../services/visitorService';
+import { API_BASE } from '../../../services/api';
 
 const SecurityGateEntry = ({ organizationId, organization }) => {
   const [searchQuery, setSearchQuery] = useState('');
@@ -136,9 +137,9 @@ const SecurityGateEntry = ({ organizationId, organization }) => {
                   >
                     <div className="flex items-center justify-between">
                       <div className="flex items-center gap-4">
-                        {visitor.visitor_image && (
+                        {visitor.photo_thumbnail_url && (
                           <img
-                            src={visitor.visitor_image}
+                            src={`${API_BASE}${visitor.photo_thumbnail_url}`}
                             alt="Visitor"
                             className="w-12 h-12 rounded-lg object-cover border border-gray-300"
                           />
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { message } from 'antd';
 import { visitorService } from '../../../services/visitorService';
+import { API_BASE } from '../../../services/api';
 import moment from 'moment';
 
 const VisitorLogsList = ({ organizationId, refreshTrigger }) => {
@@ -291,14 +292,9 @@ const VisitorLogsList = ({ organizationId, refreshTrigger }) => {
                         )}
                       </td>
                       <td className="px-6 py-4 text-sm">
-                        {visitor.image_base64 ? (
+                        {visitor.photo_thumbnail_url ? (
                           <button
-                            onClick={() => {
-                              const img = new Image();
-                              img.src = visitor.image_base64;
-                              const w = window.open('');
-                              w.document.write(img.outerHTML);
-                            }}
+                            onClick={() => window.open(`${API_BASE}${visitor.photo_thumbnail_url}`, '_blank')}
                             className="px-3 py-1 bg-indigo-100 text-indigo-700 rounded-lg hover:bg-indigo-200 transition-colors duration-200 text-xs font-semibold"
                           >
                             📷 View